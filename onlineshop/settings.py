@@ -51,6 +51,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'shop.middleware.CompressionMiddleware',
+    'shop.middleware.ReplicaRoutingMiddleware',
+    'shop.middleware.IdentityMapMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -78,22 +81,54 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'onlineshop.wsgi.application'
+ASGI_APPLICATION = 'onlineshop.asgi.application'
+
+# The async read views (shop/views/async_read.py) do their database work in worker threads
+ASYNC_READ_VIEWS_THREAD_SENSITIVE = False
 
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# DB_POOL_MAX_SIZE > 0 enables the in-process connection pool (see shop/db/backends/postgresql_pool/base.py),
+# otherwise every worker thread keeps its own persistent connection for DB_CONN_MAX_AGE seconds
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 0))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'shop.db.backends.postgresql_pool' if DB_POOL_MAX_SIZE else 'django.db.backends.postgresql',
         'NAME': 'online_shop',
         'USER': 'online_shop_user',
         'PASSWORD': os.environ['DB_PASSWORD'],
         'HOST': 'localhost',
         'PORT': '5432',
+        # pooled connections must be given back to the pool at the end of every request
+        'CONN_MAX_AGE': 0 if DB_POOL_MAX_SIZE else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'POOL': {
+            'MAX_SIZE': DB_POOL_MAX_SIZE,
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'HEALTH_CHECK_INTERVAL': float(os.environ.get('DB_POOL_HEALTH_CHECK_INTERVAL', 30)),
+        },
     }
 }
 
+# Read replicas, e.g. DB_REPLICA_HOSTS=replica1.local,replica2.local
+# Safe requests read from a random replica unless the client has written recently, see shop/routers.py
+REPLICA_DATABASES = []
+for replica_index, replica_host in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(','))):
+    replica_alias = f'replica_{replica_index}'
+    DATABASES[replica_alias] = {
+        **DATABASES['default'],
+        'HOST': replica_host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(replica_alias)
+
+DATABASE_ROUTERS = ['shop.routers.PrimaryReplicaRouter']
+
+# How long (in seconds) the reads of a client stay on the primary database after its last write
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -137,6 +172,14 @@ STATIC_URL = '/static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media/'
 
+# Chunked image uploads, see shop/views/image_upload.py. Unfinished uploads are kept outside of MEDIA_ROOT
+IMAGE_UPLOAD_DIR = BASE_DIR / 'uploads/'
+IMAGE_UPLOAD_MAX_SIZE = int(os.environ.get('IMAGE_UPLOAD_MAX_SIZE', 20 * 1024 * 1024))
+IMAGE_UPLOAD_CHUNK_MAX_SIZE = int(os.environ.get('IMAGE_UPLOAD_CHUNK_MAX_SIZE', 5 * 1024 * 1024))
+IMAGE_UPLOAD_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+# uploads that got no chunk for this long are removed by the sweep_expired_uploads command
+IMAGE_UPLOAD_EXPIRE_SECONDS = int(os.environ.get('IMAGE_UPLOAD_EXPIRE_SECONDS', 24 * 60 * 60))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -144,7 +187,72 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'shop.User'
 
+# The local memory cache is per process and only suits a single process (e.g. runserver). Deployments with several
+# worker processes must use a shared backend, e.g. CACHE_BACKEND=django.core.cache.backends.memcached.PyMemcacheCache
+# and CACHE_LOCATION=127.0.0.1:11211, otherwise cached products are only invalidated in the process that changed them
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+# how long a serialized product is cached, see shop/cache.py
+PRODUCT_CACHE_TIMEOUT = int(os.environ.get('PRODUCT_CACHE_TIMEOUT', 60))
+
+# Carts are kept in the cache, see shop.dal.cart. A cart expires this long (in seconds) after its last change
+CART_TIMEOUT = int(os.environ.get('CART_TIMEOUT', 7 * 24 * 60 * 60))
+CART_MAX_ITEMS = 100
+
+# Responses to requests with an Idempotency-Key header are replayed to their retries for this long (in seconds), then
+# removed by the sweep_idempotency_keys command, see shop/idempotency.py
+IDEMPOTENCY_KEY_EXPIRE_SECONDS = int(os.environ.get('IDEMPOTENCY_KEY_EXPIRE_SECONDS', 24 * 60 * 60))
+
+# Feedback embedded in a product and per page of products/<pk>/feedback/
+PRODUCT_FEEDBACK_PAGE_SIZE = 10
+FEEDBACK_MODERATION_PAGE_SIZE = 50
+
+# admin lists of tables with more rows than this take the estimated row count, see shop.pagination
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 10000
+
+# a refresh of the sales rollups and of the related products also rolls up again the orders updated this long before the
+# previous refresh, which catches the orders of transactions that were committed late, see shop.dal.rollup_watermark
+ROLLUP_OVERLAP_SECONDS = int(os.environ.get('ROLLUP_OVERLAP_SECONDS', 5 * 60))
+# products kept per product in products/<pk>/related/, see shop.dal.related_product
+RELATED_PRODUCTS_COUNT = 10
+
+# Response compression, see shop/compression.py. Smaller bodies are sent uncompressed. Brotli quality above 5 and gzip
+# level above 6 compress dynamic responses much slower for a few percent of size
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+# rows read, serialized and rendered at a time by the streamed lists (?stream=true), see shop/streaming.py
+STREAMING_CHUNK_SIZE = 500
+
+# Token bucket throttles of the views with a throttle scope, see shop/throttling.py. The cache store shares the buckets
+# between the processes using the same cache, shop.throttling.LocalTokenBucketStore keeps them in every process
+THROTTLE_STORE = os.environ.get('THROTTLE_STORE', 'shop.throttling.CacheTokenBucketStore')
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # JSON is written and read with orjson if it's installed, see shop/renderers.py
+    'DEFAULT_RENDERER_CLASSES': (
+        'shop.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    # a rate is both the size of the bucket and how fast it's refilled, e.g. a burst of 300 requests, then 5 a second
+    'DEFAULT_THROTTLE_CLASSES': (
+        'shop.throttling.TokenBucketThrottle',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'products': os.environ.get('THROTTLE_RATE_PRODUCTS', '300/min'),
+        'feedback': os.environ.get('THROTTLE_RATE_FEEDBACK', '120/min'),
+        'registration': os.environ.get('THROTTLE_RATE_REGISTRATION', '10/hour'),
+    },
+    'DEFAULT_PARSER_CLASSES': (
+        'shop.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
@@ -8,4 +8,10 @@ from .settings import *  # NOQA
 #     }
 # }
 
+# A replica that reads the test database, for tests of the routing to replicas, see shop/routers.py
+DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Tests run inside a transaction other threads can't see, so the async views must use the test thread
+ASYNC_READ_VIEWS_THREAD_SENSITIVE = True
@@ -1,15 +1,132 @@
-from django.contrib import admin
+from collections import defaultdict
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.contenttypes.admin import GenericTabularInline
 
+from shop.cache import invalidate_products
+from shop.dal.analytics import AnalyticsDAL
+from shop.dal.order import OrderDAL
+from shop.dal.product import FEEDBACK_AGGREGATE_FIELDS, MAX_STOCK, ProductDAL
 from shop.models import Address, Category, Feedback, Image, Order, OrderItem, Product, ProductMaterial, User
+from shop.pagination import EstimatedCountPaginator
+
+
+# relations that __str__ of the content objects of images reads
+CONTENT_OBJECT_RELATED_FIELDS = {
+    Product: ('category__parent_category', ),
+    Feedback: ('author', 'product'),
+}
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Filter by a foreign key with an autocomplete input. The default filter renders a link for every related object,
+    so it loads the whole related table on every page of the list.
+    """
+    template = 'admin/shop/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        self.lookup_val = params.get(self.lookup_kwarg)
+        super().__init__(field, request, params, model, model_admin, field_path)
+        # the widget renders only the selected object, the others are searched by the autocomplete view of the admin
+        self.form_field = forms.ModelChoiceField(
+            field.remote_field.model._default_manager.all(), required=False,
+            widget=AutocompleteSelect(field, model_admin.admin_site, attrs={'onchange': 'this.form.submit()'}))
+        self.hidden_params = []
+
+    def has_output(self):
+        return True
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        # the other filters, the search and the ordering are kept when the form of the filter is submitted
+        self.hidden_params = [(name, value) for name, value in changelist.params.items()
+                              if name not in (self.lookup_kwarg, PAGE_VAR)]
+        yield {
+            'selected': self.lookup_val is None,
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg]),
+            'display': 'All',
+        }
+
+    def rendered_widget(self):
+        return self.form_field.widget.render(self.lookup_kwarg, self.lookup_val)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Admin of a table too large to be counted on every page, see shop.pagination.EstimatedCountPaginator"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # the full count of a filtered list is one more COUNT(*) of the whole table
+
+    @property
+    def media(self):
+        media = super().media
+        for list_filter in self.list_filter:
+            if isinstance(list_filter, tuple) and issubclass(list_filter[1], AutocompleteFilter):
+                media += AutocompleteSelect(self.model._meta.get_field(list_filter[0]), self.admin_site).media
+        return media
+
+
+class StaleOrderDaysOnDeleteMixin:
+    """Marks the sales days of the orders deleted together with the objects stale, see AnalyticsDAL.mark_days_stale"""
+    order_lookup = None  # lookup from orders to the objects of the admin
+
+    def delete_model(self, request, obj):
+        AnalyticsDAL.mark_order_days_stale(Order.objects.filter(**{self.order_lookup: obj.pk}))
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        AnalyticsDAL.mark_order_days_stale(Order.objects.filter(**{f'{self.order_lookup}__in': queryset}))
+        super().delete_queryset(request, queryset)
+
+
+@admin.register(User)
+class ShopUserAdmin(StaleOrderDaysOnDeleteMixin, UserAdmin):
+    order_lookup = 'user'
+
 
-admin.site.register(User, UserAdmin)
+class ProductActionForm(ActionForm):
+    """Action form with the arguments of the price and stock actions of products"""
+    percent = forms.DecimalField(required=False, min_value=-99, max_value=1000, decimal_places=2,
+                                 help_text='Percent for adjusting prices')
+    quantity = forms.IntegerField(required=False, min_value=1, max_value=MAX_STOCK, help_text='Quantity for restocking')
+
+
+class ImageChangeList(ChangeList):
+    def get_results(self, request):
+        super().get_results(request)
+        prefetch_content_objects(self.result_list)
+
+
+def prefetch_content_objects(images):
+    """
+    Loads the content objects of the images with one query per content type, together with the relations their
+    __str__ reads. prefetch_related('content_object') can't follow relations that only some content types have.
+    """
+    object_ids_by_model = defaultdict(set)
+    for image in images:
+        object_ids_by_model[image.content_type.model_class()].add(image.object_id)
+    content_objects = {}
+    for model, object_ids in object_ids_by_model.items():
+        queryset = model._base_manager.select_related(*CONTENT_OBJECT_RELATED_FIELDS.get(model, ()))
+        content_objects.update(((model, obj.pk), obj) for obj in queryset.filter(pk__in=object_ids))
+    for image in images:
+        content_object = content_objects.get((image.content_type.model_class(), image.object_id))
+        if content_object is not None:
+            Image.content_object.set_cached_value(image, content_object)
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'parent_category')
+    list_select_related = ('parent_category__parent_category', )
     list_filter = ('parent_category', )
     search_fields = ('name', 'parent_category')
     raw_id_fields = ('parent_category', )
@@ -20,15 +137,67 @@ class ImageInline(GenericTabularInline):
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(LargeTableAdmin):
     list_display = ('id', 'name', 'category', 'price', 'is_available', 'stock', 'created_at', 'updated_at')
+    list_select_related = ('category__parent_category', )
     list_filter = ('is_available', 'created_at', 'updated_at')
     list_editable = ('price', 'is_available', 'stock')
     search_fields = ('name', )
     raw_id_fields = ('category', )
+    readonly_fields = FEEDBACK_AGGREGATE_FIELDS
     inlines = [
         ImageInline,
     ]
+    # every action is one UPDATE of all the selected products, unlike list_editable, which saves them one by one
+    action_form = ProductActionForm
+    actions = ('mark_available', 'mark_unavailable', 'adjust_price', 'restock')
+
+    @admin.action(description='Mark selected products as available')
+    def mark_available(self, request, queryset):
+        updated_count = ProductDAL.set_products_availability(queryset, True)
+        self.message_user(request, f'{updated_count} products were marked as available.')
+
+    @admin.action(description='Mark selected products as unavailable')
+    def mark_unavailable(self, request, queryset):
+        updated_count = ProductDAL.set_products_availability(queryset, False)
+        self.message_user(request, f'{updated_count} products were marked as unavailable.')
+
+    @admin.action(description='Adjust price of selected products by percent')
+    def adjust_price(self, request, queryset):
+        percent = self.get_action_argument(request, 'percent')
+        if percent is not None:
+            updated_count = ProductDAL.adjust_products_price(queryset, percent)
+            self.message_user(request, f'Prices of {updated_count} products were changed by {percent}%.')
+
+    @admin.action(description='Restock selected products by quantity')
+    def restock(self, request, queryset):
+        quantity = self.get_action_argument(request, 'quantity')
+        if quantity is not None:
+            updated_count = ProductDAL.restock_products(queryset, quantity)
+            self.message_user(request, f'{updated_count} products were restocked by {quantity}.')
+
+    def get_action_argument(self, request, name):
+        """Returns the cleaned field of the action form or None with an error message if it's empty or invalid"""
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if form.is_valid() and form.cleaned_data[name] is not None:
+            return form.cleaned_data[name]
+        errors = ' '.join(form.errors.get(name, ['This field is required.']))
+        self.message_user(request, f'{form.fields[name].help_text}: {errors}', messages.ERROR)
+        return None
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            obj.save(update_fields=ProductDAL.get_product_update_fields())
+            # the cached product would be served with the ETag of the new version
+            invalidate_products([obj.pk])
+        else:
+            super().save_model(request, obj, form, change)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        if change and ('materials' in form.changed_data or any(formset.has_changed() for formset in formsets)):
+            invalidate_products([form.instance.pk])  # the materials and images are a part of the cached product
 
 
 @admin.register(ProductMaterial)
@@ -36,19 +205,26 @@ class ProductMaterialAdmin(admin.ModelAdmin):
     list_display = ('name', )
     search_fields = ('name', )
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change:
+            invalidate_products(obj.products.values_list('pk', flat=True))  # the cached products have its name
+
 
 @admin.register(Address)
-class AddressAdmin(admin.ModelAdmin):
+class AddressAdmin(StaleOrderDaysOnDeleteMixin, LargeTableAdmin):
     list_display = ('country', 'user', 'region', 'city', 'street', 'house_number', 'flat_number', 'postal_code')
-    list_filter = ('user', )
-    list_editable = ('user', )
+    list_select_related = ('user', )
+    list_filter = (('user', AutocompleteFilter), )
     raw_id_fields = ('user', )
+    order_lookup = 'address'
 
 
 @admin.register(Feedback)
-class FeedbackAdmin(admin.ModelAdmin):
-    list_display = ('id', 'author', 'product', 'title', 'is_moderated', 'created_at', 'updated_at')
-    list_filter = ('is_moderated', 'created_at', 'updated_at')
+class FeedbackAdmin(LargeTableAdmin):
+    list_display = ('id', 'author', 'product', 'title', 'is_moderated', 'is_rejected', 'created_at', 'updated_at')
+    list_select_related = ('author', 'product__category__parent_category')
+    list_filter = ('is_moderated', 'is_rejected', 'created_at', 'updated_at')
     list_editable = ('title', 'is_moderated')
     search_fields = ('title', )
     raw_id_fields = ('author', 'product')
@@ -56,25 +232,65 @@ class FeedbackAdmin(admin.ModelAdmin):
         ImageInline
     ]
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        ProductDAL.refresh_feedback_aggregates({obj.product_id, form.initial.get('product')})
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        ProductDAL.refresh_feedback_aggregates([obj.product_id])
+
+    def delete_queryset(self, request, queryset):
+        product_pks = set(queryset.values_list('product', flat=True))
+        super().delete_queryset(request, queryset)
+        ProductDAL.refresh_feedback_aggregates(product_pks)
+
 
 @admin.register(Image)
-class ImageAdmin(admin.ModelAdmin):
+class ImageAdmin(LargeTableAdmin):
     exclude = ('tip', )
     list_display = ('tip', 'image', 'content_type', 'object_id', 'content_object')
+    list_select_related = ('content_type', )
     list_filter = ('content_type', )
     list_editable = ('tip', )
     list_display_links = ('content_type', 'object_id', 'content_object')
 
+    def get_changelist(self, request, **kwargs):
+        return ImageChangeList
+
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(StaleOrderDaysOnDeleteMixin, LargeTableAdmin):
     list_display = ('user', 'address', 'is_paid', 'created_at', 'updated_at')
-    list_filter = ('is_paid', 'created_at', 'updated_at')
+    list_select_related = ('user', 'address__user')
+    list_filter = (('user', AutocompleteFilter), 'is_paid', 'created_at', 'updated_at')
     list_editable = ('is_paid', )
     raw_id_fields = ('user', 'address')
+    actions = ('mark_paid', )
+    order_lookup = 'pk'
+
+    @admin.action(description='Mark selected orders as paid')
+    def mark_paid(self, request, queryset):
+        updated_count = OrderDAL.mark_orders_paid(queryset)
+        self.message_user(request, f'{updated_count} orders were marked as paid.')
 
 
 @admin.register(OrderItem)
-class OrderItemAdmin(admin.ModelAdmin):
+class OrderItemAdmin(LargeTableAdmin):
     list_display = ('product', 'order', 'quantity')
+    list_select_related = ('product__category__parent_category', 'order__user', 'order__address')
     raw_id_fields = ('product', 'order')
+
+    # the sales rollups of the days of the orders are refreshed
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        OrderDAL.touch_orders({obj.order_id, form.initial.get('order')})
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        OrderDAL.touch_orders([obj.order_id])
+
+    def delete_queryset(self, request, queryset):
+        order_pks = set(queryset.values_list('order', flat=True))
+        super().delete_queryset(request, queryset)
+        OrderDAL.touch_orders(order_pks)
@@ -0,0 +1,33 @@
+"""
+Cached response data. An entry is deleted when the data it was built from changes through the DAL and expires after
+its timeout anyway, which bounds staleness after changes made around the DAL (e.g. renaming the product's category).
+
+The cache must be shared by all the worker processes (see CACHES in the settings), otherwise an entry is only deleted
+in the process that changed the data.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def get_product_detail_key(product_pk):
+    return f'product_detail:{product_pk}'
+
+
+def get_product_detail(product, serialize):
+    """Returns the cached serialized product or serializes and caches it with serialize(product)"""
+    key = get_product_detail_key(product.pk)
+    data = cache.get(key)
+    if data is None:
+        data = serialize(product)
+        cache.set(key, data, settings.PRODUCT_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_products(product_pks):
+    """
+    Deletes the cached data of the products with one cache call once the current transaction is committed. Deleting it
+    earlier would let a concurrent request cache the old data again before the changes become visible.
+    """
+    keys = [get_product_detail_key(product_pk) for product_pk in set(product_pks) if product_pk is not None]
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,102 @@
+"""
+Response compression. Brotli is used when the brotli package is installed and the client accepts it, gzip otherwise.
+brotli is optional, without it responses are compressed with gzip only.
+
+Responses marked with compressed_cache_timeout (see mark_compressed_cacheable) keep their compressed bodies in the
+cache, keyed by a digest of the uncompressed body. A cached product served again is compressed only once per encoding,
+and an entry can never be stale: a changed body has another digest.
+"""
+import gzip
+import hashlib
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BROTLI = 'br'
+GZIP = 'gzip'
+COMPRESSIBLE_CONTENT_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml')
+
+
+def get_supported_encodings():
+    """Encodings the server can write, the preferred one first"""
+    return (BROTLI, GZIP) if brotli is not None else (GZIP, )
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Returns the supported encoding with the highest quality in the Accept-Encoding header or None if the client takes
+    none of them. Of the encodings of the same quality the preferred one is chosen.
+    """
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+
+    best_encoding, best_quality = None, 0.0
+    for encoding in get_supported_encodings():
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
+
+
+def is_compressible(content_type):
+    return content_type.split(';')[0].strip().lower().startswith(COMPRESSIBLE_CONTENT_TYPES)
+
+
+def compress(body, encoding):
+    if encoding == BROTLI:
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    # no modification time in the header, so the same body is always compressed into the same bytes
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def compress_sequence(chunks, encoding):
+    """Compresses the chunks of a streaming response one by one, every chunk is flushed to the client as it comes"""
+    if encoding == BROTLI:
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        process, finish = compressor.compress, compressor.flush
+
+        def flush():
+            return compressor.flush(zlib.Z_SYNC_FLUSH)
+    for chunk in chunks:
+        yield process(chunk) + flush()
+    yield finish()
+
+
+def get_compressed_body_key(body, encoding):
+    return f'compressed_body:{encoding}:{hashlib.blake2b(body, digest_size=16).hexdigest()}'
+
+
+def compress_cached(body, encoding, timeout):
+    """Returns the compressed body from the cache or compresses and caches it for timeout seconds"""
+    key = get_compressed_body_key(body, encoding)
+    compressed_body = cache.get(key)
+    if compressed_body is None:
+        compressed_body = compress(body, encoding)
+        cache.set(key, compressed_body, timeout)
+    return compressed_body
+
+
+def mark_compressed_cacheable(response, timeout):
+    """Lets the compression middleware keep the compressed body of the response in the cache for timeout seconds"""
+    response.compressed_cache_timeout = timeout
+    return response
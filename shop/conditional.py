@@ -0,0 +1,54 @@
+"""
+Conditional updates of versioned objects (see shop.models.VersionedModel). Responses with such an object carry its
+version in the ETag header. A client sends it back in If-Match with its update, which then fails with 412 Precondition
+Failed rather than overwrite the changes somebody else has made since the client read the object.
+"""
+import re
+from contextlib import contextmanager
+
+from rest_framework import serializers
+
+from shop.dal.unit_of_work import StaleObjectError
+from shop.exceptions import PreconditionFailed, VersionConflict
+
+IF_MATCH_HEADER = 'If-Match'
+# "3" or W/"3", the compression middleware makes the ETags of compressed responses weak, a version is the same anyway
+ENTITY_TAG_PATTERN = re.compile(r'\s*(?:W/)?"(\d+)"\s*')
+
+
+def get_etag(obj):
+    return f'"{obj.version}"'
+
+
+def set_etag(response, obj):
+    response['ETag'] = get_etag(obj)
+    return response
+
+
+def get_if_match_versions(request):
+    """Versions of the If-Match header or None if there is no header or it's '*'"""
+    if_match = request.headers.get(IF_MATCH_HEADER)
+    if if_match is None or if_match.strip() == '*':
+        return None
+    versions = set()
+    for entity_tag in if_match.split(','):
+        match = ENTITY_TAG_PATTERN.fullmatch(entity_tag)
+        if match is None:
+            raise serializers.ValidationError({IF_MATCH_HEADER: 'Header must be a list of ETags, e.g. "3"'})
+        versions.add(int(match.group(1)))
+    return versions
+
+
+@contextmanager
+def check_version(obj, versions):
+    """
+    Gives the version of the object the update in the block is based on. The update fails with 412 if the object
+    doesn't have one of the versions (of If-Match, see get_if_match_versions) or if the row changes before the update
+    is written, or with 409 in the latter case if no versions are given.
+    """
+    if versions is not None and obj.version not in versions:
+        raise PreconditionFailed
+    try:
+        yield obj.version
+    except StaleObjectError:
+        raise PreconditionFailed if versions is not None else VersionConflict
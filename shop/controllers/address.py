@@ -24,10 +24,9 @@ class AddressController:
             raise Http404
 
     @classmethod
-    def update_address(cls, address_pk, country, region, city, street, house_number, flat_number, postal_code):
-        address_obj = cls.get_address(address_pk)
+    def update_address(cls, address_obj, country, region, city, street, house_number, flat_number, postal_code):
         AddressDAL.update_address(address_obj, country, region, city, street, house_number, flat_number, postal_code)
 
     @classmethod
-    def delete_address(cls, address_pk):
-        AddressDAL.delete_address(cls.get_address(address_pk))
+    def delete_address(cls, address_obj):
+        AddressDAL.delete_address(address_obj)
@@ -0,0 +1,19 @@
+from shop.dal.analytics import AnalyticsDAL
+
+
+class AnalyticsController:
+    @classmethod
+    def get_daily_revenue(cls, start, end, is_paid=None):
+        return AnalyticsDAL.get_daily_revenue(start, end, is_paid)
+
+    @classmethod
+    def get_sales_by_product(cls, start, end, limit, is_paid=None):
+        return AnalyticsDAL.get_sales_by_product(start, end, is_paid, limit)
+
+    @classmethod
+    def get_sales_by_category(cls, start, end, is_paid=None):
+        return AnalyticsDAL.get_sales_by_category(start, end, is_paid)
+
+    @classmethod
+    def get_daily_orders(cls, start, end):
+        return AnalyticsDAL.get_daily_orders(start, end)
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from rest_framework import serializers
+
+from shop.dal.cart import CartDAL
+from shop.dal.order import OrderDAL
+from shop.dal.order_item import OrderItemDAL
+from shop.dal.product import ProductDAL
+from shop.models import Product
+
+
+class CartController:
+    @classmethod
+    def get_cart_items(cls, user):
+        return cls.get_items(CartDAL.get_cart(user.pk))
+
+    @classmethod
+    def get_items(cls, cart):
+        return [{'product': product_pk, 'quantity': quantity} for product_pk, quantity in cart.items()]
+
+    @classmethod
+    def add_to_cart(cls, user, product_pk, quantity):
+        try:
+            ProductDAL.get_available_product_by_pk(product_pk)
+        except Product.DoesNotExist:
+            raise serializers.ValidationError({'product': 'Product with such pk doesn\'t exist or isn\'t available!'})
+        cart = CartDAL.add_to_cart(user.pk, product_pk, quantity, settings.CART_MAX_ITEMS)
+        if cart is None:
+            raise serializers.ValidationError({'product': f'The cart can\'t hold more than {settings.CART_MAX_ITEMS} '
+                                                          f'products'})
+        return cls.get_items(cart)
+
+    @classmethod
+    def set_cart_quantity(cls, user, product_pk, quantity):
+        if product_pk not in CartDAL.get_cart(user.pk):
+            raise Http404
+        return cls.get_items(CartDAL.set_cart_quantity(user.pk, product_pk, quantity))
+
+    @classmethod
+    def clear_cart(cls, user):
+        CartDAL.delete_cart(user.pk)
+
+    @classmethod
+    def checkout(cls, user, address):
+        """
+        Turns the cart into an order with its items in one transaction and empties the cart once the transaction is
+        committed. The cart stays locked until then, also when the checkout is a part of a larger transaction, so a
+        concurrent checkout can't order it twice.
+        """
+        if address.user_id != user.pk:
+            raise serializers.ValidationError({'address': 'Address with such pk doesn\'t belong to you!'})
+        with CartDAL.lock_cart(user.pk, until_commit=True):
+            cart = CartDAL.get_cart(user.pk)
+            if not cart:
+                raise serializers.ValidationError({'cart': 'The cart is empty!'})
+            products = ProductDAL.get_available_products_by_pks(cart)
+            unavailable_pks = sorted(set(cart) - set(products))
+            if unavailable_pks:
+                raise serializers.ValidationError({'cart': f'Products {unavailable_pks} aren\'t available anymore, '
+                                                           f'remove them from the cart'})
+            with transaction.atomic():
+                order = OrderDAL.insert_order(user, address)
+                OrderItemDAL.insert_order_items(order, ((products[product_pk], quantity)
+                                                        for product_pk, quantity in cart.items()))
+                transaction.on_commit(lambda: CartDAL.delete_cart(user.pk))
+        return order
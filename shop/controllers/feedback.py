@@ -1,21 +1,58 @@
+from django.conf import settings
+from django.db import transaction
 from django.http import Http404
 from rest_framework import serializers
 
-from shop.controllers.image import ImageController
+from shop.conditional import check_version
+from shop.controllers.image_upload import ImageUploadController
 from shop.dal.feedback import FeedbackDAL
+from shop.dal.product import ProductDAL
+from shop.dal.unit_of_work import register_loaded, unit_of_work
 from shop.models import Feedback
+from shop.pagination import KeysetPagination
 from shop.tools import are_all_elements_in_list
 
 
 class FeedbackController:
+    APPROVE = 'approve'
+    REJECT = 'reject'
+
     @classmethod
     def get_feedback_list(cls):
         feedback = FeedbackDAL.get_moderated_feedback()
         return feedback
 
     @classmethod
-    def create_feedback(cls, author, product, title, content, images=None):
-        FeedbackDAL.insert_feedback(author, product, title, content, images)
+    def get_product_feedback_page(cls, product, request=None):
+        """Returns the page of the product's moderated feedback, newest first, and its paginator"""
+        paginator = KeysetPagination(settings.PRODUCT_FEEDBACK_PAGE_SIZE)
+        page = paginator.paginate_queryset(FeedbackDAL.get_product_feedback(product), request)
+        return page, paginator
+
+    @classmethod
+    def get_moderation_queue_page(cls, request):
+        """Returns the page of feedback waiting for moderation, oldest first, and its paginator"""
+        paginator = KeysetPagination(settings.FEEDBACK_MODERATION_PAGE_SIZE, descending=False)
+        page = paginator.paginate_queryset(FeedbackDAL.get_moderation_queue(), request)
+        return page, paginator
+
+    @classmethod
+    def moderate_feedback(cls, ids, action):
+        """
+        Approves or rejects all the feedback at once. Aggregates and cached data of every affected product are
+        refreshed once, however many of its feedback were moderated.
+        """
+        with transaction.atomic():
+            product_pks = FeedbackDAL.get_feedback_product_pks(ids)
+            updated_count = FeedbackDAL.set_moderation(ids, action == cls.APPROVE)
+            ProductDAL.refresh_feedback_aggregates(product_pks)
+        return updated_count
+
+    @classmethod
+    def create_feedback(cls, author, product, title, content, images=None, uploads=None):
+        with unit_of_work():
+            images = ImageUploadController.add_upload_images(author, images, uploads)
+            FeedbackDAL.insert_feedback(author, product, title, content, images)
 
         # TODO Sending email to admin
 
@@ -30,32 +67,35 @@ class FeedbackController:
         return feedback
 
     @classmethod
-    def update_feedback(cls, feedback_pk, product, title, content, images=None, images_to_delete=None):
-        feedback = cls.get_feedback(feedback_pk)
-        if images_to_delete is not None:
-            cls.validate_images_pk_to_delete(feedback, images_to_delete)
-            images_to_delete = [ImageController.get_image(image_pk) for image_pk in images_to_delete]
-        FeedbackDAL.update_feedback(feedback, product, title, content, images, images_to_delete)
+    def update_feedback(cls, feedback, requesting_user, product, title, content, images=None, images_to_delete=None,
+                        uploads=None, if_match=None):
+        """Updates the feedback if it has one of the if_match versions, if any, returns the updated feedback"""
+        with check_version(feedback, if_match) as base_version, unit_of_work():
+            images = ImageUploadController.add_upload_images(requesting_user, images, uploads)
+            if images_to_delete is not None:
+                cls.validate_images_pk_to_delete(feedback, images_to_delete)
+            FeedbackDAL.update_feedback(feedback, product, title, content, images, images_to_delete,
+                                        base_version=base_version)
 
         # TODO Sending email to admin
 
-        return
+        return feedback
 
     @classmethod
-    def delete_feedback(cls, feedback_pk):
-        FeedbackDAL.delete_feedback(cls.get_feedback(feedback_pk))
+    def delete_feedback(cls, feedback):
+        FeedbackDAL.delete_feedback(feedback)
 
         # TODO Sending email to feedback author
 
         return
 
     @classmethod
-    def delete_feedback_images(cls, feedback_pk):
-        FeedbackDAL.delete_images(cls.get_feedback(feedback_pk))
+    def delete_feedback_images(cls, feedback):
+        FeedbackDAL.delete_images(feedback)
 
     @classmethod
     def validate_images_pk_to_delete(cls, feedback, images_pk_to_delete):
-        existing_images_pk = [obj.pk for obj in FeedbackDAL.get_all_feedback_images(feedback)]
+        existing_images_pk = [obj.pk for obj in register_loaded(FeedbackDAL.get_all_feedback_images(feedback))]
         if not are_all_elements_in_list(images_pk_to_delete, existing_images_pk):
             raise serializers.ValidationError({'images_to_delete': 'Image with such pk doesn\'t belong to this '
                                                                    'feedback or doesn\'t exist!'})
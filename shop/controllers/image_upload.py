@@ -0,0 +1,195 @@
+import io
+import os
+import re
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+from django.utils.functional import cached_property
+from PIL import Image as PillowImage
+from rest_framework import serializers
+
+from shop.dal.image_upload import ImageUploadDAL
+from shop.exceptions import PayloadTooLarge, UploadOffsetConflict
+from shop.models import ImageUpload
+
+CONTENT_RANGE_PATTERN = re.compile(r'^bytes (?P<start>\d+)-(?P<end>\d+)/(?P<total>\d+)$')
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class UploadedImageFile(File):
+    """
+    Image of a complete upload. The storage moves the file to its place instead of copying it, as it does with
+    large files uploaded in one request (see django.core.files.storage.FileSystemStorage._save). The file is opened
+    only when its content is read, so nothing is left open after the move.
+    """
+    def __init__(self, path, name):
+        super().__init__(None, name)
+        self.path = path
+
+    def temporary_file_path(self):
+        return self.path
+
+    @cached_property
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def open(self, mode='rb'):
+        if self.closed:
+            self.file = open(self.path, mode)
+        else:
+            self.seek(0)
+        return self
+
+    def chunks(self, chunk_size=None):
+        with self.open():
+            yield from super().chunks(chunk_size)
+
+
+class ImageUploadController:
+    @classmethod
+    def create_upload(cls, owner, file_name, size):
+        if size > settings.IMAGE_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError({'size': f'Image can\'t be larger than {settings.IMAGE_UPLOAD_MAX_SIZE} '
+                                                       f'bytes'})
+        upload = ImageUploadDAL.insert_upload(owner, os.path.basename(file_name), size)
+        os.makedirs(settings.IMAGE_UPLOAD_DIR, exist_ok=True)
+        open(cls.get_upload_path(upload), 'wb').close()
+        return upload
+
+    @classmethod
+    def get_upload(cls, upload_pk):
+        try:
+            return ImageUploadDAL.get_upload_by_pk(upload_pk)
+        except ImageUpload.DoesNotExist:
+            raise Http404
+
+    @classmethod
+    def get_upload_path(cls, upload):
+        return os.path.join(settings.IMAGE_UPLOAD_DIR, str(upload.pk))
+
+    @classmethod
+    def write_chunk(cls, upload, stream, content_range):
+        """
+        Writes the chunk of the upload described by the Content-Range header ('bytes <start>-<end>/<total>') from the
+        stream to the upload file. The chunk is read in small blocks, so it's never held in memory as a whole, into a
+        file of its own, outside any transaction, as a slow client may take long to send it. Then the chunk is added
+        to the upload file if received_size is still at its start, so of concurrent chunks at the same offset only one
+        is taken. If the stream ends early, the received part is kept and the client can resume from there.
+        """
+        with transaction.atomic():
+            # the lock is held only while the offset is checked, so it sees the offset of a chunk being added
+            cls.lock_upload(upload)
+        start, end = cls.parse_content_range(upload, content_range)
+        if start != upload.received_size:
+            raise UploadOffsetConflict(upload.received_size)
+
+        with tempfile.TemporaryFile(dir=settings.IMAGE_UPLOAD_DIR, prefix=f'{upload.pk}.{start}.') as chunk_file:
+            written_size = cls.receive_chunk(stream, chunk_file, end - start + 1)
+            with transaction.atomic():
+                # the UPDATE locks the row until the chunk is added, which takes no longer than copying a local file
+                if not ImageUploadDAL.advance_received_size(upload, start, start + written_size):
+                    received_size = ImageUploadDAL.get_received_size(upload)
+                    if received_size is None:  # expired meanwhile
+                        raise Http404
+                    raise UploadOffsetConflict(received_size)
+                chunk_file.seek(0)
+                with open(cls.get_upload_path(upload), 'r+b') as upload_file:
+                    upload_file.seek(start)
+                    shutil.copyfileobj(chunk_file, upload_file, READ_BLOCK_SIZE)
+                    upload_file.truncate(start + written_size)
+
+                is_valid = not upload.is_complete or cls.is_valid_image(upload)
+                if not is_valid:
+                    cls.delete_upload_files([upload])
+                    ImageUploadDAL.delete_uploads([upload])
+        if not is_valid:
+            raise serializers.ValidationError(
+                {'image': f'Upload a valid image of one of the formats: {", ".join(settings.IMAGE_UPLOAD_FORMATS)}'})
+        return upload
+
+    @classmethod
+    def receive_chunk(cls, stream, chunk_file, chunk_size):
+        """Writes up to chunk_size bytes of the stream to chunk_file, returns how many bytes are written"""
+        stream = stream or io.BytesIO()  # DRF gives no stream for an empty body
+        written_size = 0
+        while written_size < chunk_size:
+            block = stream.read(min(READ_BLOCK_SIZE, chunk_size - written_size))
+            if not block:
+                break
+            chunk_file.write(block)
+            written_size += len(block)
+        if written_size == chunk_size and stream.read(1):
+            raise PayloadTooLarge('Request body is larger than the range in the Content-Range header.')
+        return written_size
+
+    @classmethod
+    def lock_upload(cls, upload):
+        try:
+            return ImageUploadDAL.lock_upload(upload)
+        except ImageUpload.DoesNotExist:
+            raise Http404
+
+    @classmethod
+    def parse_content_range(cls, upload, content_range):
+        match = CONTENT_RANGE_PATTERN.match(content_range or '')
+        if match is None:
+            raise serializers.ValidationError(
+                {'Content-Range': 'Header must look like \'bytes <start>-<end>/<total>\''})
+        start, end, total = (int(match.group(name)) for name in ('start', 'end', 'total'))
+        if total != upload.size or start > end or end >= total:
+            raise serializers.ValidationError({'Content-Range': f'Range must be within the upload of {upload.size} '
+                                                                f'bytes'})
+        if end - start + 1 > settings.IMAGE_UPLOAD_CHUNK_MAX_SIZE:
+            raise PayloadTooLarge(f'Chunk can\'t be larger than {settings.IMAGE_UPLOAD_CHUNK_MAX_SIZE} bytes.')
+        return start, end
+
+    @classmethod
+    def is_valid_image(cls, upload):
+        """Reads only the header of the image, unlike ImageField validation, which decodes the whole image"""
+        try:
+            with PillowImage.open(cls.get_upload_path(upload)) as image:
+                return image.format in settings.IMAGE_UPLOAD_FORMATS and \
+                       image.width * image.height <= PillowImage.MAX_IMAGE_PIXELS
+        except (OSError, PillowImage.DecompressionBombError):
+            return False
+
+    @classmethod
+    def add_upload_images(cls, owner, images, upload_pks):
+        if upload_pks is None:
+            return images
+        return [*(images or []), *cls.take_upload_images(owner, upload_pks)]
+
+    @classmethod
+    def take_upload_images(cls, owner, upload_pks):
+        """
+        Returns the images of the owner's complete uploads for creating product or feedback images. The uploads are
+        deleted, their files are moved to the media storage when the images are saved.
+        """
+        uploads = list(ImageUploadDAL.get_complete_owner_uploads(owner, upload_pks))
+        if len(uploads) != len(set(upload_pks)):
+            raise serializers.ValidationError({'uploads': 'Upload with such pk doesn\'t belong to you, doesn\'t exist '
+                                                          'or isn\'t complete!'})
+        ImageUploadDAL.delete_uploads(uploads)
+        return [UploadedImageFile(cls.get_upload_path(upload), name=upload.file_name) for upload in uploads]
+
+    @classmethod
+    def delete_expired_uploads(cls, max_age):
+        """Deletes the uploads that haven't got a chunk for max_age seconds with their files, returns how many"""
+        uploads = list(ImageUploadDAL.get_uploads_updated_before(timezone.now() - timedelta(seconds=max_age)))
+        ImageUploadDAL.delete_uploads(uploads)
+        cls.delete_upload_files(uploads)
+        return len(uploads)
+
+    @classmethod
+    def delete_upload_files(cls, uploads):
+        for upload in uploads:
+            try:
+                os.remove(cls.get_upload_path(upload))
+            except FileNotFoundError:
+                pass
@@ -1,5 +1,6 @@
 from django.http import Http404
 
+from shop.conditional import check_version
 from shop.dal.order import OrderDAL
 from shop.models import Order
 
@@ -8,9 +9,10 @@ class OrderController:
     @classmethod
     def get_order_list(cls, user):
         if user.is_staff:
-            return OrderDAL.get_all_orders()
+            orders = OrderDAL.get_all_orders()
         else:
-            return OrderDAL.get_user_orders(user.pk)
+            orders = OrderDAL.get_user_orders(user.pk)
+        return OrderDAL.with_output_relations(orders)
 
     @classmethod
     def create_order(cls, user, address):
@@ -24,9 +26,12 @@ class OrderController:
             raise Http404
 
     @classmethod
-    def update_order(cls, order_pk, address):
-        OrderDAL.update_order(cls.get_order(order_pk), address)
+    def update_order(cls, order_obj, address, if_match=None):
+        """Updates the order if it has one of the if_match versions, if any, returns the updated order"""
+        with check_version(order_obj, if_match) as base_version:
+            OrderDAL.update_order(order_obj, address, base_version=base_version)
+        return order_obj
 
     @classmethod
-    def delete_order(cls, order_pk):
-        OrderDAL.delete_order(cls.get_order(order_pk))
+    def delete_order(cls, order_obj):
+        OrderDAL.delete_order(order_obj)
@@ -1,10 +1,12 @@
 from django.http import Http404
 from rest_framework import serializers
 
-from shop.controllers.image import ImageController
-from shop.dal.image import ImageDAL
+from shop.conditional import check_version
+from shop.controllers.image_upload import ImageUploadController
 from shop.dal.product import ProductDAL
 from shop.dal.product_material import ProductMaterialDAL
+from shop.dal.related_product import RelatedProductDAL
+from shop.dal.unit_of_work import register_loaded, unit_of_work
 from shop.models import Product
 from shop.tools import are_all_elements_in_list
 
@@ -28,13 +30,20 @@ class ProductController:
             raise Http404
 
     @classmethod
-    def create_product(cls, category, name, price, description, size, weight, stock, is_available, materials=None,
-                       images=None):
-        product = ProductDAL.insert_product(category, name, price, description, size, weight, stock, is_available)
-        if materials is not None:
-            cls.add_materials_to_product(product, materials)
-        if images is not None:
-            ProductDAL.create_images(product, images)
+    def get_related_products(cls, product_pk):
+        return RelatedProductDAL.get_related_products(product_pk)
+
+    @classmethod
+    def create_product(cls, requesting_user, category, name, price, description, size, weight, stock, is_available,
+                       materials=None, images=None, uploads=None):
+        with unit_of_work():
+            images = ImageUploadController.add_upload_images(requesting_user, images, uploads)
+            product = ProductDAL.insert_product(category, name, price, description, size, weight, stock,
+                                                is_available)
+            if materials is not None:
+                cls.add_materials_to_product(product, materials)
+            if images is not None:
+                ProductDAL.create_images(product, images)
 
     @classmethod
     def add_materials_to_product(cls, product_obj, material_names):
@@ -47,25 +56,34 @@ class ProductController:
                 ProductMaterialDAL.add_products(new_material, [product_obj])
 
     @classmethod
-    def update_product(cls, product_pk, category, name, price, description, size, weight, stock, is_available,
-                       materials=None, images=None, images_to_delete=None):
+    def update_product(cls, product_pk, requesting_user, category, name, price, description, size, weight, stock,
+                       is_available, materials=None, images=None, images_to_delete=None, uploads=None, if_match=None):
+        """Updates the product if it has one of the if_match versions, if any, returns the updated product"""
         product_obj = cls.get_product(product_pk, True)
-        cls.update_product_materials(product_obj, materials)
-        if images_to_delete is not None:
-            cls.process_images_to_delete(product_obj, images_to_delete)
-        if images is not None:
-            ProductDAL.create_images(product_obj, images)
-        ProductDAL.update_product(product_obj, category, name, price, description, size, weight, stock, is_available)
+        with check_version(product_obj, if_match) as base_version, unit_of_work():
+            images = ImageUploadController.add_upload_images(requesting_user, images, uploads)
+            are_materials_changed = cls.update_product_materials(product_obj, materials)
+            if images_to_delete is not None:
+                cls.process_images_to_delete(product_obj, images_to_delete)
+            if images is not None:
+                ProductDAL.create_images(product_obj, images)
+            ProductDAL.update_product(product_obj, category, name, price, description, size, weight, stock,
+                                      is_available, base_version=base_version,
+                                      is_related_changed=are_materials_changed or bool(images or images_to_delete))
+        return product_obj
 
     @classmethod
     def update_product_materials(cls, product_obj, new_materials):
+        """Returns whether the materials of the product changed"""
+        current_materials = {material.name: material for material in
+                             ProductDAL.get_all_product_materials(product_obj)}
         if new_materials is None:
-            ProductDAL.delete_all_product_materials(product_obj)
-        else:
-            current_materials = {material.name: material for material in
-                                 ProductDAL.get_all_product_materials(product_obj)}
-            cls.delete_unnecessary_materials(product_obj, current_materials, new_materials)
-            cls.add_necessary_materials(product_obj, current_materials, new_materials)
+            if current_materials:
+                ProductDAL.delete_all_product_materials(product_obj)
+            return bool(current_materials)
+        cls.delete_unnecessary_materials(product_obj, current_materials, new_materials)
+        cls.add_necessary_materials(product_obj, current_materials, new_materials)
+        return set(current_materials) != set(new_materials)
 
     @classmethod
     def delete_unnecessary_materials(cls, product_obj, current_materials, new_materials):
@@ -84,12 +102,11 @@ class ProductController:
     @classmethod
     def process_images_to_delete(cls, product_obj, images_pk_to_delete):
         cls.validate_images_pk_to_delete(product_obj, images_pk_to_delete)
-        images_to_delete = [ImageController.get_image(image_pk) for image_pk in images_pk_to_delete]
-        [ImageDAL.delete_image(image) for image in images_to_delete]
+        ProductDAL.delete_images(product_obj, images_pk_to_delete)
 
     @classmethod
     def validate_images_pk_to_delete(cls, product_obj, images_pk_to_delete):
-        existing_images_pk = [obj.pk for obj in ProductDAL.get_all_product_images(product_obj)]
+        existing_images_pk = [obj.pk for obj in register_loaded(ProductDAL.get_all_product_images(product_obj))]
         if not are_all_elements_in_list(images_pk_to_delete, existing_images_pk):
             raise serializers.ValidationError({'images_to_delete': 'Image with such pk doesn\'t belong to this '
                                                                    'product or doesn\'t exist!'})
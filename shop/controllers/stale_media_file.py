@@ -0,0 +1,44 @@
+from django.db import transaction
+
+from shop.dal.image import ImageDAL
+from shop.dal.stale_media_file import StaleMediaFileDAL
+
+
+class StaleMediaFileController:
+    @classmethod
+    def sweep_batch(cls, after_pk, batch_size):
+        """
+        Removes the files of one batch of stale media files from the storage. Returns the primary key of the last
+        processed stale file (None if there were none), the number of removed files and the names of files that
+        couldn't be removed. Those stay scheduled and are retried by the next sweep.
+        """
+        storage = ImageDAL.get_storage()
+        with transaction.atomic():
+            stale_files = list(StaleMediaFileDAL.get_batch(after_pk, batch_size))
+            if not stale_files:
+                return None, 0, []
+            # a file can still be used by another image, e.g. one copied in the admin
+            referenced_names = ImageDAL.get_referenced_image_names([stale_file.name for stale_file in stale_files])
+            removed_pks, failed_names = [], []
+            for stale_file in stale_files:
+                try:
+                    if stale_file.name not in referenced_names:
+                        storage.delete(stale_file.name)
+                except OSError:
+                    failed_names.append(stale_file.name)
+                else:
+                    removed_pks.append(stale_file.pk)
+            StaleMediaFileDAL.delete_stale_media_files(removed_pks)
+        return stale_files[-1].pk, len(removed_pks), failed_names
+
+    @classmethod
+    def sweep(cls, batch_size, max_batches=None):
+        after_pk, removed_count, failed_names, batch_count = 0, 0, [], 0
+        while max_batches is None or batch_count < max_batches:
+            after_pk, batch_removed_count, batch_failed_names = cls.sweep_batch(after_pk, batch_size)
+            if after_pk is None:
+                break
+            removed_count += batch_removed_count
+            failed_names.extend(batch_failed_names)
+            batch_count += 1
+        return removed_count, failed_names
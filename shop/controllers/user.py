@@ -29,20 +29,20 @@ class UserController:
             raise Http404
 
     @classmethod
-    def update_user(cls, user_pk, requesting_user, username, is_staff, is_superuser, is_active, password,
+    def update_user(cls, user_obj, requesting_user, username, is_staff, is_superuser, is_active, password,
                     phone_number='', first_name='', last_name='', email=''):
         settings = cls.compute_superuser_settings(requesting_user, is_staff, is_superuser, is_active)
-        UserDAL.update_user(cls.get_user(user_pk), username, settings.is_staff, settings.is_superuser,
+        UserDAL.update_user(user_obj, username, settings.is_staff, settings.is_superuser,
                             settings.is_active, password, phone_number, first_name, last_name, email)
 
     @classmethod
-    def delete_user(cls, user_pk):
-        UserDAL.delete_user(cls.get_user(user_pk))
+    def delete_user(cls, user_obj):
+        UserDAL.delete_user(user_obj)
 
     @classmethod
-    def check_username_field(cls, user_pk, serializer):
+    def check_username_field(cls, user_obj, serializer):
         username = serializer.initial_data.get('username', None)
-        if cls.get_user(user_pk).username == username:
+        if user_obj.username == username:
             cls.remove_username_unique_validator(serializer.fields)
 
     @classmethod
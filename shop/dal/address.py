@@ -1,3 +1,5 @@
+from shop.dal.analytics import AnalyticsDAL
+from shop.dal.unit_of_work import delete_object, get_or_load, save_object, set_fields
 from shop.models import Address
 
 
@@ -17,20 +19,16 @@ class AddressDAL:
 
     @classmethod
     def get_address_by_pk(cls, address_pk):
-        return Address.objects.get(pk=address_pk)
+        return get_or_load(Address, address_pk, lambda: Address.objects.get(pk=address_pk))
 
     @classmethod
     def update_address(cls, address_obj: Address, country, region, city, street, house_number, flat_number,
                        postal_code):
-        address_obj.country = country
-        address_obj.region = region
-        address_obj.city = city
-        address_obj.street = street
-        address_obj.house_number = house_number
-        address_obj.flat_number = flat_number
-        address_obj.postal_code = postal_code
-        return address_obj.save()
+        changed_fields = set_fields(address_obj, country=country, region=region, city=city, street=street,
+                                    house_number=house_number, flat_number=flat_number, postal_code=postal_code)
+        return save_object(address_obj, update_fields=changed_fields)
 
     @classmethod
     def delete_address(cls, address):
-        return address.delete()
+        AnalyticsDAL.mark_order_days_stale(address.orders.all())  # the orders are deleted with the address
+        return delete_object(address)
@@ -0,0 +1,105 @@
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from shop.dal.rollup_watermark import RollupWatermarkDAL
+from shop.models import DailyOrders, DailyProductSales, Order, OrderItem, StaleSalesDay
+
+SALES_ROLLUP_NAME = 'sales'
+ROLLUP_DAYS_BATCH_SIZE = 31  # days recomputed per query, bounds the number of order items read at once
+
+
+class AnalyticsDAL:
+    @classmethod
+    def refresh_sales_rollups(cls, full=False):
+        """
+        Recomputes the daily rollups of the days that have orders updated since the previous refresh and of the stale
+        days (whose orders were deleted), or of all the days if full. Recomputing a day again is harmless. Returns how
+        many days are recomputed.
+        """
+        with transaction.atomic():
+            watermark = RollupWatermarkDAL.lock_watermark(SALES_ROLLUP_NAME)
+            refreshed_at = timezone.now()
+            changes_start = RollupWatermarkDAL.get_changes_start(watermark)
+            orders = Order.objects.all()
+            if full:
+                DailyProductSales.objects.all().delete()
+                DailyOrders.objects.all().delete()
+            elif changes_start is not None:
+                orders = orders.filter(updated_at__gte=changes_start)
+            stale_days = list(StaleSalesDay.objects.values_list('date', flat=True))
+            days = sorted(set(orders.order_by().dates('created_at', 'day')).union(stale_days))
+            for start in range(0, len(days), ROLLUP_DAYS_BATCH_SIZE):
+                cls.rollup_days(days[start:start + ROLLUP_DAYS_BATCH_SIZE])
+            StaleSalesDay.objects.filter(date__in=stale_days).delete()
+            watermark.updated_before = refreshed_at
+            watermark.save()
+        return len(days)
+
+    @classmethod
+    def rollup_days(cls, days):
+        DailyProductSales.objects.filter(date__in=days).delete()
+        DailyOrders.objects.filter(date__in=days).delete()
+        product_sales = OrderItem.objects.filter(cls.get_days_filter('order__created_at', days)).order_by() \
+            .values('product', date=TruncDate('order__created_at'), is_paid=F('order__is_paid')) \
+            .annotate(order_count=Count('order', distinct=True), units=Sum('quantity'),
+                      revenue=Sum(ExpressionWrapper(F('quantity') * F('product__price'),
+                                                    output_field=DecimalField(max_digits=14, decimal_places=2))))
+        DailyProductSales.objects.bulk_create(DailyProductSales(product_id=row.pop('product'), **row)
+                                              for row in product_sales)
+        orders = Order.objects.filter(cls.get_days_filter('created_at', days)).order_by() \
+            .values('is_paid', date=TruncDate('created_at')).annotate(order_count=Count('pk'))
+        DailyOrders.objects.bulk_create(DailyOrders(**row) for row in orders)
+
+    @classmethod
+    def get_days_filter(cls, field_name, days):
+        """Ranges of the days over a datetime field, unlike the __date lookup they can use an index of the field"""
+        days_filter = Q()
+        for day in days:
+            start = timezone.make_aware(datetime.combine(day, time.min))
+            days_filter |= Q(**{f'{field_name}__gte': start, f'{field_name}__lt': start + timedelta(days=1)})
+        return days_filter
+
+    @classmethod
+    def mark_days_stale(cls, days):
+        """
+        Marks the days stale, so the next refresh recomputes them. Called with the days of the orders that are about to
+        be deleted, deleted orders can't be found by updated_at.
+        """
+        StaleSalesDay.objects.bulk_create([StaleSalesDay(date=day) for day in days], ignore_conflicts=True)
+
+    @classmethod
+    def mark_order_days_stale(cls, orders):
+        cls.mark_days_stale(orders.order_by().dates('created_at', 'day'))
+
+    @classmethod
+    def get_product_sales(cls, start, end, is_paid=None):
+        sales = DailyProductSales.objects.filter(date__gte=start, date__lte=end)
+        if is_paid is not None:
+            sales = sales.filter(is_paid=is_paid)
+        return sales.order_by()
+
+    @classmethod
+    def get_daily_revenue(cls, start, end, is_paid=None):
+        return cls.get_product_sales(start, end, is_paid).values('date') \
+            .annotate(units=Sum('units'), revenue=Sum('revenue')).order_by('date')
+
+    @classmethod
+    def get_sales_by_product(cls, start, end, is_paid=None, limit=None):
+        return cls.get_product_sales(start, end, is_paid).values('product', name=F('product__name')) \
+            .annotate(units=Sum('units'), revenue=Sum('revenue')).order_by('-revenue', 'product')[:limit]
+
+    @classmethod
+    def get_sales_by_category(cls, start, end, is_paid=None):
+        return cls.get_product_sales(start, end, is_paid) \
+            .values(category=F('product__category'), name=F('product__category__name')) \
+            .annotate(units=Sum('units'), revenue=Sum('revenue')).order_by('-revenue', 'category')
+
+    @classmethod
+    def get_daily_orders(cls, start, end):
+        return DailyOrders.objects.filter(date__gte=start, date__lte=end).order_by('date').values('date') \
+            .annotate(paid=Coalesce(Sum('order_count', filter=Q(is_paid=True)), Value(0)),
+                      unpaid=Coalesce(Sum('order_count', filter=Q(is_paid=False)), Value(0)))
@@ -0,0 +1,91 @@
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from shop.exceptions import CartBusy
+
+MAX_QUANTITY = 32767  # the largest OrderItem.quantity
+CART_LOCK_TIMEOUT = 5  # seconds, a lock of a crashed request is released after it
+CART_LOCK_WAIT = 1  # seconds a request waits for a locked cart
+CART_LOCK_POLL_INTERVAL = 0.01
+
+
+class CartDAL:
+    """
+    Carts of the users are kept in the cache (see CACHES in the settings), not in the database. A cart is one cache
+    entry, a dict of product pks to quantities, which expires CART_TIMEOUT seconds after its last change. The cache
+    has no atomic operations on dicts, so every change reads and writes the cart under a short lock of its own.
+    """
+    @classmethod
+    def get_cart_key(cls, user_pk):
+        return f'cart:{user_pk}'
+
+    @classmethod
+    def get_cart(cls, user_pk):
+        return cache.get(cls.get_cart_key(user_pk), {})
+
+    @classmethod
+    @contextmanager
+    def lock_cart(cls, user_pk, until_commit=False):
+        """
+        Locks the cart of the user for the block, raises CartBusy if another request doesn't release it in time. With
+        until_commit the lock is held until the current transaction is committed, if the block succeeds, e.g. for a
+        checkout that empties the cart on commit. A transaction rolled back later leaves the lock to time out.
+        """
+        lock_key, token = f'{cls.get_cart_key(user_pk)}:lock', uuid.uuid4().hex
+        deadline = time.monotonic() + CART_LOCK_WAIT
+        while not cache.add(lock_key, token, CART_LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                raise CartBusy
+            time.sleep(CART_LOCK_POLL_INTERVAL)
+        try:
+            yield
+        except BaseException:
+            cls.unlock_cart(lock_key, token)
+            raise
+        if until_commit:
+            transaction.on_commit(lambda: cls.unlock_cart(lock_key, token))
+        else:
+            cls.unlock_cart(lock_key, token)
+
+    @classmethod
+    def unlock_cart(cls, lock_key, token):
+        if cache.get(lock_key) == token:  # the lock may have timed out and been taken by another request
+            cache.delete(lock_key)
+
+    @classmethod
+    def save_cart(cls, user_pk, cart):
+        cache.set(cls.get_cart_key(user_pk), cart, settings.CART_TIMEOUT)
+        return cart
+
+    @classmethod
+    def add_to_cart(cls, user_pk, product_pk, quantity, max_items):
+        """
+        Adds quantity units of the product to the cart, returns the cart or None if the product isn't in the cart and
+        the cart already has max_items products
+        """
+        with cls.lock_cart(user_pk):
+            cart = cls.get_cart(user_pk)
+            if product_pk not in cart and len(cart) >= max_items:
+                return None
+            cart[product_pk] = min(cart.get(product_pk, 0) + quantity, MAX_QUANTITY)
+            return cls.save_cart(user_pk, cart)
+
+    @classmethod
+    def set_cart_quantity(cls, user_pk, product_pk, quantity):
+        """Sets the quantity of the product in the cart, 0 removes the product. Returns the cart"""
+        with cls.lock_cart(user_pk):
+            cart = cls.get_cart(user_pk)
+            if quantity:
+                cart[product_pk] = quantity
+            else:
+                cart.pop(product_pk, None)
+            return cls.save_cart(user_pk, cart)
+
+    @classmethod
+    def delete_cart(cls, user_pk):
+        cache.delete(cls.get_cart_key(user_pk))
@@ -1,3 +1,4 @@
+from shop.dal.unit_of_work import delete_object, get_or_load, save_object, set_fields
 from shop.models import Category
 
 
@@ -12,14 +13,13 @@ class CategoryDAL:
 
     @classmethod
     def get_category_by_pk(cls, category_pk):
-        return Category.objects.get(pk=category_pk)
+        return get_or_load(Category, category_pk, lambda: Category.objects.get(pk=category_pk))
 
     @classmethod
     def update_category(cls, category_obj: Category, name, parent_category=None):
-        category_obj.name = name
-        category_obj.parent_category = parent_category
-        return category_obj.save()
+        changed_fields = set_fields(category_obj, name=name, parent_category=parent_category)
+        return save_object(category_obj, update_fields=changed_fields)
 
     @classmethod
     def delete_category(cls, category):
-        return category.delete()
+        return delete_object(category)
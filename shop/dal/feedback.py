@@ -1,4 +1,9 @@
+from django.db.models import F
+from django.utils.timezone import now
+
 from shop.dal.image import ImageDAL
+from shop.dal.product import ProductDAL
+from shop.dal.unit_of_work import delete_object, forget_pks, get_or_load, run_after_write, save_object, set_fields
 from shop.models import Feedback
 
 
@@ -14,34 +19,65 @@ class FeedbackDAL:
     def get_moderated_feedback(cls):
         return Feedback.moderated_feedback.all()
 
+    @classmethod
+    def get_product_feedback(cls, product):
+        return Feedback.moderated_feedback.filter(product=product).select_related('author').prefetch_related('images')
+
+    @classmethod
+    def get_moderation_queue(cls):
+        return Feedback.objects.filter(is_moderated=False, is_rejected=False).select_related('author', 'product') \
+            .prefetch_related('images')
+
+    @classmethod
+    def get_feedback_product_pks(cls, feedback_pks):
+        return set(Feedback.objects.filter(pk__in=feedback_pks).values_list('product', flat=True))
+
+    @classmethod
+    def set_moderation(cls, feedback_pks, is_approved):
+        """Approves or rejects the feedback with one UPDATE, returns the number of changed rows"""
+        updated_count = Feedback.objects.filter(pk__in=feedback_pks).update(
+            is_moderated=is_approved, is_rejected=not is_approved, updated_at=now(), version=F('version') + 1)
+        forget_pks(Feedback, feedback_pks)  # the loaded feedback has the old values
+        return updated_count
+
     @classmethod
     def get_feedback_by_pk(cls, feedback_pk):
-        return Feedback.moderated_feedback.get(pk=feedback_pk)
+        return get_or_load(Feedback, feedback_pk, lambda: Feedback.moderated_feedback.get(pk=feedback_pk),
+                           matches=lambda feedback: feedback.is_moderated)
 
     @classmethod
-    def update_feedback(cls, feedback, product, title, content, images=None, images_to_delete=None):
-        feedback.product = product
-        feedback.title = title
-        feedback.content = content
-        feedback.is_moderated = False
+    def update_feedback(cls, feedback, product, title, content, images=None, images_to_delete=None, base_version=None):
+        """Changed feedback, including its images, has to be moderated again"""
+        affected_product_pks = {feedback.product_id, product.pk}
+        changed_fields = set_fields(feedback, product=product, title=title, content=content)
         if images is not None:
             cls.create_images(feedback, images)
         if images_to_delete is not None:
-            for image in images_to_delete:
-                ImageDAL.delete_image(image)
-        return feedback.save()
+            cls.delete_images(feedback, images_to_delete)
+        if changed_fields or images or images_to_delete:
+            changed_fields += set_fields(feedback, is_moderated=False, is_rejected=False)
+        if not changed_fields and (images or images_to_delete):
+            changed_fields = ['updated_at']  # only the images of unmoderated feedback changed, it gets a new version
+        save_object(feedback, update_fields=changed_fields, base_version=base_version)
+        if changed_fields:
+            run_after_write(lambda: ProductDAL.refresh_feedback_aggregates(affected_product_pks))
 
     @classmethod
     def delete_feedback(cls, feedback):
-        return feedback.delete()
+        product_pk = feedback.product_id
+        delete_object(feedback)
+        run_after_write(lambda: ProductDAL.refresh_feedback_aggregates([product_pk]))
 
     @classmethod
-    def delete_images(cls, feedback):
-        [image.delete() for image in feedback.images.all()]
+    def delete_images(cls, feedback, images_pk=None):
+        images = feedback.images.all()
+        if images_pk is not None:
+            images = images.filter(pk__in=images_pk)
+        ImageDAL.delete_images(images)
 
     @classmethod
     def create_images(cls, feedback_obj, images):
-        [feedback_obj.images.create(image=image) for image in images]
+        ImageDAL.create_images(feedback_obj, images)
 
     @classmethod
     def get_all_feedback_images(cls, feedback_obj):
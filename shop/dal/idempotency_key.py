@@ -0,0 +1,33 @@
+from django.db import IntegrityError, transaction
+
+from shop.models import IdempotencyKey
+
+
+class IdempotencyKeyDAL:
+    @classmethod
+    def claim_key(cls, user, key, fingerprint):
+        """
+        Inserts the key of the user and returns (the key, True) or returns (the saved key, False) if the user has
+        already used it. The insert of a key whose transaction isn't committed yet waits for that transaction on
+        PostgreSQL, so a concurrent retry gets the saved response rather than running the request again.
+        """
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(user=user, key=key, fingerprint=fingerprint), True
+        except IntegrityError:
+            return IdempotencyKey.objects.get(user=user, key=key), False
+
+    @classmethod
+    def save_response(cls, idempotency_key, status_code, response_data):
+        idempotency_key.status_code = status_code
+        idempotency_key.response_data = response_data
+        idempotency_key.save(update_fields=('status_code', 'response_data'))
+
+    @classmethod
+    def delete_keys_created_before(cls, created_before):
+        """Returns how many keys are deleted"""
+        return IdempotencyKey.objects.filter(created_at__lt=created_before).delete()[0]
+
+    @classmethod
+    def delete_key(cls, idempotency_key):
+        idempotency_key.delete()
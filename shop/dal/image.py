@@ -1,3 +1,7 @@
+from django.db import transaction
+
+from shop.dal.stale_media_file import StaleMediaFileDAL
+from shop.dal.unit_of_work import create_objects, delete_object, forget_pks, get_or_load, save_object, set_fields
 from shop.models import Image
 
 
@@ -6,6 +10,13 @@ class ImageDAL:
     def create_image(cls, image, content_type, object_id):
         return Image(image=image, content_type=content_type, object_id=object_id)
 
+    @classmethod
+    def create_images(cls, content_object, images):
+        image_objects = [Image(image=image, content_object=content_object) for image in images]
+        for image_obj in image_objects:
+            image_obj.set_tip()  # bulk inserts don't call Image.save()
+        create_objects(image_objects)
+
     @classmethod
     def save_image(cls, image_obj):
         image_obj.save()
@@ -16,15 +27,47 @@ class ImageDAL:
 
     @classmethod
     def get_image_by_pk(cls, image_pk):
-        return Image.objects.get(pk=image_pk)
+        return get_or_load(Image, image_pk, lambda: Image.objects.get(pk=image_pk))
 
     @classmethod
     def update_image(cls, image_obj: Image, image, content_type, object_id):
-        image_obj.image = image
-        image_obj.content_type = content_type
-        image_obj.object_id = object_id
-        return image_obj.save()
+        return save_object(image_obj, update_fields=set_fields(image_obj, image=image, content_type=content_type,
+                                                               object_id=object_id))
 
     @classmethod
     def delete_image(cls, image):
-        return image.delete()
+        StaleMediaFileDAL.schedule_removal([image.image.name])
+        return delete_object(image)
+
+    @classmethod
+    def delete_images(cls, images):
+        """
+        Deletes the images of the queryset with one SELECT and one DELETE and schedules removal of their files from the
+        storage.
+        """
+        with transaction.atomic():
+            image_pks, image_names = [], []
+            for image_pk, image_name in images.values_list('pk', 'image'):
+                image_pks.append(image_pk)
+                image_names.append(image_name)
+            if not image_pks:
+                return
+            Image.objects.filter(pk__in=image_pks).delete()
+            forget_pks(Image, image_pks)
+            StaleMediaFileDAL.schedule_removal(image_names)
+
+    @classmethod
+    def get_referenced_image_names(cls, names):
+        return set(Image.objects.filter(image__in=names).values_list('image', flat=True))
+
+    @classmethod
+    def get_image_count(cls):
+        return Image.objects.count()
+
+    @classmethod
+    def iter_image_names(cls, chunk_size):
+        return Image.objects.order_by().values_list('image', flat=True).iterator(chunk_size=chunk_size)
+
+    @classmethod
+    def get_storage(cls):
+        return Image._meta.get_field('image').storage
@@ -0,0 +1,50 @@
+from django.utils import timezone
+
+from shop.dal.unit_of_work import get_or_load
+from shop.models import ImageUpload
+
+
+class ImageUploadDAL:
+    @classmethod
+    def insert_upload(cls, owner, file_name, size):
+        return ImageUpload.objects.create(owner=owner, file_name=file_name, size=size)
+
+    @classmethod
+    def get_upload_by_pk(cls, upload_pk):
+        return get_or_load(ImageUpload, upload_pk, lambda: ImageUpload.objects.get(pk=upload_pk))
+
+    @classmethod
+    def lock_upload(cls, upload):
+        """Locks the row of the upload until the end of the transaction and refreshes the upload from it"""
+        locked_upload = ImageUpload.objects.select_for_update().get(pk=upload.pk)
+        upload.received_size, upload.is_complete = locked_upload.received_size, locked_upload.is_complete
+        return upload
+
+    @classmethod
+    def get_uploads_updated_before(cls, updated_before):
+        return ImageUpload.objects.filter(updated_at__lt=updated_before)
+
+    @classmethod
+    def get_complete_owner_uploads(cls, owner, upload_pks):
+        return ImageUpload.objects.filter(owner=owner, pk__in=upload_pks, is_complete=True)
+
+    @classmethod
+    def get_received_size(cls, upload):
+        return ImageUpload.objects.filter(pk=upload.pk).values_list('received_size', flat=True).first()
+
+    @classmethod
+    def advance_received_size(cls, upload, start, received_size):
+        """
+        Moves received_size of the upload from start to received_size with one UPDATE, if it's still at start. Returns
+        whether it's moved.
+        """
+        is_complete = received_size == upload.size
+        updated_count = ImageUpload.objects.filter(pk=upload.pk, received_size=start) \
+            .update(received_size=received_size, is_complete=is_complete, updated_at=timezone.now())
+        if updated_count:
+            upload.received_size, upload.is_complete = received_size, is_complete
+        return bool(updated_count)
+
+    @classmethod
+    def delete_uploads(cls, uploads):
+        ImageUpload.objects.filter(pk__in=[upload.pk for upload in uploads]).delete()
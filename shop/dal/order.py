@@ -1,3 +1,8 @@
+from django.db.models import F
+from django.utils import timezone
+
+from shop.dal.analytics import AnalyticsDAL
+from shop.dal.unit_of_work import delete_object, forget_pks, get_loaded, get_or_load, save_object, set_fields
 from shop.models import Order
 
 
@@ -14,15 +19,51 @@ class OrderDAL:
     def get_user_orders(cls, user_pk):
         return Order.objects.filter(user_id=user_pk)
 
+    @classmethod
+    def with_output_relations(cls, orders):
+        """
+        The orders with the relations OrderOutputSerializer reads, loaded with a query per relation for all the orders
+        rather than with queries per order. The user and address of an order are nested with their own orders.
+        """
+        def product_lookups(prefix):
+            return [f'{prefix}__category', f'{prefix}__materials', f'{prefix}__images']
+
+        return orders.select_related('user', 'address').prefetch_related(
+            *product_lookups('order_items__product'),
+            *product_lookups('address__orders__order_items__product'),
+            *product_lookups('user__addresses__orders__order_items__product'),
+            *product_lookups('user__orders__order_items__product'),
+            *product_lookups('user__orders__address__orders__order_items__product'),
+            *product_lookups('user__feedback__product'),
+            'user__feedback__images',
+        )
+
     @classmethod
     def get_order_by_pk(cls, order_pk):
-        return Order.objects.get(pk=order_pk)
+        return get_or_load(Order, order_pk, lambda: Order.objects.get(pk=order_pk))
+
+    @classmethod
+    def update_order(cls, order_obj: Order, address, base_version=None):
+        return save_object(order_obj, update_fields=set_fields(order_obj, address=address), base_version=base_version)
+
+    @classmethod
+    def mark_orders_paid(cls, orders):
+        """Marks the unpaid orders of the queryset as paid with one UPDATE, returns how many orders are marked"""
+        updated_count = orders.filter(is_paid=False).update(is_paid=True, updated_at=timezone.now(),
+                                                            version=F('version') + 1)
+        forget_pks(Order, list(get_loaded(Order)))  # which of the loaded orders are updated isn't known
+        return updated_count
 
     @classmethod
-    def update_order(cls, order_obj: Order, address):
-        order_obj.address = address
-        return order_obj.save()
+    def touch_orders(cls, order_pks):
+        """
+        Sets updated_at of the orders whose items changed, so the sales rollups of their days are refreshed, and a new
+        version, as the items are a part of the order in the API
+        """
+        Order.objects.filter(pk__in=order_pks).update(updated_at=timezone.now(), version=F('version') + 1)
+        forget_pks(Order, order_pks)
 
     @classmethod
     def delete_order(cls, order):
-        return order.delete()
+        AnalyticsDAL.mark_days_stale([timezone.localdate(order.created_at)])
+        return delete_object(order)
@@ -1,10 +1,20 @@
+from shop.dal.order import OrderDAL
+from shop.dal.unit_of_work import delete_object, get_or_load, run_after_write, save_object, set_fields
 from shop.models import OrderItem
 
 
 class OrderItemDAL:
     @classmethod
     def insert_order_item(cls, product, order, quantity):
-        return OrderItem.objects.create(product=product, order=order, quantity=quantity)
+        order_item = OrderItem.objects.create(product=product, order=order, quantity=quantity)
+        OrderDAL.touch_orders([order.pk])
+        return order_item
+
+    @classmethod
+    def insert_order_items(cls, order, product_quantities):
+        """Creates the items of a new order with one INSERT, the order is new, so there is no need to touch it"""
+        return OrderItem.objects.bulk_create(OrderItem(product=product, order=order, quantity=quantity)
+                                             for product, quantity in product_quantities)
 
     @classmethod
     def get_all_order_items(cls):
@@ -12,15 +22,18 @@ class OrderItemDAL:
 
     @classmethod
     def get_order_item_by_pk(cls, order_item_pk):
-        return OrderItem.objects.get(pk=order_item_pk)
+        return get_or_load(OrderItem, order_item_pk, lambda: OrderItem.objects.get(pk=order_item_pk))
 
     @classmethod
     def update_order_item(cls, order_item_obj: OrderItem, product, order, quantity):
-        order_item_obj.product = product
-        order_item_obj.order = order
-        order_item_obj.quantity = quantity
-        return order_item_obj.save()
+        order_pks = {order_item_obj.order_id, order.pk}
+        changed_fields = set_fields(order_item_obj, product=product, order=order, quantity=quantity)
+        save_object(order_item_obj, update_fields=changed_fields)
+        if changed_fields:
+            run_after_write(lambda: OrderDAL.touch_orders(order_pks))
 
     @classmethod
     def delete_order_item(cls, order_item):
-        return order_item.delete()
+        order_pk = order_item.order_id
+        delete_object(order_item)
+        run_after_write(lambda: OrderDAL.touch_orders([order_pk]))
@@ -1,5 +1,19 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
+
+from shop.cache import invalidate_products
 from shop.dal.image import ImageDAL
-from shop.models import Product
+from shop.dal.unit_of_work import delete_object, forget_pks, get_loaded, get_or_load, run_after_write, save_object, \
+    set_fields
+from shop.models import Feedback, Product
+
+# written only by ProductDAL.refresh_feedback_aggregates, saves of products must not overwrite them with stale values
+FEEDBACK_AGGREGATE_FIELDS = ('feedback_count', 'last_feedback_at')
+MAX_STOCK = 32767  # the largest value of PositiveSmallIntegerField
 
 
 class ProductDAL:
@@ -19,11 +33,16 @@ class ProductDAL:
 
     @classmethod
     def get_available_product_by_pk(cls, product_pk):
-        return Product.objects.get(pk=product_pk, is_available=True)
+        return get_or_load(Product, product_pk, lambda: Product.objects.get(pk=product_pk, is_available=True),
+                           matches=lambda product: product.is_available)
+
+    @classmethod
+    def get_available_products_by_pks(cls, product_pks):
+        return Product.available_products.in_bulk(product_pks)
 
     @classmethod
     def get_any_product_by_pk(cls, product_pk):
-        return Product.objects.get(pk=product_pk)
+        return get_or_load(Product, product_pk, lambda: Product.objects.get(pk=product_pk))
 
     @classmethod
     def insert_product(cls, category, name, price, description, size, weight, stock, is_available):
@@ -32,27 +51,67 @@ class ProductDAL:
 
     @classmethod
     def create_images(cls, product_obj, images):
-        [product_obj.images.create(image=image) for image in images]
+        ImageDAL.create_images(product_obj, images)
 
     @classmethod
-    def update_product(cls, product_obj, category, name, price, description, size, weight, stock, is_available):
-        product_obj.category = category
-        product_obj.name = name
-        product_obj.price = price
-        product_obj.description = description
-        product_obj.size = size
-        product_obj.weight = weight
-        product_obj.stock = stock
-        product_obj.is_available = is_available
-        return product_obj.save()
+    def update_product(cls, product_obj, category, name, price, description, size, weight, stock, is_available,
+                       base_version=None, is_related_changed=False):
+        """
+        With is_related_changed (the materials or images of the product changed) the product is written and gets a new
+        version even if its own fields are the same, as they are a part of it in the API
+        """
+        changed_fields = set_fields(product_obj, category=category, name=name, price=price, description=description,
+                                    size=size, weight=weight, stock=stock, is_available=is_available)
+        if is_related_changed and not changed_fields:
+            changed_fields = ['updated_at']
+        save_object(product_obj, update_fields=changed_fields, base_version=base_version)
+        # the materials and images of the product may have changed, even if the product didn't
+        run_after_write(lambda: invalidate_products([product_obj.pk]))
+
+    @classmethod
+    def get_product_update_fields(cls):
+        """All the fields of a product that its save may write, i.e. without the feedback aggregates"""
+        return [field.name for field in Product._meta.concrete_fields
+                if not field.primary_key and field.name not in FEEDBACK_AGGREGATE_FIELDS]
+
+    @classmethod
+    def update_products(cls, products, **values):
+        """
+        Sets the values of all the products of the queryset with one UPDATE, which, unlike saves, doesn't set
+        updated_at by itself. The rows are locked first, so they can't change between reading the primary keys of the
+        products whose cached data is deleted and the update. Returns how many products are updated.
+        """
+        with transaction.atomic():
+            product_pks = list(products.select_for_update().values_list('pk', flat=True))
+            updated_count = products.update(**values, updated_at=timezone.now(), version=F('version') + 1)
+            invalidate_products(product_pks)
+        forget_pks(Product, product_pks)  # the loaded instances have the old values
+        return updated_count
+
+    @classmethod
+    def set_products_availability(cls, products, is_available):
+        return cls.update_products(products, is_available=is_available)
+
+    @classmethod
+    def adjust_products_price(cls, products, percent):
+        """Changes the prices of the products by percent, the database rounds them to cents"""
+        return cls.update_products(products, price=F('price') * ((100 + Decimal(percent)) / 100))
+
+    @classmethod
+    def restock_products(cls, products, quantity):
+        return cls.update_products(products, stock=Least(F('stock') + quantity, Value(MAX_STOCK)))
 
     @classmethod
     def get_all_product_images(cls, product_obj):
         return product_obj.images.all()
 
     @classmethod
-    def delete_images(cls, product):
-        [ImageDAL.delete_image(image) for image in product.images.all()]
+    def delete_images(cls, product, images_pk=None):
+        images = product.images.all()
+        if images_pk is not None:
+            images = images.filter(pk__in=images_pk)
+        ImageDAL.delete_images(images)
+        invalidate_products([product.pk])
 
     @classmethod
     def delete_all_product_materials(cls, product_obj):
@@ -64,8 +123,39 @@ class ProductDAL:
 
     @classmethod
     def delete_product(cls, product):
-        return product.delete()
+        product_pk = product.pk
+        delete_object(product)
+        run_after_write(lambda: invalidate_products([product_pk]))
 
     @classmethod
     def remove_product_material(cls, product_obj, material):
         product_obj.materials.remove(material)
+
+    @classmethod
+    def refresh_feedback_aggregates(cls, product_pks=None):
+        """
+        Recomputes the moderated feedback aggregates of the products (all of them if None) with one UPDATE. The
+        feedback of the products changed, so their cached data is deleted too, and the products already loaded in the
+        identity map get the new aggregates.
+        """
+        products = Product.objects.all()
+        if product_pks is not None:
+            products = products.filter(pk__in=[pk for pk in product_pks if pk is not None])
+        product_feedback = Feedback.moderated_feedback.filter(product=OuterRef('pk')).order_by().values('product')
+        updated_count = products.update(
+            feedback_count=Coalesce(Subquery(product_feedback.annotate(count=Count('pk')).values('count')), Value(0)),
+            last_feedback_at=Subquery(product_feedback.annotate(last=Max('created_at')).values('last')),
+        )
+        # every product of the full repair may have had wrong aggregates, so its cached data goes too
+        invalidate_products(Product.objects.values_list('pk', flat=True) if product_pks is None else product_pks)
+        cls.reload_feedback_aggregates(get_loaded(Product, product_pks))
+        return updated_count
+
+    @classmethod
+    def reload_feedback_aggregates(cls, products_by_pk):
+        if not products_by_pk:
+            return
+        aggregates = Product.objects.filter(pk__in=products_by_pk).values_list('pk', *FEEDBACK_AGGREGATE_FIELDS)
+        for pk, feedback_count, last_feedback_at in aggregates:
+            products_by_pk[pk].feedback_count = feedback_count
+            products_by_pk[pk].last_feedback_at = last_feedback_at
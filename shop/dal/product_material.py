@@ -1,3 +1,4 @@
+from shop.dal.unit_of_work import delete_object, get_or_load, save_object, set_fields
 from shop.models import ProductMaterial
 
 
@@ -12,16 +13,15 @@ class ProductMaterialDAL:
 
     @classmethod
     def get_material_by_pk(cls, material_pk):
-        return ProductMaterial.objects.get(pk=material_pk)
+        return get_or_load(ProductMaterial, material_pk, lambda: ProductMaterial.objects.get(pk=material_pk))
 
     @classmethod
     def update_material(cls, material_obj, name):
-        material_obj.name = name
-        return material_obj.save()
+        return save_object(material_obj, update_fields=set_fields(material_obj, name=name))
 
     @classmethod
     def delete_material(cls, material_obj):
-        return material_obj.delete()
+        return delete_object(material_obj)
 
     @classmethod
     def add_products(cls, material_obj, products):
@@ -0,0 +1,62 @@
+from itertools import groupby, islice
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from shop.dal.rollup_watermark import RollupWatermarkDAL
+from shop.models import OrderItem, Product, RelatedProduct
+
+RELATED_PRODUCTS_ROLLUP_NAME = 'related_products'
+PRODUCTS_BATCH_SIZE = 500  # products whose co-occurrences are counted per query
+
+
+class RelatedProductDAL:
+    @classmethod
+    def get_related_products(cls, product_pk):
+        """Available products bought most often together with the product, with one query by the unique index"""
+        return Product.available_products.filter(related_to__product=product_pk).select_related('category') \
+            .order_by('-related_to__order_count', 'pk')
+
+    @classmethod
+    def build_related_products(cls, full=False):
+        """
+        Rebuilds the related products of the products of the orders updated since the previous build, or of all the
+        products if full. The counts of a pair of products change only with the orders that have both of them, so
+        both products are rebuilt. Returns how many products are rebuilt.
+        """
+        with transaction.atomic():
+            watermark = RollupWatermarkDAL.lock_watermark(RELATED_PRODUCTS_ROLLUP_NAME)
+            built_at = timezone.now()
+            changes_start = RollupWatermarkDAL.get_changes_start(watermark)
+            order_items = OrderItem.objects.order_by()
+            if full:
+                RelatedProduct.objects.all().delete()
+            elif changes_start is not None:
+                order_items = order_items.filter(order__updated_at__gte=changes_start)
+            product_pks = sorted(set(order_items.values_list('product', flat=True).iterator()))
+            for start in range(0, len(product_pks), PRODUCTS_BATCH_SIZE):
+                cls.build_products(product_pks[start:start + PRODUCTS_BATCH_SIZE])
+            watermark.updated_before = built_at
+            watermark.save()
+        return len(product_pks)
+
+    @classmethod
+    def build_products(cls, product_pks):
+        """
+        Counts the orders of every pair of the products and the products bought with them in the database, a sparse
+        product x product matrix as a self join of the order items, and keeps RELATED_PRODUCTS_COUNT largest counts
+        per product. The rows come sorted by product, so only the kept ones are held in memory.
+        """
+        RelatedProduct.objects.filter(product__in=product_pks).delete()
+        pairs = OrderItem.objects.filter(product__in=product_pks).order_by() \
+            .values('product', related=F('order__order_items__product')).filter(~Q(related=F('product'))) \
+            .annotate(order_count=Count('order', distinct=True)).order_by('product_id', '-order_count', 'related')
+        related_products = []
+        for product_pk, rows in groupby(pairs.iterator(), key=itemgetter('product')):
+            related_products.extend(
+                RelatedProduct(product_id=product_pk, related_product_id=row['related'], order_count=row['order_count'])
+                for row in islice(rows, settings.RELATED_PRODUCTS_COUNT))
+        RelatedProduct.objects.bulk_create(related_products)
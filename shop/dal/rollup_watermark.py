@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.conf import settings
+
+from shop.models import RollupWatermark
+
+
+class RollupWatermarkDAL:
+    @classmethod
+    def lock_watermark(cls, name):
+        """
+        Returns the watermark of the rollup locked till the end of the transaction, so concurrent refreshes of the
+        rollup run one after another. Its updated_before is None if the rollup was never refreshed.
+        """
+        watermark = RollupWatermark.objects.select_for_update().filter(name=name).first()
+        return watermark or RollupWatermark(name=name, updated_before=None)
+
+    @classmethod
+    def get_changes_start(cls, watermark):
+        """
+        Rows updated since this time must be rolled up again, None if all of them must. Rows of transactions committed
+        a while after they were updated are caught by looking ROLLUP_OVERLAP_SECONDS back from the watermark.
+        """
+        if watermark.updated_before is None:
+            return None
+        return watermark.updated_before - timedelta(seconds=settings.ROLLUP_OVERLAP_SECONDS)
@@ -0,0 +1,22 @@
+from django.db import connection
+
+from shop.dal.unit_of_work import create_objects
+from shop.models import StaleMediaFile
+
+
+class StaleMediaFileDAL:
+    @classmethod
+    def schedule_removal(cls, names):
+        create_objects([StaleMediaFile(name=name) for name in names if name])
+
+    @classmethod
+    def get_batch(cls, after_pk, batch_size):
+        stale_files = StaleMediaFile.objects.filter(pk__gt=after_pk).order_by('pk')
+        if connection.features.has_select_for_update_skip_locked:
+            # concurrent sweeps take different batches instead of waiting for each other
+            stale_files = stale_files.select_for_update(skip_locked=True)
+        return stale_files[:batch_size]
+
+    @classmethod
+    def delete_stale_media_files(cls, stale_file_pks):
+        StaleMediaFile.objects.filter(pk__in=stale_file_pks).delete()
@@ -0,0 +1,232 @@
+"""
+Request-scoped identity map and unit of work for the DAL.
+
+Inside an identity map scope (opened for every request by shop.middleware.IdentityMapMiddleware) a model instance is
+fetched from the database only once: later lookups by the same primary key return the very same instance.
+
+Inside a unit of work the DAL doesn't write immediately. New, changed and deleted instances are collected and written
+in batches when the unit of work ends, all in one transaction: one INSERT per model for new instances, one DELETE per
+model for deleted ones and one UPDATE per changed instance, even if it was changed several times. Functions that depend
+on those writes (e.g. recomputing denormalized data) are registered with run_after_write and run after them.
+
+The DAL sets the new values of an instance with set_fields and saves only the fields that changed, an instance without
+changes isn't written at all.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import F, FileField
+
+_identity_map = ContextVar('identity_map', default=None)
+_unit_of_work = ContextVar('unit_of_work', default=None)
+
+
+@contextmanager
+def identity_map_scope():
+    token = _identity_map.set({})
+    try:
+        yield
+    finally:
+        _identity_map.reset(token)
+
+
+def get_or_load(model, pk, load, matches=None):
+    """
+    Returns the instance of the model with the primary key from the identity map or loads it with load(). A cached
+    instance must satisfy matches(instance) if it is given (e.g. the filter of a custom manager), otherwise
+    model.DoesNotExist is raised as load() would do.
+    """
+    identity_map = _identity_map.get()
+    if identity_map is None:
+        return load()
+    key = (model, pk)
+    obj = identity_map.get(key)
+    if obj is None:
+        obj = identity_map[key] = load()
+    elif matches is not None and not matches(obj):
+        raise model.DoesNotExist
+    return obj
+
+
+def register_loaded(objects):
+    """Evaluates objects (e.g. a queryset) and returns them as a list, reusing already loaded instances."""
+    identity_map = _identity_map.get()
+    if identity_map is None:
+        return list(objects)
+    return [identity_map.setdefault((type(obj), obj.pk), obj) for obj in objects]
+
+
+def get_loaded(model, pks=None):
+    """Returns {pk: instance} of the loaded instances of the model, only of the given primary keys if pks is given"""
+    identity_map = _identity_map.get()
+    if identity_map is None:
+        return {}
+    if pks is not None:
+        pks = set(pks)
+    return {pk: obj for (obj_model, pk), obj in identity_map.items()
+            if obj_model is model and (pks is None or pk in pks)}
+
+
+def forget(obj):
+    forget_pks(type(obj), [obj.pk])
+
+
+def forget_pks(model, pks):
+    identity_map = _identity_map.get()
+    if identity_map is not None:
+        for pk in pks:
+            identity_map.pop((model, pk), None)
+
+
+class StaleObjectError(Exception):
+    """The row of the object was changed or deleted since the version the update is based on"""
+
+
+class UnitOfWork:
+    def __init__(self):
+        self.new = []
+        # (model, pk) -> (instance, fields to update or None for all of them, version the update is based on or None)
+        self.dirty = {}
+        self.deleted = []
+        self.after_flush = []
+
+    def register_new(self, objects):
+        self.new.extend(objects)
+
+    def register_dirty(self, obj, update_fields=None, base_version=None):
+        key = (type(obj), obj.pk)
+        if key in self.dirty:
+            _, registered_fields, registered_version = self.dirty[key]
+            if registered_fields is None or update_fields is None:
+                update_fields = None
+            else:
+                update_fields = {*registered_fields, *update_fields}
+            base_version = registered_version if registered_version is not None else base_version
+        self.dirty[key] = (obj, update_fields, base_version)
+
+    def register_deleted(self, obj):
+        self.dirty.pop((type(obj), obj.pk), None)
+        self.deleted.append(obj)
+
+    def flush(self):
+        for model, objects in self.group_by_model(self.deleted).items():
+            model._base_manager.filter(pk__in=[obj.pk for obj in objects]).delete()
+        for model, objects in self.group_by_model(self.new).items():
+            model._base_manager.bulk_create(objects)
+        for obj, update_fields, base_version in self.dirty.values():
+            write_object(obj, update_fields, base_version)
+        after_flush = self.after_flush
+        self.new, self.dirty, self.deleted, self.after_flush = [], {}, [], []
+        for func in after_flush:
+            func()
+
+    @classmethod
+    def group_by_model(cls, objects):
+        objects_by_model = defaultdict(list)
+        for obj in objects:
+            objects_by_model[type(obj)].append(obj)
+        return objects_by_model
+
+
+@contextmanager
+def unit_of_work():
+    """Opens a unit of work in a transaction or joins the current one."""
+    current_unit_of_work = _unit_of_work.get()
+    if current_unit_of_work is not None:
+        yield current_unit_of_work
+        return
+    current_unit_of_work = UnitOfWork()
+    token = _unit_of_work.set(current_unit_of_work)
+    try:
+        with transaction.atomic():
+            yield current_unit_of_work
+            current_unit_of_work.flush()
+    finally:
+        _unit_of_work.reset(token)
+
+
+def create_objects(objects):
+    current_unit_of_work = _unit_of_work.get()
+    if current_unit_of_work is not None:
+        current_unit_of_work.register_new(objects)
+    else:
+        for model, model_objects in UnitOfWork.group_by_model(objects).items():
+            model._base_manager.bulk_create(model_objects)
+
+
+def set_fields(obj, **values):
+    """
+    Sets the fields of the object to the values, returns the names of the fields whose values changed. Related objects
+    are compared by primary key and files by identity, as a new upload may have the name of the stored file.
+    """
+    changed_fields = []
+    for name, value in values.items():
+        field = obj._meta.get_field(name)
+        if field.is_relation:
+            is_changed = getattr(obj, field.attname) != (None if value is None else value.pk)
+        elif isinstance(field, FileField):
+            is_changed = getattr(obj, name) is not value
+        else:
+            is_changed = getattr(obj, name) != value
+        if is_changed:
+            setattr(obj, name, value)
+            changed_fields.append(name)
+    return changed_fields
+
+
+def get_auto_now_fields(model):
+    return [field.name for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+
+
+def save_object(obj, update_fields=None, base_version=None):
+    """
+    Saves the changed object, only update_fields (with auto_now fields such as updated_at) if they are given or
+    nothing if they are empty. With base_version (of a VersionedModel) the row is updated only if it still has that
+    version, otherwise StaleObjectError is raised, when the unit of work is written if there is one.
+    """
+    if update_fields is not None:
+        if not update_fields:
+            return
+        update_fields = {*update_fields, *get_auto_now_fields(type(obj))}
+    current_unit_of_work = _unit_of_work.get()
+    if current_unit_of_work is not None:
+        current_unit_of_work.register_dirty(obj, update_fields, base_version)
+    else:
+        write_object(obj, update_fields, base_version)
+
+
+def write_object(obj, update_fields, base_version):
+    if base_version is None:
+        obj.save(update_fields=update_fields)
+        return
+
+    # UPDATE ... SET ..., version = version + 1 WHERE id = pk AND version = base_version, no lock is taken
+    fields = [field for field in obj._meta.concrete_fields if not field.primary_key and field.name != 'version' and
+              (update_fields is None or field.name in update_fields)]
+    values = {field.attname: field.pre_save(obj, add=False) for field in fields}  # pre_save sets auto_now fields
+    updated_count = type(obj)._base_manager.filter(pk=obj.pk, version=base_version) \
+        .update(**values, version=F('version') + 1)
+    if not updated_count:
+        forget(obj)  # the loaded instance has changes that aren't written
+        raise StaleObjectError(f'{type(obj).__name__} {obj.pk} has changed since version {base_version}')
+    obj.version = base_version + 1
+
+
+def run_after_write(func):
+    """Runs func after the writes of the current unit of work or right away if there is none"""
+    current_unit_of_work = _unit_of_work.get()
+    if current_unit_of_work is not None:
+        current_unit_of_work.after_flush.append(func)
+    else:
+        func()
+
+
+def delete_object(obj):
+    forget(obj)
+    current_unit_of_work = _unit_of_work.get()
+    if current_unit_of_work is not None:
+        current_unit_of_work.register_deleted(obj)
+    else:
+        return obj.delete()
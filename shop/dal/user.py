@@ -1,5 +1,8 @@
 from django.contrib.auth import get_user_model
 
+from shop.dal.analytics import AnalyticsDAL
+from shop.dal.unit_of_work import delete_object, get_or_load, save_object, set_fields
+
 
 class UserDAL:
     @classmethod
@@ -15,22 +18,18 @@ class UserDAL:
 
     @classmethod
     def get_user_by_pk(cls, user_pk):
-        return get_user_model().objects.get(pk=user_pk)
+        user_model = get_user_model()
+        return get_or_load(user_model, user_pk, lambda: user_model.objects.get(pk=user_pk))
 
     @classmethod
     def update_user(cls, user_obj, username, is_staff, is_superuser, is_active, password, phone_number,
                     first_name, last_name, email):
-        user_obj.phone_number = phone_number
-        user_obj.username = username
-        user_obj.first_name = first_name
-        user_obj.last_name = last_name
-        user_obj.email = email
-        user_obj.is_staff = is_staff
-        user_obj.is_superuser = is_superuser
-        user_obj.is_active = is_active
-        user_obj.password = password
-        return user_obj.save()
+        changed_fields = set_fields(user_obj, phone_number=phone_number, username=username, first_name=first_name,
+                                    last_name=last_name, email=email, is_staff=is_staff, is_superuser=is_superuser,
+                                    is_active=is_active, password=password)
+        return save_object(user_obj, update_fields=changed_fields)
 
     @classmethod
     def delete_user(cls, user):
-        return user.delete()
+        AnalyticsDAL.mark_order_days_stale(user.orders.all())  # the orders are deleted with the user
+        return delete_object(user)
@@ -0,0 +1,97 @@
+"""
+PostgreSQL backend that takes connections from a per-process pool instead of opening a new one for every request.
+
+Configure the pool with the POOL key of the database settings:
+    'POOL': {'MAX_SIZE': 10, 'TIMEOUT': 10, 'HEALTH_CHECK_INTERVAL': 30}
+Keep CONN_MAX_AGE at 0, so that Django returns the connection to the pool at the end of every request.
+"""
+import os
+import threading
+from functools import partial
+
+import psycopg2.extras
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from shop.db.pool import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _forget_pools():
+    """
+    A forked process (e.g. a worker of a preforking server) must not use the connections of its parent, it opens its
+    own ones. The inherited connections are only dropped, closing them would close the parent's sessions.
+    """
+    global _pools, _pools_lock
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_pools)
+
+
+def connect(conn_params, isolation_level=None):
+    """Opens a connection the same way as the postgresql backend, but without binding it to a DatabaseWrapper"""
+    connection = base.Database.connect(**conn_params)
+    if isolation_level is not None and isolation_level != connection.isolation_level:
+        connection.set_session(isolation_level=isolation_level)
+    psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+    return connection
+
+
+def get_pool_stats():
+    return {alias: dict(pool.stats.as_dict(), idle=pool.idle_count) for alias, pool in _pools.items()}
+
+
+def is_usable(connection):
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except base.Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_pool(self):
+        pool = _pools.get(self.alias)
+        if pool is None:
+            with _pools_lock:
+                pool = _pools.get(self.alias)
+                if pool is None:
+                    pool_settings = self.settings_dict.get('POOL', {})
+                    pool = ConnectionPool(
+                        connect=partial(connect, self.get_connection_params(),
+                                        self.settings_dict['OPTIONS'].get('isolation_level')),
+                        is_usable=is_usable,
+                        max_size=pool_settings.get('MAX_SIZE', 10),
+                        timeout=pool_settings.get('TIMEOUT', 10),
+                        health_check_interval=pool_settings.get('HEALTH_CHECK_INTERVAL', 30),
+                    )
+                    _pools[self.alias] = pool
+        return pool
+
+    def get_new_connection(self, conn_params):
+        connection = self.get_pool().acquire()
+        self.isolation_level = self.settings_dict['OPTIONS'].get('isolation_level', connection.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.get_pool().release(self.connection, reusable=self.reset_connection())
+
+    def reset_connection(self):
+        """Roll back an unfinished transaction and tell whether the connection can be reused."""
+        if self.connection.closed:
+            return False
+        try:
+            if self.connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                self.connection.rollback()
+        except base.Database.Error:
+            return False
+        return True
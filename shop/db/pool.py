@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    def __init__(self, timeout):
+        self.message = f'No free connection in the pool within {timeout} s'
+        super().__init__(self.message)
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.created = 0
+        self.discarded = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, wait):
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self):
+        return {
+            'checkouts': self.checkouts,
+            'created': self.created,
+            'discarded': self.discarded,
+            'timeouts': self.timeouts,
+            'avg_wait_ms': self.total_wait * 1000 / self.checkouts if self.checkouts else 0.0,
+            'max_wait_ms': self.max_wait * 1000,
+        }
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections.
+
+    At most max_size connections are checked out at the same time, the others wait up to timeout seconds for a free
+    one. A connection that has been idle for longer than health_check_interval seconds is checked with is_usable
+    before it is handed out again and is replaced if it doesn't work anymore.
+    """
+    def __init__(self, connect, is_usable, max_size, timeout=10.0, health_check_interval=30.0):
+        self._connect = connect
+        self._is_usable = is_usable
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = deque()  # (connection, released_at), the most recently used connections are at the right end
+        self._lock = threading.Lock()
+        self.stats = PoolStats()
+
+    def acquire(self):
+        started_at = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.stats.timeouts += 1
+            raise PoolTimeout(self.timeout)
+        with self._lock:
+            self.stats.record_wait(time.monotonic() - started_at)
+        try:
+            return self._get_connection()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection, reusable=True):
+        try:
+            if reusable:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+            else:
+                self._discard(connection)
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for connection, _ in idle:
+            self._discard(connection)
+
+    @property
+    def idle_count(self):
+        return len(self._idle)
+
+    def _get_connection(self):
+        while True:
+            with self._lock:
+                connection, released_at = self._idle.pop() if self._idle else (None, None)
+            if connection is None:
+                connection = self._connect()
+                with self._lock:
+                    self.stats.created += 1
+                return connection
+            if time.monotonic() - released_at < self.health_check_interval or self._is_usable(connection):
+                return connection
+            self._discard(connection)
+
+    def _discard(self, connection):
+        with self._lock:
+            self.stats.discarded += 1
+        try:
+            connection.close()
+        except Exception:  # NOQA the connection is thrown away anyway
+            pass
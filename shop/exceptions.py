@@ -1,4 +1,47 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
 class UnhandledValueError(ValueError):
     def __init__(self, value):
         self.message = f'Unhandled value: {value} ({type(value).__name__})'
         super().__init__(self.message)
+
+
+class UploadOffsetConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_code = 'upload_offset_conflict'
+
+    def __init__(self, received_size):
+        super().__init__(f'The upload continues at byte {received_size}')
+        self.received_size = received_size
+
+
+class PayloadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Request body is too large.'
+    default_code = 'payload_too_large'
+
+
+class CartBusy(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The cart is being changed by another request, try again.'
+    default_code = 'cart_busy'
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'The Idempotency-Key was already used for another request.'
+    default_code = 'idempotency_key_reused'
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The object has changed since the version in the If-Match header.'
+    default_code = 'precondition_failed'
+
+
+class VersionConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The object was changed by another request at the same time, try again.'
+    default_code = 'version_conflict'
@@ -0,0 +1,72 @@
+"""
+Idempotency-Key header of the requests that create orders. Clients send a unique key with a request and the same key
+with its retries, e.g. after a timeout, so the order is created once, however many times the request arrives.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from shop.dal.idempotency_key import IdempotencyKeyDAL
+from shop.exceptions import IdempotencyKeyReused
+
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def get_request_fingerprint(request):
+    """SHA-256 of the method, path and parsed data, so the same data sent as another JSON text matches"""
+    data = request.data
+    if hasattr(data, 'lists'):  # QueryDict of a form
+        data = dict(data.lists())
+    payload = json.dumps([request.method, request.path, data], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def is_expired(idempotency_key):
+    return idempotency_key.created_at < timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_EXPIRE_SECONDS)
+
+
+def claim_key(user, key, fingerprint):
+    idempotency_key, is_new = IdempotencyKeyDAL.claim_key(user, key, fingerprint)
+    if not is_new and is_expired(idempotency_key):  # not swept yet, the key can be used again
+        IdempotencyKeyDAL.delete_key(idempotency_key)
+        idempotency_key, is_new = IdempotencyKeyDAL.claim_key(user, key, fingerprint)
+    return idempotency_key, is_new
+
+
+def idempotent(http_method):
+    """
+    Runs the handler of a request with an Idempotency-Key header and saves its response in one transaction. A retry
+    with the key gets the saved response with an Idempotent-Replayed header and the handler isn't run again. Reusing
+    the key for another request is refused. If the handler raises, nothing is saved and the key can be retried.
+    """
+    @wraps(http_method)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None:
+            return http_method(view, request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise serializers.ValidationError({IDEMPOTENCY_KEY_HEADER: f'Header must be from 1 to {MAX_KEY_LENGTH} '
+                                                                       f'characters long'})
+
+        fingerprint = get_request_fingerprint(request)
+        with transaction.atomic():
+            idempotency_key, is_new = claim_key(request.user, key, fingerprint)
+            if not is_new:
+                if idempotency_key.fingerprint != fingerprint:
+                    raise IdempotencyKeyReused
+                response = Response(idempotency_key.response_data, idempotency_key.status_code)
+                response[REPLAYED_HEADER] = 'true'
+                return response
+            response = http_method(view, request, *args, **kwargs)
+            IdempotencyKeyDAL.save_response(idempotency_key, response.status_code, response.data)
+        return response
+    return wrapper
@@ -0,0 +1,97 @@
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db.backends.signals import connection_created
+
+
+class Command(BaseCommand):
+    help = 'Serves the same read endpoint through a threaded WSGI worker (sync view) and an ASGI worker (async view) ' \
+           'in process and compares their throughput. --db-latency adds a delay to every query to simulate a slow ' \
+           'or remote database, --client-latency simulates a client that is slow to send its request.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=50, help='Requests in flight at the same time.')
+        parser.add_argument('--threads', type=int, default=4,
+                            help='Threads of the WSGI worker and of the ASGI worker thread pool.')
+        parser.add_argument('--db-latency', type=float, default=0, help='Milliseconds added to every query.')
+        parser.add_argument('--client-latency', type=float, default=0,
+                            help='Milliseconds a client needs to send its request.')
+        parser.add_argument('--wsgi-path', default='/products/')
+        parser.add_argument('--asgi-path', default='/async/products/')
+
+    def handle(self, *args, **options):
+        if options['db_latency']:
+            self.add_db_latency(options['db_latency'] / 1000)
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+
+        wsgi_time = self.run_wsgi(options, host)
+        asgi_time = self.run_asgi(options, host)
+        for name, elapsed in (('WSGI', wsgi_time), ('ASGI', asgi_time)):
+            self.stdout.write(f'{name}: {options["requests"]} requests in {elapsed:.3f} s, '
+                              f'{options["requests"] / elapsed:.1f} req/s')
+
+    @classmethod
+    def add_db_latency(cls, latency):
+        def delay_query(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_wrapper(sender, connection, **kwargs):
+            connection.execute_wrappers.append(delay_query)
+        connection_created.connect(add_wrapper, weak=False)
+
+    @classmethod
+    def run_wsgi(cls, options, host):
+        handler = WSGIHandler()
+
+        def request(_):
+            time.sleep(options['client_latency'] / 1000)  # the worker thread is busy reading the request meanwhile
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': options['wsgi_path'], 'QUERY_STRING': '', 'HTTP_HOST': host,
+                'SERVER_NAME': host, 'SERVER_PORT': '80', 'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http',
+            }
+            response = handler(environ, lambda status, headers: None)
+            b''.join(response)
+            response.close()
+
+        started_at = time.perf_counter()
+        # a threaded WSGI worker can't have more requests in flight than it has threads
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            list(executor.map(request, range(options['requests'])))
+        return time.perf_counter() - started_at
+
+    @classmethod
+    def run_asgi(cls, options, host):
+        handler = ASGIHandler()
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': options['asgi_path'], 'query_string': b'',
+            'headers': [(b'host', host.encode())],
+        }
+
+        async def receive():
+            await asyncio.sleep(options['client_latency'] / 1000)  # the event loop serves other requests meanwhile
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            pass
+
+        async def run():
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=options['threads']))
+            semaphore = asyncio.Semaphore(options['concurrency'])
+
+            async def request():
+                async with semaphore:
+                    await handler(scope, receive, send)
+
+            await asyncio.gather(*(request() for _ in range(options['requests'])))
+
+        started_at = time.perf_counter()
+        asyncio.run(run())
+        return time.perf_counter() - started_at
@@ -0,0 +1,34 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+
+class Command(BaseCommand):
+    help = 'Measures how long a cheap request spends on getting a database connection with the current ' \
+           'CONN_MAX_AGE and pool settings. Compare runs with DB_POOL_MAX_SIZE=0/DB_CONN_MAX_AGE=0 and without.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='How many request cycles are simulated.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to benchmark.')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        timings = []
+        for _ in range(options['requests']):
+            started_at = time.perf_counter()
+            close_old_connections()  # what Django does on request_started
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            close_old_connections()  # what Django does on request_finished
+            timings.append((time.perf_counter() - started_at) * 1000)
+        close_old_connections()
+
+        self.stdout.write(f'engine: {connection.settings_dict["ENGINE"]}, '
+                          f'CONN_MAX_AGE: {connection.settings_dict["CONN_MAX_AGE"]}')
+        self.stdout.write(f'requests: {len(timings)}, avg: {statistics.mean(timings):.3f} ms, '
+                          f'median: {statistics.median(timings):.3f} ms, max: {max(timings):.3f} ms')
+        if hasattr(connection, 'get_pool'):
+            from shop.db.backends.postgresql_pool.base import get_pool_stats
+            self.stdout.write(f'pool: {get_pool_stats()[connection.alias]}')
@@ -0,0 +1,44 @@
+import io
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from shop.models import Product
+from shop.parsers import FastJSONParser
+from shop.renderers import FastJSONRenderer, orjson
+from shop.serializers.product import ProductOutputSerializer
+
+
+class Command(BaseCommand):
+    help = 'Measures rendering and parsing of a product list payload with JSONRenderer/JSONParser of DRF and with ' \
+           'FastJSONRenderer/FastJSONParser (orjson).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1000, help='How many products the payload has.')
+        parser.add_argument('--repeat', type=int, default=20, help='How many times each step is measured.')
+
+    def handle(self, *args, **options):
+        products = Product.objects.select_related('category').prefetch_related('materials', 'images') \
+            .order_by('pk')[:options['products']]
+        data = ProductOutputSerializer(instance=products, many=True).data
+        content = JSONRenderer().render(data)
+        self.stdout.write(f'products: {len(data)}, payload: {len(content)} bytes, orjson: '
+                          f'{orjson.__version__ if orjson is not None else "not installed"}')
+        steps = (
+            ('render JSONRenderer', lambda: JSONRenderer().render(data)),
+            ('render FastJSONRenderer', lambda: FastJSONRenderer().render(data)),
+            ('parse JSONParser', lambda: JSONParser().parse(io.BytesIO(content))),
+            ('parse FastJSONParser', lambda: FastJSONParser().parse(io.BytesIO(content))),
+        )
+        for name, step in steps:
+            timings = []
+            for _ in range(options['repeat']):
+                started_at = time.perf_counter()
+                step()
+                timings.append((time.perf_counter() - started_at) * 1000)
+            self.stdout.write(f'{name}: avg {statistics.mean(timings):.3f} ms, '
+                              f'median {statistics.median(timings):.3f} ms')
+
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from shop.dal.related_product import RelatedProductDAL
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the products bought together (products/<pk>/related/) of the products of the orders changed ' \
+           'since the previous run. Run it periodically.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Rebuild the related products of all the products, e.g. after orders were deleted.')
+
+    def handle(self, *args, **options):
+        product_count = RelatedProductDAL.build_related_products(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt related products of {product_count} products'))
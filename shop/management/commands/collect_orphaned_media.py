@@ -0,0 +1,118 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shop.dal.image import ImageDAL
+from shop.tools import BloomFilter
+
+MEDIA_FOLDERS = ('product_images', 'feedback_images')
+RECHECK_BATCH_SIZE = 500
+
+
+def iter_files(path):
+    """Yields the files under path depth-first without building the whole listing in memory."""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+class RateLimiter:
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_at = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if now < self.next_at:
+            time.sleep(self.next_at - now)
+        self.next_at = max(now, self.next_at) + self.interval
+
+
+class Command(BaseCommand):
+    help = 'Finds files under the image folders of the media storage that no image references. Only reports them ' \
+           'unless --delete is given.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true', help='Delete the orphaned files.')
+        parser.add_argument('--min-age', type=float, default=24 * 60 * 60,
+                            help='Skip files modified less than MIN_AGE seconds ago, their images may not be '
+                                 'committed yet. One day by default.')
+        parser.add_argument('--rate', type=float, default=100,
+                            help='Delete at most RATE files per second, 0 for no limit.')
+        parser.add_argument('--bloom-filter', action='store_true',
+                            help='Keep the image names in a Bloom filter instead of a set to use less memory. A few '
+                                 'orphans may be missed, referenced files are never deleted.')
+        parser.add_argument('--false-positive-rate', type=float, default=0.001,
+                            help='Share of orphans the Bloom filter misses.')
+        parser.add_argument('--chunk-size', type=int, default=10000,
+                            help='How many image names are fetched from the database at once.')
+
+    def handle(self, *args, **options):
+        storage = ImageDAL.get_storage()
+        try:
+            media_root = storage.path('')
+        except NotImplementedError:
+            raise CommandError('Only a storage with files on the local file system is supported')
+
+        # names are loaded before walking the folders, and files newer than min_age are skipped, so a file uploaded
+        # while the command runs is never taken for an orphan
+        referenced_names = self.load_image_names(options)
+        modified_before = time.time() - options['min_age']
+        self.rate_limiter = RateLimiter(options['rate'])
+        checked_count, self.orphan_count, self.orphan_size = 0, 0, 0
+        candidates = {}
+        for folder in MEDIA_FOLDERS:
+            folder_path = os.path.join(media_root, folder)
+            if not os.path.isdir(folder_path):
+                continue
+            for entry in iter_files(folder_path):
+                checked_count += 1
+                name = os.path.relpath(entry.path, media_root).replace(os.sep, '/')
+                stat = entry.stat(follow_symlinks=False)
+                if name in referenced_names or stat.st_mtime > modified_before:
+                    continue
+                candidates[name] = stat.st_size
+                if len(candidates) >= RECHECK_BATCH_SIZE:
+                    self.collect_orphans(candidates, storage, options)
+                    candidates = {}
+        self.collect_orphans(candidates, storage, options)
+        action = 'Deleted' if options['delete'] else 'Found'
+        self.stdout.write(self.style.SUCCESS(f'{action} {self.orphan_count} orphaned files ({self.orphan_size} '
+                                             f'bytes) of {checked_count} checked'))
+
+    def collect_orphans(self, candidates, storage, options):
+        """
+        Reports or deletes the candidates that are still orphans. They are checked against the database once more:
+        an image may have got the file after the names were loaded, e.g. a chunked upload moved to the media storage
+        keeps its old modification time, so min_age doesn't protect it.
+        """
+        if not candidates:
+            return
+        referenced_names = ImageDAL.get_referenced_image_names(list(candidates))
+        for name, size in candidates.items():
+            if name in referenced_names:
+                continue
+            self.orphan_count += 1
+            self.orphan_size += size
+            if options['delete']:
+                self.rate_limiter.wait()
+                storage.delete(name)
+                self.stdout.write(f'Deleted {name}')
+            else:
+                self.stdout.write(f'Orphaned {name}')
+
+    @classmethod
+    def load_image_names(cls, options):
+        if options['bloom_filter']:
+            image_names = BloomFilter(ImageDAL.get_image_count(), options['false_positive_rate'])
+        else:
+            image_names = set()
+        for name in ImageDAL.iter_image_names(options['chunk_size']):
+            image_names.add(name)
+        return image_names
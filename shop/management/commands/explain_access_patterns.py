@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from shop.dal.feedback import FeedbackDAL
+from shop.dal.image import ImageDAL
+from shop.dal.order import OrderDAL
+from shop.dal.order_item import OrderItemDAL
+from shop.dal.product import ProductDAL
+from shop.models import Category, Product, User
+
+
+def get_access_patterns():
+    """Return the querysets the DAL issues on the hot read paths, keyed by a readable name."""
+    category_pk = Category.objects.values_list('pk', flat=True).first()
+    user_pk = User.objects.values_list('pk', flat=True).first()
+    product = Product.objects.first()
+
+    patterns = {
+        'available products': ProductDAL.get_available_or_category_products(None),
+        'available products of category': ProductDAL.get_available_or_category_products(category_pk),
+        'all products of category': ProductDAL.get_all_or_category_products(category_pk),
+        'moderated feedback': FeedbackDAL.get_moderated_feedback(),
+        'user orders': OrderDAL.get_user_orders(user_pk),
+        'order items': OrderItemDAL.get_all_order_items(),
+        'images': ImageDAL.get_all_images(),
+    }
+    if product is not None:
+        patterns['product images'] = ProductDAL.get_all_product_images(product)
+        patterns['product feedback page'] = \
+            FeedbackDAL.get_product_feedback(product).order_by('-created_at', '-id')[:10]
+    return patterns
+
+
+class Command(BaseCommand):
+    help = 'Prints query plans and timings of the DAL access patterns. Run it before and after applying index ' \
+           'migrations to compare them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='How many times every query is timed.')
+        parser.add_argument('--analyze', action='store_true',
+                            help='Run EXPLAIN ANALYZE (PostgreSQL only) instead of a plain EXPLAIN.')
+
+    def handle(self, *args, **options):
+        explain_options = {'analyze': True} if options['analyze'] and connection.vendor == 'postgresql' else {}
+        for name, queryset in get_access_patterns().items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write(f'avg {self.time_queryset(queryset, options["repeat"]):.3f} ms\n')
+
+    @classmethod
+    def time_queryset(cls, queryset, repeat):
+        started_at = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.all())  # .all() clones the queryset so its result cache is not reused
+        return (time.perf_counter() - started_at) * 1000 / max(repeat, 1)
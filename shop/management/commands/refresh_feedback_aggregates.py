@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from shop.dal.product import ProductDAL
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the moderated feedback aggregates of products (feedback_count, last_feedback_at) with one ' \
+           'UPDATE, e.g. after feedback was deleted together with its author.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--product', type=int, nargs='+', dest='product_pks',
+                            help='Primary keys of the products to repair. All products by default.')
+
+    def handle(self, *args, **options):
+        updated_count = ProductDAL.refresh_feedback_aggregates(options['product_pks'])
+        self.stdout.write(self.style.SUCCESS(f'Refreshed feedback aggregates of {updated_count} products'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from shop.dal.analytics import AnalyticsDAL
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the daily sales rollups of the days whose orders changed since the previous run. Run it ' \
+           'periodically, the analytics endpoints read only the rollups.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Recompute the rollups of all the days, e.g. after products were deleted in bulk.')
+
+    def handle(self, *args, **options):
+        day_count = AnalyticsDAL.refresh_sales_rollups(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f'Refreshed sales rollups of {day_count} days'))
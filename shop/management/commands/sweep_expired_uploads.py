@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from shop.controllers.image_upload import ImageUploadController
+
+
+class Command(BaseCommand):
+    help = 'Removes chunked image uploads that were abandoned, together with their files. Run it periodically (e.g. ' \
+           'from cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=float, default=None,
+                            help='Remove uploads that got no chunk for MAX_AGE seconds. IMAGE_UPLOAD_EXPIRE_SECONDS '
+                                 'by default.')
+
+    def handle(self, *args, **options):
+        max_age = options['max_age']
+        if max_age is None:
+            max_age = settings.IMAGE_UPLOAD_EXPIRE_SECONDS
+        removed_count = ImageUploadController.delete_expired_uploads(max_age)
+        self.stdout.write(f'Removed {removed_count} expired uploads')
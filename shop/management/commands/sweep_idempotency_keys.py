@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from shop.dal.idempotency_key import IdempotencyKeyDAL
+
+
+class Command(BaseCommand):
+    help = 'Removes the saved responses of idempotency keys older than IDEMPOTENCY_KEY_EXPIRE_SECONDS. Run it ' \
+           'periodically (e.g. from cron).'
+
+    def handle(self, *args, **options):
+        created_before = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_EXPIRE_SECONDS)
+        removed_count = IdempotencyKeyDAL.delete_keys_created_before(created_before)
+        self.stdout.write(f'Removed {removed_count} expired idempotency keys')
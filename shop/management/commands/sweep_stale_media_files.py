@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from shop.controllers.stale_media_file import StaleMediaFileController
+
+
+class Command(BaseCommand):
+    help = 'Removes files of deleted images from the media storage in batches. Run it periodically (e.g. from cron) ' \
+           'or keep it running with --interval.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='How many files are removed per transaction.')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop a sweep after this many batches. By default everything scheduled is swept.')
+        parser.add_argument('--interval', type=float, default=None,
+                            help='Keep running and sweep every INTERVAL seconds.')
+
+    def handle(self, *args, **options):
+        while True:
+            removed_count, failed_names = StaleMediaFileController.sweep(options['batch_size'], options['max_batches'])
+            self.stdout.write(f'Removed {removed_count} stale media files')
+            for name in failed_names:
+                self.stderr.write(f'Couldn\'t remove {name}, it will be retried')
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
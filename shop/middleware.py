@@ -0,0 +1,123 @@
+import asyncio
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+from shop.compression import compress, compress_cached, compress_sequence, is_compressible, negotiate_encoding
+from shop.dal.unit_of_work import identity_map_scope
+from shop.routers import reset_read_from_primary, set_read_from_primary
+
+PRIMARY_PIN_COOKIE_NAME = 'primary_pin'
+
+
+class RequestScopeMiddleware:
+    """
+    Base for middleware that sets up some state for the whole request in both sync and async mode. Subclasses enter
+    the state in start_request, leave it in finish_request and may change the response in process_response.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # the same way as django.utils.deprecation.MiddlewareMixin marks itself as async
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        state = self.start_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.finish_request(state)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        state = self.start_request(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.finish_request(state)
+        return self.process_response(request, response)
+
+    def start_request(self, request):
+        raise NotImplementedError
+
+    def finish_request(self, state):
+        raise NotImplementedError
+
+    def process_response(self, request, response):
+        return response
+
+
+class ReplicaRoutingMiddleware(RequestScopeMiddleware):
+    """
+    Lets safe requests read from replicas. A client that has just written something is pinned to the primary
+    database for REPLICA_PIN_SECONDS, so it always reads its own writes despite the replication lag.
+    """
+    def start_request(self, request):
+        is_pinned = request.method not in SAFE_METHODS or PRIMARY_PIN_COOKIE_NAME in request.COOKIES
+        return set_read_from_primary(is_pinned)
+
+    def finish_request(self, state):
+        reset_read_from_primary(state)
+
+    def process_response(self, request, response):
+        has_written = request.method not in SAFE_METHODS or getattr(response, 'pins_primary', False)
+        if has_written and settings.REPLICA_DATABASES:
+            response.set_cookie(PRIMARY_PIN_COOKIE_NAME, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+                                samesite='Lax')
+        return response
+
+
+class IdentityMapMiddleware(RequestScopeMiddleware):
+    """Every request gets its own identity map, see shop/dal/unit_of_work.py"""
+    def start_request(self, request):
+        scope = identity_map_scope()
+        scope.__enter__()
+        return scope
+
+    def finish_request(self, state):
+        state.__exit__(None, None, None)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses text and JSON responses with the best encoding the client accepts, see shop/compression.py. Unlike
+    django.middleware.gzip.GZipMiddleware it can write Brotli and reuses the cached compressed bodies. Bodies smaller
+    than COMPRESSION_MIN_SIZE bytes are sent as they are, compressing them costs more than it saves.
+    """
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not is_compressible(response.get('Content-Type', '')):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding', ))
+        encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_sequence(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            timeout = getattr(response, 'compressed_cache_timeout', None)
+            if timeout is None:
+                compressed_content = compress(response.content, encoding)
+            else:
+                compressed_content = compress_cached(response.content, encoding, timeout)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response['Content-Length'] = str(len(response.content))
+
+        # the compressed body isn't byte for byte the same as the original one, so its ETag can only be weak
+        if response.has_header('ETag'):
+            response['ETag'] = re.sub(r'^"', 'W/"', response['ETag'])
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.5 on 2026-10-19 17:30
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def refresh_feedback_aggregates(apps, schema_editor):
+    Feedback = apps.get_model('shop', 'Feedback')
+    Product = apps.get_model('shop', 'Product')
+    product_feedback = Feedback.objects.filter(product=OuterRef('pk'), is_moderated=True).order_by().values('product')
+    Product.objects.update(
+        feedback_count=Coalesce(Subquery(product_feedback.annotate(count=Count('pk')).values('count')), Value(0)),
+        last_feedback_at=Subquery(product_feedback.annotate(last=Max('created_at')).values('last')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0006_image_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='feedback_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='last_feedback_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(refresh_feedback_aggregates, migrations.RunPython.noop),
+    ]
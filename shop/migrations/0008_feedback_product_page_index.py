@@ -0,0 +1,17 @@
+# Generated by Django 3.2.5 on 2026-10-19 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0007_product_feedback_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(condition=models.Q(('is_moderated', True)), fields=['product', 'created_at', 'id'], name='feedback_product_page_idx'),
+        ),
+    ]
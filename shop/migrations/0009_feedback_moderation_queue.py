@@ -0,0 +1,22 @@
+# Generated by Django 3.2.5 on 2026-10-19 17:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0008_feedback_product_page_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='is_rejected',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(condition=models.Q(('is_moderated', False), ('is_rejected', False)), fields=['created_at', 'id'], name='feedback_moderation_queue_idx'),
+        ),
+    ]
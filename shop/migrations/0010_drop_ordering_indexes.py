@@ -0,0 +1,37 @@
+# Generated by Django 3.2.5 on 2026-10-19 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0009_feedback_moderation_queue'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='feedback',
+            name='feedback_ordering_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='feedback',
+            name='feedback_moderated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='orderitem',
+            name='order_item_ordering_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_ordering_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_available_idx',
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['title', 'author'], name='feedback_title_author_idx'),
+        ),
+    ]
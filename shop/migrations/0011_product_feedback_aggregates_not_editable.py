@@ -0,0 +1,23 @@
+# Generated by Django 3.2.5 on 2026-10-19 18:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0010_drop_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='feedback_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='last_feedback_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 3.2.5 on 2026-10-19 18:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0011_product_feedback_aggregates_not_editable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOrders',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('is_paid', models.BooleanField()),
+                ('order_count', models.PositiveIntegerField()),
+            ],
+            options={
+                'verbose_name_plural': 'Daily orders',
+                'ordering': ('date', 'is_paid'),
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('updated_before', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StaleSalesDay',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('is_paid', models.BooleanField()),
+                ('order_count', models.PositiveIntegerField()),
+                ('units', models.PositiveIntegerField()),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('product', models.ForeignKey(db_column='product_id', on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='shop.product')),
+            ],
+            options={
+                'verbose_name_plural': 'Daily product sales',
+                'ordering': ('date', 'product'),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyorders',
+            constraint=models.UniqueConstraint(fields=('date', 'is_paid'), name='daily_orders_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyproductsales',
+            constraint=models.UniqueConstraint(fields=('date', 'product', 'is_paid'), name='daily_product_sales_unique'),
+        ),
+    ]
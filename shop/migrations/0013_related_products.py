@@ -0,0 +1,30 @@
+# Generated by Django 3.2.5 on 2026-10-19 18:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0012_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_count', models.PositiveIntegerField()),
+                ('product', models.ForeignKey(db_column='product_id', on_delete=django.db.models.deletion.CASCADE, related_name='related_products', to='shop.product')),
+                ('related_product', models.ForeignKey(db_column='related_product_id', on_delete=django.db.models.deletion.CASCADE, related_name='related_to', to='shop.product')),
+            ],
+            options={
+                'ordering': ('product', '-order_count', 'related_product'),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='relatedproduct',
+            constraint=models.UniqueConstraint(fields=('product', 'related_product'), name='related_product_unique'),
+        ),
+    ]
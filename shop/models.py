@@ -2,7 +2,9 @@ from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Q
 
 from shop.managers import AvailableManager, ModeratedManager
 
@@ -71,14 +73,51 @@ class Image(models.Model):
 
     class Meta:
         ordering = ('content_type', 'tip')
+        indexes = [
+            models.Index(fields=('content_type', 'tip'), name='image_ordering_idx'),
+            models.Index(fields=('content_type', 'object_id'), name='image_content_object_idx'),
+        ]
 
     def __str__(self):
         return f'Image of {self.content_object}'
 
     def save(self, *args, **kwargs):
-        self.tip = self.image.name
+        self.set_tip()
         super().save(*args, **kwargs)
 
+    def set_tip(self):
+        self.tip = self.image.name
+
+
+class StaleMediaFile(models.Model):
+    """A file in the media storage whose image was deleted. Files are removed in batches by sweep_stale_media_files"""
+    name = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('id', )
+
+    def __str__(self):
+        return f'Stale media file {self.name}'
+
+
+class ImageUpload(models.Model):
+    """An image uploaded in chunks. Once complete it can be attached to a product or feedback by its primary key"""
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='image_uploads',
+                              db_column='owner_id')
+    file_name = models.CharField(max_length=100)
+    size = models.PositiveIntegerField()
+    received_size = models.PositiveIntegerField(default=0)
+    is_complete = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ('owner', 'created_at')
+
+    def __str__(self):
+        return f'Upload of {self.file_name} by user {self.owner}'
+
 
 class ProductMaterial(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -90,7 +129,27 @@ class ProductMaterial(models.Model):
         return f'Product material \'{self.name}\''
 
 
-class Product(models.Model):
+class VersionedModel(models.Model):
+    """
+    Model with a version that every write of its row increments, which is the ETag of the object in the API. The DAL
+    updates the row only if it still has the version the update is based on, see shop.dal.unit_of_work.save_object.
+    Other saves (e.g. of the admin) aren't conditional, but they increment the version too.
+    """
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if not self._state.adding and (update_fields is None or update_fields):
+            self.version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version'}
+        super().save(*args, **kwargs)
+
+
+class Product(VersionedModel):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='products', db_column='category_id')
     name = models.CharField(max_length=255, db_index=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
@@ -101,6 +160,9 @@ class Product(models.Model):
     is_available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # aggregates of the moderated feedback, see ProductDAL.refresh_feedback_aggregates
+    feedback_count = models.PositiveIntegerField(default=0, editable=False)
+    last_feedback_at = models.DateTimeField(blank=True, null=True, editable=False)
 
     materials = models.ManyToManyField(ProductMaterial, related_name='products')
     images = GenericRelation(Image)
@@ -109,19 +171,21 @@ class Product(models.Model):
     available_products = AvailableManager()
 
     class Meta:
+        # the ORDER BY is shop_category.name, shop_product.name, no index on this table can produce it
         ordering = ('category', 'name')
 
     def __str__(self):
         return f'Product {self.name} of {self.category}'
 
 
-class Feedback(models.Model):
+class Feedback(VersionedModel):
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='feedback',
                                db_column='author_id')
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='feedback', db_column='product_id')
     title = models.CharField(max_length=255)
     content = models.TextField()
     is_moderated = models.BooleanField(default=False)
+    is_rejected = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -133,19 +197,29 @@ class Feedback(models.Model):
     class Meta:
         verbose_name = 'Feedback'
         verbose_name_plural = 'Feedback'
+        # the ORDER BY is title, author_id, shop_category.name, shop_product.name, the index gives the presorted
+        # prefix of an incremental sort
         ordering = ('title', 'author', 'product')
+        indexes = [
+            models.Index(fields=('title', 'author'), name='feedback_title_author_idx'),
+            models.Index(fields=('product', 'created_at', 'id'), name='feedback_product_page_idx',
+                         condition=Q(is_moderated=True)),
+            models.Index(fields=('created_at', 'id'), name='feedback_moderation_queue_idx',
+                         condition=Q(is_moderated=False, is_rejected=False)),
+        ]
 
     def __str__(self):
         return f'Feedback of user {self.author} on product {self.product.name}'
 
 
-class Order(models.Model):
+class Order(VersionedModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='orders',
                              db_column='user_id')
     address = models.ForeignKey(Address, on_delete=models.CASCADE, related_name='orders', db_column='address_id')
     is_paid = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    # created_at gives the day of the sales rollups, updated_at tells which days to roll up again, see AnalyticsDAL
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ('user', )
@@ -164,3 +238,100 @@ class OrderItem(models.Model):
 
     def __str__(self):
         return f'Order item of {self.product}'
+
+
+class DailyProductSales(models.Model):
+    """
+    Sales of a product on a day by paid or unpaid orders, rolled up from the order items by AnalyticsDAL. The revenue
+    is counted at the price of the product when the day was rolled up.
+    """
+    date = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_sales', db_column='product_id')
+    is_paid = models.BooleanField()
+    order_count = models.PositiveIntegerField()
+    units = models.PositiveIntegerField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+
+    class Meta:
+        verbose_name_plural = 'Daily product sales'
+        ordering = ('date', 'product')
+        constraints = [
+            models.UniqueConstraint(fields=('date', 'product', 'is_paid'), name='daily_product_sales_unique'),
+        ]
+
+    def __str__(self):
+        return f'Sales of product {self.product_id} on {self.date}'
+
+
+class DailyOrders(models.Model):
+    """Number of paid or unpaid orders created on a day, rolled up by AnalyticsDAL"""
+    date = models.DateField()
+    is_paid = models.BooleanField()
+    order_count = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name_plural = 'Daily orders'
+        ordering = ('date', 'is_paid')
+        constraints = [
+            models.UniqueConstraint(fields=('date', 'is_paid'), name='daily_orders_unique'),
+        ]
+
+    def __str__(self):
+        return f'{"Paid" if self.is_paid else "Unpaid"} orders on {self.date}'
+
+
+class StaleSalesDay(models.Model):
+    """Day whose orders were deleted, so its rollups are recomputed by the next refresh"""
+    date = models.DateField(primary_key=True)
+
+    def __str__(self):
+        return f'Stale sales day {self.date}'
+
+
+class RollupWatermark(models.Model):
+    """The rows updated before updated_before are already rolled up into the rollup of this name"""
+    name = models.CharField(max_length=50, primary_key=True)
+    updated_before = models.DateTimeField()
+
+    def __str__(self):
+        return f'Watermark of {self.name} at {self.updated_before}'
+
+
+class RelatedProduct(models.Model):
+    """One of the products bought most often together with the product, built by RelatedProductDAL"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='related_products',
+                                db_column='product_id')
+    related_product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='related_to',
+                                        db_column='related_product_id')
+    order_count = models.PositiveIntegerField()  # orders with both products
+
+    class Meta:
+        ordering = ('product', '-order_count', 'related_product')
+        constraints = [
+            models.UniqueConstraint(fields=('product', 'related_product'), name='related_product_unique'),
+        ]
+
+    def __str__(self):
+        return f'Product {self.related_product_id} related to product {self.product_id}'
+
+
+class IdempotencyKey(models.Model):
+    """
+    Response to a request sent with an Idempotency-Key header, saved in the transaction of the request, so a retry of
+    the request gets it again instead of repeating the writes. Removed IDEMPOTENCY_KEY_EXPIRE_SECONDS after it's saved.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='idempotency_keys',
+                             db_column='user_id')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)  # SHA-256 of the method, path and data of the request
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response_data = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('user', 'key'), name='idempotency_key_unique'),
+        ]
+
+    def __str__(self):
+        return f'Idempotency key {self.key} of user {self.user_id}'
@@ -0,0 +1,22 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from shop.renderers import orjson
+
+UTF8_NAMES = ('utf-8', 'utf8')
+
+
+class FastJSONParser(JSONParser):
+    """
+    Parses JSON with orjson if it's installed, see shop.renderers. Bodies in encodings other than UTF-8 are parsed by
+    JSONParser. Unlike JSONParser, integers over 64 bits are rejected.
+    """
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower() not in UTF8_NAMES:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -20,26 +20,49 @@ class PermissionValidator(BasePermission):
 
 
 def check_object_permissions(get_object_func):
+    """Checks the object permissions and passes the checked object to the handler as 'obj', so it's fetched once"""
     def check_permissions_decorator(http_method):
         @wraps(http_method)
         def wrapper(self, *method_args, **method_kwargs):
             request, pk = method_args[0], method_kwargs['pk']
-            self.check_object_permissions(request, get_object_func(pk))
-            return http_method(self, *method_args, **method_kwargs)
+            obj = get_object_func(pk)
+            self.check_object_permissions(request, obj)
+            return http_method(self, *method_args, obj=obj, **method_kwargs)
         return wrapper
     return check_permissions_decorator
 
 
+# (permission classes of the view, additional permission classes) -> both of them together
+_method_permission_classes = {}
+
+
+def get_method_permission_classes(view, additional_permission_classes):
+    key = (tuple(view.permission_classes), tuple(additional_permission_classes))
+    permission_classes = _method_permission_classes.get(key)
+    if permission_classes is None:
+        permission_classes = (*view.permission_classes, *additional_permission_classes)
+        _method_permission_classes[key] = permission_classes
+    return permission_classes
+
+
+def check_additional_permissions(view, request, additional_permission_classes):
+    """
+    The same as APIView.check_permissions, but with additional permissions for the given method. The permission
+    classes of the view are never changed, so concurrent requests can't see each other's permissions.
+    """
+    for permission_class in get_method_permission_classes(view, additional_permission_classes):
+        permission = permission_class()
+        if not permission.has_permission(request, view):
+            view.permission_denied(request, message=getattr(permission, 'message', None),
+                                   code=getattr(permission, 'code', None))
+
+
 def check_new_global_permission(new_permission):
     def check_permissions_decorator(http_method):
         @wraps(http_method)
         def wrapper(self, *method_args, **method_kwargs):
             request = method_args[0]
-            self.permission_classes.append(new_permission)
-            try:
-                self.check_permissions(request)
-            finally:
-                self.permission_classes.remove(new_permission)
+            check_additional_permissions(self, request, (new_permission, ))
             return http_method(self, *method_args, **method_kwargs)
         return wrapper
     return check_permissions_decorator
@@ -0,0 +1,63 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Reads go to the primary database unless the current request explicitly allows replica reads
+_read_from_primary = ContextVar('read_from_primary', default=True)
+
+
+def set_read_from_primary(value):
+    return _read_from_primary.set(value)
+
+
+def reset_read_from_primary(token):
+    _read_from_primary.reset(token)
+
+
+@contextmanager
+def read_from_primary():
+    token = set_read_from_primary(True)
+    try:
+        yield
+    finally:
+        reset_read_from_primary(token)
+
+
+def pin_to_primary(view_method):
+    """
+    For views that write on a safe request method: they read from the primary database and pin the client to it the
+    same way as unsafe requests do, see shop.middleware.ReplicaRoutingMiddleware.
+    """
+    @wraps(view_method)
+    def wrapper(*args, **kwargs):
+        with read_from_primary():
+            response = view_method(*args, **kwargs)
+        response.pins_primary = True
+        return response
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    @classmethod
+    def db_for_read(cls, model, **hints):
+        replicas = settings.REPLICA_DATABASES
+        if not replicas or _read_from_primary.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    @classmethod
+    def db_for_write(cls, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    @classmethod
+    def allow_relation(cls, obj1, obj2, **hints):
+        # replicas hold the same data as the primary database
+        return True
+
+    @classmethod
+    def allow_migrate(cls, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
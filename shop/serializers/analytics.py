@@ -0,0 +1,43 @@
+from rest_framework import serializers
+
+
+class SalesRangeInputSerializer(serializers.Serializer):
+    """Query parameters of the analytics endpoints, the dates are inclusive"""
+    start = serializers.DateField()
+    end = serializers.DateField()
+    is_paid = serializers.BooleanField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if attrs['start'] > attrs['end']:
+            raise serializers.ValidationError({'end': 'End date can\'t be before start date'})
+        return attrs
+
+
+class ProductSalesInputSerializer(SalesRangeInputSerializer):
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+
+
+class DailyRevenueOutputSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    units = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class ProductSalesOutputSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    name = serializers.CharField()
+    units = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class CategorySalesOutputSerializer(serializers.Serializer):
+    category = serializers.IntegerField()
+    name = serializers.CharField()
+    units = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class DailyOrdersOutputSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    paid = serializers.IntegerField()
+    unpaid = serializers.IntegerField()
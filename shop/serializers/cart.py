@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+from shop.dal.cart import MAX_QUANTITY
+from shop.models import Address
+
+
+class CartItemOutputSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField()
+
+
+class CartItemInputSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, max_value=MAX_QUANTITY, default=1)
+
+
+class CartQuantityInputSerializer(serializers.Serializer):
+    """0 removes the product from the cart"""
+    quantity = serializers.IntegerField(min_value=0, max_value=MAX_QUANTITY)
+
+
+class CheckoutInputSerializer(serializers.Serializer):
+    address = serializers.PrimaryKeyRelatedField(queryset=Address.objects.all())
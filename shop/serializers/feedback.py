@@ -17,7 +17,7 @@ class FeedbackOutputSerializer(DynamicFieldsModelSerializer):
     @staticmethod
     def get_product(obj):
         from shop.serializers.product import ProductOutputSerializer
-        return ProductOutputSerializer(obj.product, fields_to_remove=['feedback']).data
+        return ProductOutputSerializer(obj.product).data
 
     @staticmethod
     def get_author(obj):
@@ -28,7 +28,18 @@ class FeedbackOutputSerializer(DynamicFieldsModelSerializer):
 class FeedbackInputSerializer(DynamicFieldsModelSerializer):
     images = serializers.ListField(child=serializers.ImageField(), required=False)
     images_to_delete = serializers.ListField(child=serializers.IntegerField(min_value=0), required=False)
+    uploads = serializers.ListField(child=serializers.IntegerField(min_value=0), required=False)
 
     class Meta:
         model = Feedback
-        fields = ('product', 'title', 'content', 'images', 'images_to_delete')
+        fields = ('product', 'title', 'content', 'images', 'images_to_delete', 'uploads')
+
+
+class FeedbackModerationOutputSerializer(FeedbackOutputSerializer):
+    class Meta(FeedbackOutputSerializer.Meta):
+        fields = ('id', 'created_at') + FeedbackOutputSerializer.Meta.fields
+
+
+class FeedbackModerationInputSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=0), allow_empty=False, max_length=1000)
+    action = serializers.ChoiceField(choices=('approve', 'reject'))
@@ -0,0 +1,15 @@
+from rest_framework import serializers
+
+from shop.models import ImageUpload
+
+
+class ImageUploadOutputSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImageUpload
+        fields = ('id', 'file_name', 'size', 'received_size', 'is_complete')
+
+
+class ImageUploadInputSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImageUpload
+        fields = ('file_name', 'size')
@@ -12,7 +12,7 @@ class OrderOutputSerializer(DynamicFieldsModelSerializer):
 
     class Meta:
         model = Order
-        fields = ('user', 'address', 'is_paid', 'order_items')
+        fields = ('id', 'user', 'address', 'is_paid', 'order_items')
 
     @staticmethod
     def get_order_items(obj):
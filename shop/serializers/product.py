@@ -11,12 +11,11 @@ class ProductOutputSerializer(DynamicFieldsModelSerializer):
     category = serializers.SerializerMethodField()
     materials = MaterialOutputSerializer(many=True, fields_to_remove=['products'])
     images = ImageOutputSerializer(many=True, fields_to_remove=['content_object'])
-    feedback = FeedbackOutputSerializer(many=True, fields_to_remove=['product'])
 
     class Meta:
         model = Product
         fields = ('category', 'name', 'price', 'description', 'size', 'weight', 'stock', 'is_available', 'materials',
-                  'images', 'feedback')
+                  'images', 'feedback_count', 'last_feedback_at')
 
     @staticmethod
     def get_category(obj):
@@ -25,13 +24,37 @@ class ProductOutputSerializer(DynamicFieldsModelSerializer):
                                         fields_to_remove=['products', 'child_categories', 'parent_category']).data
 
 
+class ProductDetailOutputSerializer(ProductOutputSerializer):
+    """
+    Product with the first page of its moderated feedback. The page and the link to the next one are given in the
+    context as 'feedback_page': (page, next_link).
+    """
+    feedback = serializers.SerializerMethodField()
+
+    class Meta(ProductOutputSerializer.Meta):
+        fields = (*ProductOutputSerializer.Meta.fields, 'feedback')
+
+    def get_feedback(self, obj):
+        page, next_link = self.context['feedback_page']
+        return {
+            'next': next_link,
+            'results': FeedbackOutputSerializer(page, many=True, fields_to_remove=['product']).data,
+        }
+
+
+class RelatedProductOutputSerializer(ProductOutputSerializer):
+    class Meta(ProductOutputSerializer.Meta):
+        fields = ('id', ) + ProductOutputSerializer.Meta.fields
+
+
 class ProductInputSerializer(DynamicFieldsModelSerializer):
     materials = serializers.ListField(child=serializers.CharField(max_length=ProductMaterial.name.field.max_length),
                                       required=False)
     images = serializers.ListField(child=serializers.ImageField(), required=False)
     images_to_delete = serializers.ListField(child=serializers.IntegerField(min_value=0), required=False)
+    uploads = serializers.ListField(child=serializers.IntegerField(min_value=0), required=False)
 
     class Meta:
         model = Product
         fields = ('category', 'name', 'price', 'description', 'size', 'weight', 'stock', 'is_available', 'materials',
-                  'images', 'images_to_delete')
+                  'images', 'images_to_delete', 'uploads')
@@ -0,0 +1,50 @@
+"""
+Streaming JSON lists for large staff lists. The rows are read from the database, serialized and rendered a chunk at a
+time, so the memory of a response is proportional to STREAMING_CHUNK_SIZE rather than to the whole list.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+
+from shop.renderers import FastJSONRenderer
+
+STREAM_QUERY_PARAM = 'stream'
+
+
+def wants_streaming(request):
+    """Streaming is opt-in with ?stream=true, the list loses the browsable API and the error responses of DRF"""
+    return request.query_params.get(STREAM_QUERY_PARAM, '').lower() in ('1', 'true')
+
+
+def get_streaming_list_response(queryset, serializer_class, **serializer_kwargs):
+    """
+    Response with the same JSON as Response(serializer_class(queryset, many=True, **serializer_kwargs).data). The
+    prefetch_related lookups of the queryset are done for every chunk, so the queries are per chunk rather than per row.
+    """
+    # the database is chosen now, the rows are read after the middleware has finished with the request
+    queryset = queryset.using(queryset.db)
+    content = render_in_chunks(queryset, serializer_class, serializer_kwargs)
+    return StreamingHttpResponse(content, content_type=FastJSONRenderer.media_type)
+
+
+def iterate_in_chunks(queryset, chunk_size):
+    prefetch_lookups = queryset._prefetch_related_lookups  # QuerySet.iterator() ignores them
+    rows = queryset.prefetch_related(None).iterator(chunk_size=chunk_size)  # a server-side cursor on PostgreSQL
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        prefetch_related_objects(chunk, *prefetch_lookups)
+        yield chunk
+
+
+def render_in_chunks(queryset, serializer_class, serializer_kwargs):
+    renderer = FastJSONRenderer()
+    separator = b'['
+    for chunk in iterate_in_chunks(queryset, settings.STREAMING_CHUNK_SIZE):
+        # the list of the chunk without its brackets, the elements of a compact list are separated by commas only
+        yield separator + renderer.render(serializer_class(instance=chunk, many=True, **serializer_kwargs).data)[1:-1]
+        separator = b','
+    yield b'[]' if separator == b'[' else b']'
@@ -3,9 +3,11 @@ import tempfile
 from enum import Enum, auto
 
 import pytest
+from django.core.cache import cache
 from PIL import Image as PillowImage
 from pytest_factoryboy import register
 
+from shop.dal.product import ProductDAL
 from shop.exceptions import UnhandledValueError
 from shop.tests.factories import AddressFactory, CategoryFactory, FeedbackFactory, FeedbackImageFactory, OrderFactory, \
     OrderItemFactory, ProductFactory, ProductImageFactory, ProductMaterialFactory, UserFactory
@@ -64,6 +66,14 @@ def django_db_setup(django_db_setup, django_db_blocker):  # NOQA
                 ProductMaterialFactory(products=(product, ))
                 OrderFactory(user=user)
                 AddressFactory(user=user)
+        ProductDAL.refresh_feedback_aggregates()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # the database is rolled back after every test, the cache has to be cleared too
+    yield
+    cache.clear()
 
 
 @pytest.fixture
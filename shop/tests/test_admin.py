@@ -0,0 +1,166 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib import admin
+from django.contrib.admin import helpers
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from shop.cache import get_product_detail_key
+from shop.dal.product import MAX_STOCK
+from shop.models import Order, Product
+from shop.pagination import EstimatedCountPaginator, get_estimated_count
+
+
+def count_changelist_queries(client, model, query_string=''):
+    url = reverse(f'admin:shop_{model._meta.model_name}_changelist') + query_string
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(queries)
+
+
+@pytest.mark.django_db
+class TestChangeListQueries:
+    @pytest.mark.parametrize('factory_name', ['product_factory', 'category_factory', 'feedback_factory',
+                                              'address_factory', 'order_factory', 'order_item_factory',
+                                              'product_image_factory', 'feedback_image_factory'])
+    def test_number_of_queries_does_not_grow_with_rows(self, request, admin_client, factory_name):
+        factory = request.getfixturevalue(factory_name)
+        model = factory._meta.get_model_class()
+        query_count = count_changelist_queries(admin_client, model)
+        factory.create_batch(5)
+
+        assert count_changelist_queries(admin_client, model) == query_count
+
+    def test_autocomplete_filter(self, admin_client, user_factory, address_factory):
+        user = user_factory()
+        address_factory.create_batch(2, user=user)
+        response = admin_client.get(reverse('admin:shop_address_changelist'), {'user__id__exact': user.pk})
+
+        assert response.status_code == 200
+        assert {address.user for address in response.context['cl'].result_list} == {user}
+        assert 'admin/js/autocomplete.js' in str(response.context['media'])
+        assert f'<option value="{user.pk}" selected>' in response.content.decode()
+
+    def test_autocomplete_filter_does_not_load_related_table(self, admin_client, user_factory):
+        query_count = count_changelist_queries(admin_client, Order)
+        user_factory.create_batch(5)
+
+        assert count_changelist_queries(admin_client, Order) == query_count
+
+    def test_autocomplete_filter_search(self, admin_client, user_factory):
+        user = user_factory(username='autocomplete_user')
+        response = admin_client.get(reverse('admin:autocomplete'), {'app_label': 'shop', 'model_name': 'address',
+                                                                    'field_name': 'user', 'term': 'autocomplete'})
+
+        assert response.status_code == 200
+        assert [result['id'] for result in response.json()['results']] == [str(user.pk)]
+
+
+def run_action(client, model, action, objects, **arguments):
+    url = reverse(f'admin:shop_{model._meta.model_name}_changelist')
+    data = {'action': action, helpers.ACTION_CHECKBOX_NAME: [obj.pk for obj in objects], **arguments}
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(url, data)
+    assert response.status_code == 302
+    return [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+
+
+@pytest.mark.django_db
+class TestBulkActions:
+    @pytest.mark.parametrize('action, is_available', [('mark_available', True), ('mark_unavailable', False)])
+    def test_mark_products(self, admin_client, product_factory, action, is_available):
+        products = product_factory.create_batch(5, is_available=not is_available)
+        updates = run_action(admin_client, Product, action, products)
+
+        assert len(updates) == 1
+        assert all((product.is_available, product.version) == (is_available, 2)
+                   for product in Product.objects.filter(pk__in=[product.pk for product in products]))
+
+    def test_adjust_price(self, admin_client, product_factory):
+        products = product_factory.create_batch(3, price=Decimal('10.00'))
+        updates = run_action(admin_client, Product, 'adjust_price', products, percent='-12.5')
+
+        assert len(updates) == 1
+        assert set(Product.objects.filter(pk__in=[product.pk for product in products])
+                   .values_list('price', flat=True)) == {Decimal('8.75')}
+
+    def test_restock_is_capped(self, admin_client, product_factory):
+        product, full_product = product_factory(stock=2), product_factory(stock=MAX_STOCK - 1)
+        updates = run_action(admin_client, Product, 'restock', [product, full_product], quantity=3)
+        product.refresh_from_db()
+        full_product.refresh_from_db()
+
+        assert len(updates) == 1
+        assert (product.stock, full_product.stock) == (5, MAX_STOCK)
+
+    def test_action_without_argument(self, admin_client, product_factory):
+        product = product_factory(stock=2)
+        updates = run_action(admin_client, Product, 'restock', [product])
+        product.refresh_from_db()
+
+        assert not updates
+        assert product.stock == 2
+
+    def test_updated_at_and_cache(self, admin_client, product_factory, django_capture_on_commit_callbacks):
+        product = product_factory(is_available=False)
+        cache.set(get_product_detail_key(product.pk), {})
+        updated_at = product.updated_at
+        with django_capture_on_commit_callbacks(execute=True):
+            run_action(admin_client, Product, 'mark_available', [product])
+        product.refresh_from_db()
+
+        assert product.updated_at > updated_at
+        assert cache.get(get_product_detail_key(product.pk)) is None
+
+    def test_save_invalidates_cache(self, admin_client, product, django_capture_on_commit_callbacks):
+        cache.set(get_product_detail_key(product.pk), {})
+        with django_capture_on_commit_callbacks(execute=True):
+            admin.site._registry[Product].save_model(None, product, None, change=True)
+
+        assert cache.get(get_product_detail_key(product.pk)) is None
+
+    def test_material_rename_invalidates_cache(self, admin_client, product, product_material_factory,
+                                               django_capture_on_commit_callbacks):
+        material = product_material_factory(products=[product])
+        cache.set(get_product_detail_key(product.pk), {})
+        url = reverse('admin:shop_productmaterial_change', args=[material.pk])
+        with django_capture_on_commit_callbacks(execute=True):
+            response = admin_client.post(url, {'name': 'Renamed material'})
+
+        assert response.status_code == 302
+        assert cache.get(get_product_detail_key(product.pk)) is None
+
+    def test_mark_orders_paid(self, admin_client, order_factory):
+        orders = order_factory.create_batch(3)
+        updates = run_action(admin_client, Order, 'mark_paid', orders)
+
+        assert len(updates) == 1
+        assert Order.objects.filter(pk__in=[order.pk for order in orders], is_paid=True).count() == 3
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+    def test_estimate_of_filtered_queryset_is_not_used(self):
+        assert get_estimated_count(Product.objects.filter(is_available=True)) is None
+
+    def test_exact_count_without_estimate(self, settings):
+        settings.ADMIN_ESTIMATED_COUNT_THRESHOLD = 0
+        queryset = Product.objects.order_by('pk')
+        if get_estimated_count(queryset) is not None:
+            pytest.skip('The database estimates row counts')
+
+        assert EstimatedCountPaginator(queryset, 10).count == queryset.count()
+
+    def test_estimated_count_of_large_table(self, settings):
+        if connection.vendor != 'postgresql':
+            pytest.skip('Only PostgreSQL estimates row counts')
+        settings.ADMIN_ESTIMATED_COUNT_THRESHOLD = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Product._meta.db_table}')
+        queryset = Product.objects.order_by('pk')
+
+        assert EstimatedCountPaginator(queryset, 10).count == get_estimated_count(queryset) is not None
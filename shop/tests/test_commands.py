@@ -0,0 +1,187 @@
+import io
+import os
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db.models import Sum
+from django.utils import timezone
+
+from shop.cache import get_product_detail_key
+from shop.controllers.image_upload import ImageUploadController
+from shop.dal.image import ImageDAL
+from shop.dal.stale_media_file import StaleMediaFileDAL
+from shop.management.commands import collect_orphaned_media
+from shop.management.commands.explain_access_patterns import get_access_patterns
+from shop.models import DailyOrders, Feedback, IdempotencyKey, ImageUpload, Order, OrderItem, Product, \
+    StaleMediaFile
+
+
+@pytest.mark.django_db
+class TestExplainAccessPatternsCommand:
+    def test_all_patterns_are_reported(self):
+        out = io.StringIO()
+        call_command('explain_access_patterns', repeat=1, stdout=out)
+        output = out.getvalue()
+
+        for name in get_access_patterns():
+            assert name in output
+        assert output.count('avg ') == len(get_access_patterns())
+
+
+@pytest.mark.django_db
+class TestSweepStaleMediaFilesCommand:
+    @pytest.fixture
+    def stale_file_names(self):
+        storage = ImageDAL.get_storage()
+        names = [storage.save(f'product_images/stale_{i}.txt', ContentFile(b'data')) for i in range(3)]
+        StaleMediaFileDAL.schedule_removal(names)
+        yield names
+        [storage.delete(name) for name in names]
+
+    def test_files_are_removed_in_batches(self, stale_file_names):
+        out = io.StringIO()
+        call_command('sweep_stale_media_files', batch_size=2, stdout=out)
+
+        assert not any(ImageDAL.get_storage().exists(name) for name in stale_file_names)
+        assert not StaleMediaFile.objects.filter(name__in=stale_file_names).exists()
+        assert 'Removed 3 stale media files' in out.getvalue()
+
+    def test_sweep_stops_after_max_batches(self, stale_file_names):
+        call_command('sweep_stale_media_files', batch_size=2, max_batches=1, stdout=io.StringIO())
+
+        assert StaleMediaFile.objects.filter(name__in=stale_file_names).count() == 1
+
+    def test_referenced_files_are_kept(self, stale_file_names, product_image_factory):
+        image = product_image_factory()
+        StaleMediaFileDAL.schedule_removal([image.image.name])
+        call_command('sweep_stale_media_files', stdout=io.StringIO())
+
+        assert ImageDAL.get_storage().exists(image.image.name)
+        assert not StaleMediaFile.objects.exists()
+
+
+@pytest.mark.django_db
+class TestCollectOrphanedMediaCommand:
+    @pytest.fixture
+    def media_files(self, settings, tmp_path, product_image_factory):
+        settings.MEDIA_ROOT = str(tmp_path)
+        referenced_name = product_image_factory().image.name
+        old_orphan = tmp_path / 'feedback_images' / 'feedback_1' / 'old.jpg'
+        new_orphan = tmp_path / 'product_images' / 'product_1' / 'new.jpg'
+        for path in (old_orphan, new_orphan):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b'data')
+        day_ago = time.time() - 2 * 24 * 60 * 60
+        for path in (old_orphan, tmp_path / referenced_name):
+            os.utime(path, (day_ago, day_ago))
+        return tmp_path / referenced_name, old_orphan, new_orphan
+
+    @pytest.mark.parametrize('bloom_filter', [True, False])
+    def test_orphans_are_reported(self, media_files, bloom_filter):
+        referenced, old_orphan, new_orphan = media_files
+        out = io.StringIO()
+        call_command('collect_orphaned_media', bloom_filter=bloom_filter, stdout=out)
+
+        assert 'Orphaned feedback_images/feedback_1/old.jpg' in out.getvalue()
+        assert 'Found 1 orphaned files (4 bytes) of 3 checked' in out.getvalue()
+        assert all(path.exists() for path in media_files)
+
+    def test_old_orphans_are_deleted(self, media_files):
+        referenced, old_orphan, new_orphan = media_files
+        call_command('collect_orphaned_media', delete=True, rate=0, stdout=io.StringIO())
+
+        assert referenced.exists()
+        assert not old_orphan.exists()
+        assert new_orphan.exists()
+
+    def test_file_referenced_after_names_are_loaded_is_kept(self, media_files, monkeypatch):
+        referenced, old_orphan, new_orphan = media_files
+        # as if the image got its file while the folders were walked
+        monkeypatch.setattr(collect_orphaned_media.Command, 'load_image_names', staticmethod(lambda options: set()))
+        call_command('collect_orphaned_media', delete=True, rate=0, stdout=io.StringIO())
+
+        assert referenced.exists()
+        assert not old_orphan.exists()
+
+
+@pytest.mark.django_db
+class TestRefreshFeedbackAggregatesCommand:
+    def test_aggregates_are_recomputed(self):
+        Product.objects.update(feedback_count=1000, last_feedback_at=None)
+        call_command('refresh_feedback_aggregates', stdout=io.StringIO())
+
+        for product in Product.objects.all():
+            moderated_feedback = Feedback.moderated_feedback.filter(product=product).order_by('created_at')
+            assert product.feedback_count == moderated_feedback.count()
+            assert product.last_feedback_at == getattr(moderated_feedback.last(), 'created_at', None)
+
+    def test_cached_products_are_invalidated(self, product, django_capture_on_commit_callbacks):
+        cache.set(get_product_detail_key(product.pk), {})
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command('refresh_feedback_aggregates', stdout=io.StringIO())
+
+        assert cache.get(get_product_detail_key(product.pk)) is None
+
+    def test_only_given_products_are_recomputed(self):
+        product_pks = list(Product.objects.values_list('pk', flat=True)[:2])
+        Product.objects.update(feedback_count=1000)
+        call_command('refresh_feedback_aggregates', product=product_pks, stdout=io.StringIO())
+
+        assert Product.objects.exclude(pk__in=product_pks).filter(feedback_count=1000).exists()
+        assert not Product.objects.filter(pk__in=product_pks, feedback_count=1000).exists()
+
+
+@pytest.mark.django_db
+class TestSweepExpiredUploadsCommand:
+    def test_expired_uploads_are_removed(self, settings, tmp_path, user_factory):
+        settings.IMAGE_UPLOAD_DIR = tmp_path
+        owner = user_factory()
+        expired, fresh = (ImageUploadController.create_upload(owner, 'photo.jpg', 10) for _ in range(2))
+        ImageUpload.objects.filter(pk=expired.pk).update(
+            updated_at=timezone.now() - timedelta(seconds=settings.IMAGE_UPLOAD_EXPIRE_SECONDS + 1))
+        out = io.StringIO()
+        call_command('sweep_expired_uploads', stdout=out)
+
+        assert 'Removed 1 expired uploads' in out.getvalue()
+        assert list(ImageUpload.objects.values_list('pk', flat=True)) == [fresh.pk]
+        assert not os.path.exists(ImageUploadController.get_upload_path(expired))
+        assert os.path.exists(ImageUploadController.get_upload_path(fresh))
+
+
+@pytest.mark.django_db
+class TestSweepIdempotencyKeysCommand:
+    def test_expired_keys_are_removed(self, settings, user_factory):
+        user = user_factory()
+        expired, fresh = (IdempotencyKey.objects.create(user=user, key=key, fingerprint='') for key in ('a', 'b'))
+        IdempotencyKey.objects.filter(pk=expired.pk).update(
+            created_at=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_EXPIRE_SECONDS + 1))
+        out = io.StringIO()
+        call_command('sweep_idempotency_keys', stdout=out)
+
+        assert 'Removed 1 expired idempotency keys' in out.getvalue()
+        assert list(IdempotencyKey.objects.values_list('pk', flat=True)) == [fresh.pk]
+
+
+@pytest.mark.django_db
+class TestRefreshSalesRollupsCommand:
+    def test_full_refresh(self):
+        out = io.StringIO()
+        call_command('refresh_sales_rollups', full=True, stdout=out)
+
+        day_count = Order.objects.dates('created_at', 'day').count()
+        assert f'Refreshed sales rollups of {day_count} days' in out.getvalue()
+        assert DailyOrders.objects.aggregate(total=Sum('order_count'))['total'] == Order.objects.count()
+
+
+@pytest.mark.django_db
+class TestBuildRelatedProductsCommand:
+    def test_full_build(self):
+        out = io.StringIO()
+        call_command('build_related_products', full=True, stdout=out)
+
+        product_count = OrderItem.objects.values('product').distinct().count()
+        assert f'Rebuilt related products of {product_count} products' in out.getvalue()
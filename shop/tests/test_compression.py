@@ -0,0 +1,95 @@
+import gzip
+
+import pytest
+from django.urls import reverse
+
+from shop import compression, middleware
+from shop.compression import BROTLI, GZIP, negotiate_encoding
+from shop.tests.conftest import EXISTENT_PK
+
+
+@pytest.fixture
+def count_compressions(monkeypatch):
+    calls = []
+
+    def _compress(body, encoding):
+        calls.append(encoding)
+        return compress(body, encoding)
+    compress = compression.compress
+    monkeypatch.setattr(compression, 'compress', _compress)
+    monkeypatch.setattr(middleware, 'compress', _compress)
+    return calls
+
+
+class TestNegotiateEncoding:
+    @pytest.mark.parametrize('accept_encoding, encoding', [
+        ('gzip, deflate, br', BROTLI),
+        ('gzip', GZIP),
+        ('br;q=0.5, gzip', GZIP),
+        ('BR', BROTLI),
+        ('*', BROTLI),
+        ('*;q=0.1, gzip;q=0', BROTLI),
+        ('deflate', None),
+        ('br;q=0, gzip;q=0', None),
+        ('gzip;q=invalid', None),
+        ('', None),
+    ])
+    def test_negotiate(self, accept_encoding, encoding):
+        assert negotiate_encoding(accept_encoding) == encoding
+
+    def test_gzip_without_brotli(self, monkeypatch):
+        monkeypatch.setattr(compression, 'brotli', None)
+
+        assert negotiate_encoding('br, gzip') == GZIP
+        assert negotiate_encoding('br') is None
+
+
+@pytest.mark.django_db
+class TestCompressionMiddleware:
+    @pytest.mark.parametrize('encoding', [GZIP, BROTLI])
+    def test_compressed_product(self, api_client, encoding):
+        url = reverse('product-detail', kwargs={'pk': EXISTENT_PK})
+        content = api_client.get(url).content
+        response = api_client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+
+        assert response['Content-Encoding'] == encoding
+        assert response['Vary'].endswith('Accept-Encoding')
+        assert int(response['Content-Length']) == len(response.content) < len(content)
+        decompress = gzip.decompress if encoding == GZIP else compression.brotli.decompress
+        assert decompress(response.content) == content
+
+    def test_small_body_is_not_compressed(self, settings, api_client):
+        settings.COMPRESSION_MIN_SIZE = 1024 * 1024
+        response = api_client.get(reverse('product-detail', kwargs={'pk': EXISTENT_PK}), HTTP_ACCEPT_ENCODING=GZIP)
+
+        assert not response.has_header('Content-Encoding')
+
+    def test_not_accepted(self, api_client):
+        response = api_client.get(reverse('product-detail', kwargs={'pk': EXISTENT_PK}))
+
+        assert not response.has_header('Content-Encoding')
+        assert response['Vary'].endswith('Accept-Encoding')
+
+    def test_cached_product_is_compressed_once(self, api_client, count_compressions):
+        url = reverse('product-detail', kwargs={'pk': EXISTENT_PK})
+        responses = [api_client.get(url, HTTP_ACCEPT_ENCODING=GZIP) for _ in range(3)]
+
+        assert count_compressions == [GZIP]
+        assert len({response.content for response in responses}) == 1
+
+    def test_not_cacheable_response_is_compressed_every_time(self, authenticated_api_client, count_compressions):
+        client = authenticated_api_client(is_admin=True)
+        for _ in range(2):
+            client.get(reverse('product-list'), HTTP_ACCEPT_ENCODING=GZIP)
+
+        assert count_compressions == [GZIP, GZIP]
+
+    def test_compressed_stream(self, settings, authenticated_api_client):
+        settings.STREAMING_CHUNK_SIZE = 3
+        client = authenticated_api_client(is_admin=True)
+        url = reverse('user-list')
+        content = b''.join(client.get(url, {'stream': 'true'}).streaming_content)
+        response = client.get(url, {'stream': 'true'}, HTTP_ACCEPT_ENCODING=GZIP)
+
+        assert response['Content-Encoding'] == GZIP
+        assert gzip.decompress(b''.join(response.streaming_content)) == content
@@ -0,0 +1,98 @@
+import pytest
+from django.db.models import F
+from django.urls import reverse
+from rest_framework import status
+
+from shop.dal import unit_of_work
+from shop.models import Feedback, Order, Product
+from shop.tests.conftest import EXISTENT_PK
+
+
+@pytest.fixture
+def update_product(authenticated_api_client, product):
+    admin_client = authenticated_api_client(is_admin=True)
+
+    def _update_product(materials=None, **headers):
+        data = {'category': product.category_id, 'name': 'Renamed product', 'price': '10.00', 'description': 'text',
+                'size': 'size', 'weight': 1, 'stock': 1, 'is_available': True}
+        if materials is not None:
+            data['materials'] = materials
+        return admin_client.put(reverse('product-detail', kwargs={'pk': product.pk}), data, **headers)
+    return _update_product
+
+
+@pytest.mark.django_db
+class TestConditionalUpdates:
+    def test_get_has_etag(self, api_client, product):
+        response = api_client.get(reverse('product-detail', kwargs={'pk': product.pk}))
+
+        assert response['ETag'] == f'"{product.version}"'
+
+    def test_update_with_current_version(self, update_product, product):
+        response = update_product(HTTP_IF_MATCH=f'"{product.version}"')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] == f'"{product.version + 1}"'
+        assert Product.objects.get(pk=product.pk).name == 'Renamed product'
+
+    @pytest.mark.parametrize('if_match', ['W/"1", "7"', '*'])
+    def test_any_of_versions_matches(self, update_product, if_match):
+        assert update_product(HTTP_IF_MATCH=if_match).status_code == status.HTTP_200_OK
+
+    def test_update_with_stale_version(self, update_product, product):
+        Product.objects.filter(pk=product.pk).update(version=2)
+        response = update_product(HTTP_IF_MATCH='"1"')
+
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        assert Product.objects.get(pk=product.pk).name != 'Renamed product'
+
+    def test_materials_update_changes_version(self, update_product):
+        update_product(HTTP_IF_MATCH='"1"')
+        response = update_product(materials=['wood'], HTTP_IF_MATCH='"2"')
+        stale_response = update_product(materials=['metal'], HTTP_IF_MATCH='"2"')
+
+        assert response['ETag'] == '"3"'
+        assert stale_response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+    def test_malformed_if_match(self, update_product):
+        assert update_product(HTTP_IF_MATCH='1').status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize('headers, status_code', [
+        ({'HTTP_IF_MATCH': '"1"'}, status.HTTP_412_PRECONDITION_FAILED),
+        ({}, status.HTTP_409_CONFLICT)
+    ])
+    def test_row_changed_during_update(self, update_product, product, monkeypatch, headers, status_code):
+        write_object = unit_of_work.write_object
+
+        def write_after_concurrent_update(obj, *args):
+            Product.objects.filter(pk=obj.pk).update(version=F('version') + 1)
+            write_object(obj, *args)
+        monkeypatch.setattr(unit_of_work, 'write_object', write_after_concurrent_update)
+        response = update_product(**headers)
+
+        assert response.status_code == status_code
+        assert Product.objects.get(pk=product.pk).name != 'Renamed product'
+
+    def test_feedback_update(self, authenticated_api_client):
+        feedback = Feedback.moderated_feedback.first()
+        url = reverse('feedback-detail', kwargs={'pk': feedback.pk})
+        client = authenticated_api_client(is_admin=False, user=feedback.author)
+        data = {'product': EXISTENT_PK, 'title': 'title', 'content': 'content'}
+        etag = client.get(url)['ETag']
+        stale_response = client.put(url, data, HTTP_IF_MATCH=f'"{feedback.version + 1}"')
+        response = client.put(url, data, HTTP_IF_MATCH=etag)
+
+        assert stale_response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] == f'"{feedback.version + 1}"'
+
+    def test_order_update(self, authenticated_api_client):
+        order = Order.objects.get(pk=EXISTENT_PK)
+        url = reverse('order-detail', kwargs={'pk': order.pk})
+        client = authenticated_api_client(is_admin=True)
+        etag = client.get(url)['ETag']
+        Order.objects.filter(pk=order.pk).update(version=F('version') + 1)
+
+        assert client.put(url, {'address': EXISTENT_PK}, HTTP_IF_MATCH=etag).status_code == \
+            status.HTTP_412_PRECONDITION_FAILED
+        assert client.put(url, {'address': EXISTENT_PK}).status_code == status.HTTP_200_OK
@@ -0,0 +1,110 @@
+import os
+import threading
+
+import pytest
+
+from shop.db.backends.postgresql_pool import base
+from shop.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool_factory():
+    def _pool_factory(max_size=2, timeout=0.05, health_check_interval=30.0, is_usable=lambda connection: True):
+        return ConnectionPool(FakeConnection, is_usable, max_size, timeout, health_check_interval)
+    return _pool_factory
+
+
+class TestConnectionPool:
+    def test_connection_is_reused(self, pool_factory):
+        pool = pool_factory()
+        connection = pool.acquire()
+        pool.release(connection)
+
+        assert pool.acquire() is connection
+        assert pool.stats.created == 1
+        assert pool.stats.checkouts == 2
+
+    def test_unusable_released_connection_is_discarded(self, pool_factory):
+        pool = pool_factory()
+        connection = pool.acquire()
+        pool.release(connection, reusable=False)
+
+        assert connection.closed
+        assert pool.acquire() is not connection
+        assert pool.stats.discarded == 1
+
+    def test_max_size(self, pool_factory):
+        pool = pool_factory(max_size=1)
+        pool.acquire()
+
+        with pytest.raises(PoolTimeout):
+            pool.acquire()
+        assert pool.stats.timeouts == 1
+
+    def test_waiting_for_free_connection(self, pool_factory):
+        pool = pool_factory(max_size=1, timeout=5)
+        connection = pool.acquire()
+        timer = threading.Timer(0.05, pool.release, args=(connection, ))
+        timer.start()
+
+        assert pool.acquire() is connection
+        assert pool.stats.as_dict()['max_wait_ms'] > 0
+        timer.join()
+
+    @pytest.mark.parametrize('is_usable, is_reused', [(True, True), (False, False)])
+    def test_health_check_of_idle_connection(self, is_usable, is_reused, pool_factory):
+        pool = pool_factory(health_check_interval=0, is_usable=lambda connection: is_usable)
+        connection = pool.acquire()
+        pool.release(connection)
+
+        assert (pool.acquire() is connection) == is_reused
+        assert connection.closed != is_reused
+
+    def test_close_all(self, pool_factory):
+        pool = pool_factory()
+        connections = [pool.acquire(), pool.acquire()]
+        for connection in connections:
+            pool.release(connection)
+        pool.close_all()
+
+        assert pool.idle_count == 0
+        assert all(connection.closed for connection in connections)
+
+
+class TestDatabaseWrapper:
+    @pytest.fixture(autouse=True)
+    def pools(self, monkeypatch):
+        monkeypatch.setattr(base, '_pools', {})
+
+    @pytest.fixture
+    def wrapper_factory(self):
+        def _wrapper_factory():
+            settings_dict = {'NAME': 'online_shop', 'USER': '', 'PASSWORD': '', 'HOST': '', 'PORT': '',
+                             'OPTIONS': {}, 'POOL': {'MAX_SIZE': 1}}
+            return base.DatabaseWrapper(settings_dict, alias='pooled')
+        return _wrapper_factory
+
+    def test_pool_is_shared_by_wrappers(self, wrapper_factory):
+        first, second = wrapper_factory(), wrapper_factory()
+
+        assert first.get_pool() is second.get_pool()
+        # the pool must not keep the wrapper of whichever thread created it
+        assert first.get_pool()._connect.func is base.connect
+
+    def test_forked_process_forgets_pools(self, wrapper_factory):
+        wrapper_factory().get_pool()
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if not base._pools else 1)
+        _, status = os.waitpid(pid, 0)
+
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert 'pooled' in base._pools
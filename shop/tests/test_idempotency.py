@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from shop.idempotency import REPLAYED_HEADER
+from shop.models import IdempotencyKey, Order, OrderItem
+from shop.tests.conftest import EXISTENT_PK
+
+
+@pytest.fixture
+def user(user_factory):
+    return user_factory()
+
+
+@pytest.fixture
+def user_client(authenticated_api_client, user):
+    return authenticated_api_client(is_admin=False, user=user)
+
+
+@pytest.fixture
+def create_order(user_client, user, address_factory):
+    address = address_factory(user=user)
+
+    def _create_order(key=None, data=None):
+        headers = {} if key is None else {'HTTP_IDEMPOTENCY_KEY': key}
+        return user_client.post(reverse('order-list'), data or {'address': address.pk}, **headers)
+    return _create_order
+
+
+@pytest.mark.django_db
+class TestIdempotentRequests:
+    def test_retry_is_replayed(self, create_order, user):
+        responses = [create_order('key') for _ in range(2)]
+
+        assert [response.status_code for response in responses] == [status.HTTP_201_CREATED] * 2
+        assert REPLAYED_HEADER not in responses[0]
+        assert responses[1][REPLAYED_HEADER] == 'true'
+        assert Order.objects.filter(user=user).count() == 1
+
+    def test_requests_without_key_are_not_replayed(self, create_order, user):
+        for _ in range(2):
+            create_order()
+
+        assert Order.objects.filter(user=user).count() == 2
+
+    def test_key_reused_for_another_request(self, create_order, user, address_factory):
+        create_order('key')
+        response = create_order('key', {'address': address_factory(user=user).pk})
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert Order.objects.filter(user=user).count() == 1
+
+    def test_keys_of_users_are_separate(self, create_order, authenticated_api_client, user_factory, address_factory):
+        create_order('key')
+        another_user = user_factory()
+        response = authenticated_api_client(is_admin=False, user=another_user).post(
+            reverse('order-list'), {'address': address_factory(user=another_user).pk}, HTTP_IDEMPOTENCY_KEY='key')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert REPLAYED_HEADER not in response
+
+    def test_failed_request_can_be_retried(self, create_order, user):
+        response = create_order('key', {'address': 'invalid'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not IdempotencyKey.objects.filter(user=user).exists()
+        assert create_order('key').status_code == status.HTTP_201_CREATED
+        assert Order.objects.filter(user=user).count() == 1
+
+    def test_expired_key_is_used_again(self, settings, create_order, user):
+        create_order('key')
+        IdempotencyKey.objects.filter(user=user).update(
+            created_at=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_EXPIRE_SECONDS + 1))
+        response = create_order('key')
+
+        assert REPLAYED_HEADER not in response
+        assert Order.objects.filter(user=user).count() == 2
+
+    def test_too_long_key(self, create_order):
+        response = create_order('k' * 256)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_order_item_retry_is_replayed(self, authenticated_api_client):
+        admin_client = authenticated_api_client(is_admin=True)
+        order_item_count = OrderItem.objects.count()
+        data = {'product': EXISTENT_PK, 'order': EXISTENT_PK, 'quantity': 1}
+        for _ in range(2):
+            admin_client.post(reverse('order-item-list'), data, HTTP_IDEMPOTENCY_KEY='key')
+
+        assert OrderItem.objects.count() == order_item_count + 1
+
+    def test_checkout_retry_gets_the_order(self, user_client, user, address_factory, product,
+                                           django_capture_on_commit_callbacks):
+        address = address_factory(user=user)
+        user_client.post(reverse('cart-item-list'), {'product': product.pk, 'quantity': 2})
+        responses = []
+        for _ in range(2):
+            with django_capture_on_commit_callbacks(execute=True):
+                responses.append(user_client.post(reverse('cart-checkout'), {'address': address.pk},
+                                                  HTTP_IDEMPOTENCY_KEY='key'))
+
+        assert [response.status_code for response in responses] == [status.HTTP_201_CREATED] * 2
+        assert responses[1].json() == responses[0].json()
+        assert Order.objects.filter(user=user).count() == 1
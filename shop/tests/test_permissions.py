@@ -1,9 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from django.contrib.auth import get_user_model
-from rest_framework.permissions import BasePermission
+from rest_framework import status
+from rest_framework.permissions import AllowAny, BasePermission, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
 
 from shop.models import Feedback
-from shop.permissions import PermissionValidator, is_owner_or_admin_factory
+from shop.permissions import PermissionValidator, check_new_global_permission, check_object_permissions, \
+    get_method_permission_classes, is_owner_or_admin_factory
 
 
 class FakeRequest:
@@ -58,3 +65,81 @@ class TestPermissionValidator:
         user_to_retrieve = requesting_user
 
         assert_permission(PermissionValidator(), request, user_to_retrieve, True)
+
+
+class AdminOnlyPostView(APIView):
+    permission_classes = (AllowAny, )
+
+    @check_new_global_permission(IsAdminUser)
+    def post(self, request):
+        return Response(status=status.HTTP_201_CREATED)
+
+
+@pytest.fixture
+def post_as():
+    def _post_as(user):
+        request = APIRequestFactory().post('/')
+        force_authenticate(request, user=user)
+        return AdminOnlyPostView.as_view()(request).status_code
+    return _post_as
+
+
+class TestCheckNewGlobalPermission:
+    @pytest.mark.parametrize('is_staff, status_code', [
+        (True, status.HTTP_201_CREATED),
+        (False, status.HTTP_403_FORBIDDEN)
+    ])
+    def test_permission_checked(self, is_staff, status_code, post_as):
+        assert post_as(get_user_model()(is_staff=is_staff)) == status_code
+        assert AdminOnlyPostView.permission_classes == (AllowAny, )
+
+    def test_permission_classes_are_cached(self):
+        view = AdminOnlyPostView()
+        permission_classes = get_method_permission_classes(view, (IsAdminUser, ))
+
+        assert permission_classes == (AllowAny, IsAdminUser)
+        assert get_method_permission_classes(view, (IsAdminUser, )) is permission_classes
+
+    def test_permission_classes_cached_per_additional_permissions(self):
+        view = AdminOnlyPostView()
+        get_method_permission_classes(view, (IsAdminUser, ))
+
+        assert get_method_permission_classes(view, (IsAuthenticated, )) == (AllowAny, IsAuthenticated)
+
+    def test_concurrent_requests(self, post_as):
+        users = [get_user_model()(is_staff=index % 2 == 0) for index in range(200)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            status_codes = list(executor.map(post_as, users))
+
+        assert status_codes == [status.HTTP_201_CREATED if user.is_staff else status.HTTP_403_FORBIDDEN
+                                for user in users]
+
+
+class TestCheckObjectPermissions:
+    @pytest.mark.parametrize('is_owner, status_code', [
+        (True, status.HTTP_200_OK),
+        (False, status.HTTP_403_FORBIDDEN)
+    ])
+    def test_object_fetched_once_and_passed_to_handler(self, is_owner, status_code):
+        owner, another_user = get_user_model()(pk=1), get_user_model()(pk=2)
+        fetched_pks, handled_objects = [], []
+
+        def get_user(pk):
+            fetched_pks.append(pk)
+            return owner
+
+        class UserDetailView(APIView):
+            permission_classes = (PermissionValidator, )
+
+            @check_object_permissions(get_user)
+            def get(self, request, pk, obj):
+                handled_objects.append(obj)
+                return Response(status=status.HTTP_200_OK)
+
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=owner if is_owner else another_user)
+        response = UserDetailView.as_view()(request, pk=owner.pk)
+
+        assert response.status_code == status_code
+        assert fetched_pks == [owner.pk]
+        assert handled_objects == ([owner] if is_owner else [])
@@ -0,0 +1,88 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from shop import renderers
+from shop.models import Product
+from shop.parsers import FastJSONParser
+from shop.renderers import FastJSONRenderer
+from shop.serializers.product import ProductOutputSerializer
+
+pytestmark = pytest.mark.skipif(renderers.orjson is None, reason='orjson isn\'t installed')
+
+MIXED_DATA = {
+    'decimal': Decimal('10.99'),
+    'datetime': datetime.datetime(2021, 7, 14, 19, 15, 1, 123456, tzinfo=datetime.timezone.utc),
+    'date': datetime.date(2021, 7, 14),
+    'time': datetime.time(19, 15, 1, 123456),
+    'timedelta': datetime.timedelta(days=1, seconds=5),
+    'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'lazy': gettext_lazy('Not found.'),
+    'unicode': 'Ünïcödé \u2028 \u2029 "quoted" \\ \n',
+    'numbers': [0, -1, 2 ** 63 - 1, 1.5, 2389.0, True, False, None],
+    'nested': [{'a': []}, {}, ()],
+    1: 'integer key',
+}
+
+
+def render_both(data, accepted_media_type=None, renderer_context=None):
+    return (FastJSONRenderer().render(data, accepted_media_type, renderer_context),
+            JSONRenderer().render(data, accepted_media_type, renderer_context))
+
+
+class TestFastJSONRenderer:
+    @pytest.mark.django_db
+    def test_product_list_is_byte_identical(self):
+        data = ProductOutputSerializer(instance=Product.objects.all(), many=True).data
+        fast, default = render_both(data)
+
+        assert fast == default
+
+    @pytest.mark.parametrize('data', [MIXED_DATA, [], {}, 'string', None, 2 ** 64, [{'big': -2 ** 70}]])
+    def test_byte_identical(self, data):
+        fast, default = render_both(data)
+
+        assert fast == default
+
+    @pytest.mark.parametrize('accepted_media_type, renderer_context', [
+        ('application/json; indent=4', None),
+        ('application/json; indent=2', None),
+        (None, {'indent': 4}),
+    ])
+    def test_indented(self, accepted_media_type, renderer_context):
+        fast, default = render_both(MIXED_DATA, accepted_media_type, renderer_context)
+
+        assert fast == default
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        fast, default = render_both(MIXED_DATA)
+
+        assert fast == default
+
+    def test_unknown_type(self):
+        with pytest.raises(TypeError):
+            FastJSONRenderer().render({'object': object()})
+
+
+class TestFastJSONParser:
+    @pytest.mark.parametrize('body', [b'{"a": [1, 2.5, "\\u00fc", null, true]}', '"Ünïcödé"'.encode(), b'[]'])
+    def test_same_as_json_parser(self, body):
+        assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+    @pytest.mark.parametrize('body', [b'{"a": ', b'NaN', b'{"a": Infinity}', b'\xff'])
+    def test_invalid_json(self, body):
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(body))
+
+    def test_latin1_body_is_parsed_by_json_parser(self):
+        body = '"Ünïcödé"'.encode('latin-1')
+
+        assert FastJSONParser().parse(io.BytesIO(body), parser_context={'encoding': 'latin-1'}) == 'Ünïcödé'
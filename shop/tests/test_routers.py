@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from shop.middleware import PRIMARY_PIN_COOKIE_NAME, ReplicaRoutingMiddleware
+from shop.models import Product
+from shop.tests.conftest import EXISTENT_PK
+from shop.routers import PrimaryReplicaRouter, pin_to_primary, read_from_primary, reset_read_from_primary, \
+    set_read_from_primary
+
+REPLICAS = ['replica_0', 'replica_1']
+
+
+@pytest.fixture(autouse=True)
+def replicas(settings):
+    settings.REPLICA_DATABASES = REPLICAS
+
+
+@pytest.fixture
+def replica_reads():
+    token = set_read_from_primary(False)
+    yield
+    reset_read_from_primary(token)
+
+
+@pytest.fixture
+def routed_request():
+    def _routed_request(method, cookies=None):
+        read_databases = []
+
+        def get_response(request):
+            read_databases.append(PrimaryReplicaRouter.db_for_read(Product))
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)('/')
+        request.COOKIES.update(cookies or {})
+        response = ReplicaRoutingMiddleware(get_response)(request)
+        return read_databases[0], response
+    return _routed_request
+
+
+class TestPrimaryReplicaRouter:
+    def test_read_from_primary_by_default(self):
+        assert PrimaryReplicaRouter.db_for_read(Product) == DEFAULT_DB_ALIAS
+
+    def test_read_from_replica(self, replica_reads):
+        assert PrimaryReplicaRouter.db_for_read(Product) in REPLICAS
+
+    def test_read_from_primary_context(self, replica_reads):
+        with read_from_primary():
+            assert PrimaryReplicaRouter.db_for_read(Product) == DEFAULT_DB_ALIAS
+        assert PrimaryReplicaRouter.db_for_read(Product) in REPLICAS
+
+    @pytest.mark.django_db
+    def test_read_from_primary_in_transaction(self, replica_reads):
+        with transaction.atomic():
+            assert PrimaryReplicaRouter.db_for_read(Product) == DEFAULT_DB_ALIAS
+
+    def test_read_without_replicas(self, replica_reads, settings):
+        settings.REPLICA_DATABASES = []
+        assert PrimaryReplicaRouter.db_for_read(Product) == DEFAULT_DB_ALIAS
+
+    def test_write(self, replica_reads):
+        assert PrimaryReplicaRouter.db_for_write(Product) == DEFAULT_DB_ALIAS
+
+    @pytest.mark.parametrize('db, expected', [(DEFAULT_DB_ALIAS, True), ('replica_0', False)])
+    def test_allow_migrate(self, db, expected):
+        assert PrimaryReplicaRouter.allow_migrate(db, 'shop') == expected
+
+
+class TestReplicaRoutingMiddleware:
+    def test_safe_request_reads_from_replica(self, routed_request):
+        read_database, response = routed_request('get')
+
+        assert read_database in REPLICAS
+        assert PRIMARY_PIN_COOKIE_NAME not in response.cookies
+
+    @pytest.mark.parametrize('method', ['post', 'put', 'delete'])
+    def test_unsafe_request_pins_primary(self, method, routed_request):
+        read_database, response = routed_request(method)
+
+        assert read_database == DEFAULT_DB_ALIAS
+        assert response.cookies[PRIMARY_PIN_COOKIE_NAME]['max-age'] == 5
+
+    def test_pinned_safe_request_reads_from_primary(self, routed_request):
+        read_database, _ = routed_request('get', cookies={PRIMARY_PIN_COOKIE_NAME: '1'})
+
+        assert read_database == DEFAULT_DB_ALIAS
+
+    def test_routing_is_reset_after_request(self, routed_request):
+        routed_request('get')
+
+        assert PrimaryReplicaRouter.db_for_read(Product) == DEFAULT_DB_ALIAS
+
+    def test_async_request(self):
+        read_databases = []
+
+        async def get_response(request):
+            read_databases.append(PrimaryReplicaRouter.db_for_read(Product))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = asyncio.run(middleware(RequestFactory().post('/')))
+
+        assert asyncio.iscoroutinefunction(middleware)
+        assert read_databases == [DEFAULT_DB_ALIAS]
+        assert PRIMARY_PIN_COOKIE_NAME in response.cookies
+
+    def test_view_pinned_to_primary(self):
+        read_databases = []
+
+        @pin_to_primary
+        def view(request):
+            read_databases.append(PrimaryReplicaRouter.db_for_read(Product))
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(view)(RequestFactory().get('/'))
+
+        assert read_databases == [DEFAULT_DB_ALIAS]
+        assert PRIMARY_PIN_COOKIE_NAME in response.cookies
+
+
+@pytest.mark.django_db(databases=[DEFAULT_DB_ALIAS, 'replica'])
+class TestReplicaDatabase:
+    """The 'replica' alias of the test settings is a test mirror of the default database"""
+    @pytest.fixture(autouse=True)
+    def replicas(self, settings, monkeypatch):
+        settings.REPLICA_DATABASES = ['replica']
+        # the router reads from the primary database in transactions, the test one stands for committed data here
+        monkeypatch.setattr(connections[DEFAULT_DB_ALIAS], 'in_atomic_block', False)
+
+    def test_safe_request_reads_from_replica(self, api_client):
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            response = api_client.get(reverse('product-list'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert replica_queries
+        assert PRIMARY_PIN_COOKIE_NAME not in response.cookies
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['product-detail-delete-images', 'feedback-detail-delete-images'])
+def test_deleting_safe_request_reads_from_primary(url_name, settings, authenticated_api_client):
+    settings.REPLICA_DATABASES = ['replica']
+    response = authenticated_api_client(is_admin=True).get(reverse(url_name, kwargs={'pk': EXISTENT_PK}))
+
+    assert status.is_success(response.status_code)
+    assert PRIMARY_PIN_COOKIE_NAME in response.cookies
@@ -0,0 +1,136 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from shop.tests.conftest import EXISTENT_PK
+from shop.throttling import CacheTokenBucketStore, LocalTokenBucketStore
+
+
+@pytest.fixture(params=[LocalTokenBucketStore, CacheTokenBucketStore])
+def store(request):
+    store = request.param()
+    store.now = 1000000.0
+    store.timer = lambda: store.now
+    return store
+
+
+@pytest.fixture
+def throttle_rates(settings):
+    def _throttle_rates(**rates):
+        # DRF reloads its settings when REST_FRAMEWORK is changed
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK,
+                                   'DEFAULT_THROTTLE_RATES': {'products': None, 'feedback': None,
+                                                              'registration': None, **rates}}
+    return _throttle_rates
+
+
+class TestTokenBucketStores:
+    def test_burst_of_capacity(self, store):
+        waits = [store.consume('key', 3, 60) for _ in range(4)]
+
+        assert waits[:3] == [0, 0, 0]
+        assert waits[3] == pytest.approx(20)
+
+    def test_refill(self, store):
+        for _ in range(3):
+            store.consume('key', 3, 60)
+        store.now += 20
+
+        assert store.consume('key', 3, 60) == 0
+        assert store.consume('key', 3, 60) > 0
+
+    def test_refused_requests_take_no_tokens(self, store):
+        for _ in range(10):
+            store.consume('key', 3, 60)
+        store.now += 20
+
+        assert store.consume('key', 3, 60) == 0
+
+    def test_idle_bucket_is_full(self, store):
+        for _ in range(3):
+            store.consume('key', 3, 60)
+        store.now += 600
+
+        assert [store.consume('key', 3, 60) for _ in range(3)] == [0, 0, 0]
+
+    def test_buckets_are_separate(self, store):
+        for _ in range(3):
+            store.consume('key', 3, 60)
+
+        assert store.consume('another key', 3, 60) == 0
+
+    def test_full_buckets_are_removed(self):
+        store = LocalTokenBucketStore()
+        store.max_buckets = 2
+        store.consume('first', 1, 1)
+        store.arrival_times['first'] = 0
+        store.consume('second', 1, 1)
+        store.consume('third', 1, 1)
+
+        assert set(store.arrival_times) == {'second', 'third'}
+
+
+@pytest.mark.django_db
+class TestTokenBucketThrottle:
+    def test_anonymous_client_is_throttled(self, api_client, throttle_rates):
+        throttle_rates(products='2/min')
+        responses = [api_client.get(reverse('product-detail', kwargs={'pk': EXISTENT_PK})) for _ in range(3)]
+
+        assert [response.status_code for response in responses] == [status.HTTP_200_OK, status.HTTP_200_OK,
+                                                                    status.HTTP_429_TOO_MANY_REQUESTS]
+        assert responses[2]['Retry-After'] == '30'
+
+    def test_clients_are_throttled_separately(self, api_client, authenticated_api_client, throttle_rates):
+        throttle_rates(products='1/min')
+        api_client.get(reverse('product-list'))
+        another_ip_response = api_client.get(reverse('product-list'), REMOTE_ADDR='10.0.0.1')
+        user_response = authenticated_api_client(is_admin=False).get(reverse('product-list'))
+
+        assert another_ip_response.status_code == status.HTTP_200_OK
+        assert user_response.status_code == status.HTTP_200_OK
+
+    def test_scopes_are_throttled_separately(self, api_client, throttle_rates):
+        throttle_rates(products='1/min', feedback='1/min')
+        api_client.get(reverse('product-list'))
+        response = api_client.get(reverse('feedback-list'))
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_only_registration_is_throttled(self, authenticated_api_client, throttle_rates):
+        throttle_rates(registration='1/hour')
+        client = authenticated_api_client(is_admin=True)
+        responses = [client.post(reverse('user-list'), {'username': username, 'password': 'Secret-password-1'})
+                     for username in ('first', 'second')]
+        response = client.get(reverse('user-list'))
+
+        assert responses[0].status_code != status.HTTP_429_TOO_MANY_REQUESTS
+        assert responses[1].status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize('url_name, kwargs', [
+        ('product-feedback', {'pk': EXISTENT_PK}),
+        ('product-related', {'pk': EXISTENT_PK}),
+        ('async-product-list', {}),
+        ('async-product-detail', {'pk': EXISTENT_PK}),
+        ('async-feedback-list', {}),
+    ])
+    def test_other_views_of_scopes_are_throttled(self, client, throttle_rates, url_name, kwargs):
+        throttle_rates(products='1/min', feedback='1/min')
+        responses = [client.get(reverse(url_name, kwargs=kwargs)) for _ in range(2)]
+
+        assert [response.status_code for response in responses] == [status.HTTP_200_OK,
+                                                                    status.HTTP_429_TOO_MANY_REQUESTS]
+        assert responses[1]['Retry-After'] == '60'
+
+    def test_async_views_share_buckets(self, client, throttle_rates):
+        throttle_rates(products='1/min')
+        client.get(reverse('product-list'))
+        response = client.get(reverse('async-product-list'))
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_not_throttled_without_rate(self, api_client, throttle_rates):
+        throttle_rates()
+        responses = [api_client.get(reverse('product-list')) for _ in range(5)]
+
+        assert {response.status_code for response in responses} == {status.HTTP_200_OK}
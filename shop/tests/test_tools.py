@@ -1,6 +1,6 @@
 import pytest
 
-from shop.tools import are_all_elements_in_list
+from shop.tools import BloomFilter, are_all_elements_in_list
 
 
 @pytest.mark.parametrize('list_1, list_2, expected', [
@@ -14,3 +14,14 @@ from shop.tools import are_all_elements_in_list
 ])
 def test_existence_of_one_list_in_another(list_1: list, list_2: list, expected):
     assert are_all_elements_in_list(list_1, list_2) == expected
+
+
+def test_bloom_filter_contains_all_added_items():
+    bloom_filter = BloomFilter(1000, false_positive_rate=0.01)
+    items = [f'product_images/product_{i}/image.jpg' for i in range(1000)]
+    for item in items:
+        bloom_filter.add(item)
+
+    assert all(item in bloom_filter for item in items)
+    false_positives = sum(f'feedback_images/feedback_{i}/image.jpg' in bloom_filter for i in range(1000))
+    assert false_positives < 50
@@ -0,0 +1,185 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from shop.dal.category import CategoryDAL
+from shop.dal.product import ProductDAL
+from shop.dal.unit_of_work import StaleObjectError, UnitOfWork, identity_map_scope, save_object, set_fields, \
+    unit_of_work
+from shop.middleware import IdentityMapMiddleware
+from shop.models import Category, Product
+
+
+@pytest.mark.django_db
+class TestIdentityMap:
+    def test_same_instance_is_returned_within_scope(self, product):
+        with identity_map_scope():
+            with CaptureQueriesContext(connection) as queries:
+                first = ProductDAL.get_any_product_by_pk(product.pk)
+                second = ProductDAL.get_any_product_by_pk(product.pk)
+        assert first is second
+        assert len(queries) == 1
+
+    def test_instances_are_not_shared_outside_scope(self, product):
+        assert ProductDAL.get_any_product_by_pk(product.pk) is not ProductDAL.get_any_product_by_pk(product.pk)
+
+    def test_scopes_are_independent(self, product):
+        with identity_map_scope():
+            first = ProductDAL.get_any_product_by_pk(product.pk)
+        with identity_map_scope():
+            second = ProductDAL.get_any_product_by_pk(product.pk)
+        assert first is not second
+
+    def test_cached_instance_must_match_manager_filter(self, product_factory):
+        product = product_factory(is_available=False)
+        with identity_map_scope():
+            ProductDAL.get_any_product_by_pk(product.pk)
+            with pytest.raises(Product.DoesNotExist):
+                ProductDAL.get_available_product_by_pk(product.pk)
+
+    def test_deleted_instance_is_forgotten(self, category_factory):
+        category = category_factory()
+        with identity_map_scope():
+            CategoryDAL.delete_category(CategoryDAL.get_category_by_pk(category.pk))
+            with pytest.raises(Category.DoesNotExist):
+                CategoryDAL.get_category_by_pk(category.pk)
+
+    def test_middleware_opens_scope_per_request(self, product):
+        loaded = []
+
+        def get_response(request):
+            loaded.append(ProductDAL.get_any_product_by_pk(product.pk))
+            loaded.append(ProductDAL.get_any_product_by_pk(product.pk))
+            return HttpResponse()
+
+        middleware = IdentityMapMiddleware(get_response)
+        middleware(RequestFactory().get('/'))
+        middleware(RequestFactory().get('/'))
+        assert loaded[0] is loaded[1]
+        assert loaded[1] is not loaded[2]
+
+
+@pytest.mark.django_db
+class TestUnitOfWork:
+    def test_changes_are_written_on_exit(self, category_factory):
+        category = category_factory()
+        with unit_of_work():
+            CategoryDAL.update_category(category, 'Renamed category')
+            assert Category.objects.get(pk=category.pk).name != 'Renamed category'
+        assert Category.objects.get(pk=category.pk).name == 'Renamed category'
+
+    def test_nested_unit_of_work_joins_outer_one(self):
+        with unit_of_work() as outer:
+            with unit_of_work() as inner:
+                assert inner is outer
+
+    def test_dirty_fields_are_merged(self, product):
+        uow = UnitOfWork()
+        uow.register_dirty(product, ['name'])
+        uow.register_dirty(product, ['price'])
+        assert uow.dirty[(Product, product.pk)] == (product, {'name', 'price'}, None)
+        uow.register_dirty(product)
+        assert uow.dirty[(Product, product.pk)] == (product, None, None)
+
+    def test_first_base_version_is_kept(self, product):
+        uow = UnitOfWork()
+        uow.register_dirty(product, ['name'], base_version=1)
+        uow.register_dirty(product, ['price'], base_version=2)
+        assert uow.dirty[(Product, product.pk)] == (product, {'name', 'price'}, 1)
+
+    def test_one_update_per_changed_instance(self, category_factory):
+        category = category_factory()
+        with CaptureQueriesContext(connection) as queries:
+            with unit_of_work():
+                CategoryDAL.update_category(category, 'First name')
+                CategoryDAL.update_category(category, 'Second name')
+        assert len([query for query in queries if query['sql'].startswith('UPDATE')]) == 1
+        assert Category.objects.get(pk=category.pk).name == 'Second name'
+
+    def test_new_instances_are_inserted_in_one_query(self, product, get_in_memory_image_file):
+        images = [SimpleUploadedFile(f'image{i}.jpg', get_in_memory_image_file.getvalue()) for i in range(3)]
+        with CaptureQueriesContext(connection) as queries:
+            with unit_of_work():
+                ProductDAL.create_images(product, images[:2])
+                ProductDAL.create_images(product, images[2:])
+        assert len([query for query in queries if query['sql'].startswith('INSERT')]) == 1
+        assert product.images.count() == 3
+
+    def test_deleted_instance_is_not_updated(self, category_factory):
+        category = category_factory()
+        with CaptureQueriesContext(connection) as queries:
+            with unit_of_work():
+                CategoryDAL.update_category(category, 'Renamed category')
+                CategoryDAL.delete_category(category)
+        assert not [query for query in queries if query['sql'].startswith('UPDATE')]
+        assert not Category.objects.filter(pk=category.pk).exists()
+
+    def test_nothing_is_written_on_error(self, category_factory):
+        category = category_factory()
+        with pytest.raises(ValueError):
+            with unit_of_work():
+                CategoryDAL.update_category(category, 'Renamed category')
+                raise ValueError
+        assert Category.objects.get(pk=category.pk).name != 'Renamed category'
+
+
+@pytest.mark.django_db
+class TestConditionalUpdate:
+    def test_row_of_base_version_is_updated(self, product):
+        product.name = 'Renamed product'
+        with CaptureQueriesContext(connection) as queries:
+            save_object(product, update_fields=['name'], base_version=product.version)
+
+        product_row = Product.objects.get(pk=product.pk)
+        assert (product_row.name, product_row.version) == ('Renamed product', 2)
+        assert product.version == 2
+        assert not [query for query in queries if 'FOR UPDATE' in query['sql']]
+
+    def test_changed_row_is_not_updated(self, product):
+        Product.objects.filter(pk=product.pk).update(version=5)
+        product.name = 'Renamed product'
+        with pytest.raises(StaleObjectError):
+            with unit_of_work():
+                save_object(product, update_fields=['name'], base_version=1)
+
+        assert Product.objects.get(pk=product.pk).name != 'Renamed product'
+
+    def test_save_increments_version(self, product):
+        product.name = 'Renamed product'
+        product.save(update_fields=['name'])
+        product.save()
+
+        assert Product.objects.get(pk=product.pk).version == 3
+
+
+@pytest.mark.django_db
+class TestChangedFields:
+    def update_product(self, product, **values):
+        values = {'category': product.category, 'name': product.name, 'price': product.price,
+                  'description': product.description, 'size': product.size, 'weight': product.weight,
+                  'stock': product.stock, 'is_available': product.is_available, **values}
+        with CaptureQueriesContext(connection) as queries:
+            ProductDAL.update_product(product, **values)
+        return [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+
+    def test_unchanged_object_is_not_written(self, product):
+        assert self.update_product(product) == []
+        assert Product.objects.get(pk=product.pk).version == product.version == 1
+
+    def test_only_changed_fields_are_written(self, product):
+        updates = self.update_product(product, name='Renamed product')
+
+        assert len(updates) == 1
+        assert 'updated_at' in updates[0]
+        assert 'description' not in updates[0]
+        assert Product.objects.get(pk=product.pk).name == 'Renamed product'
+
+    def test_set_fields(self, product, category_factory):
+        category = category_factory()
+        changed_fields = set_fields(product, category=product.category, name=product.name, price=product.price + 1)
+        assert changed_fields == ['price']
+        assert set_fields(product, category=category) == ['category']
+        assert product.category_id == category.pk
@@ -0,0 +1,130 @@
+from datetime import date, datetime, time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from shop.dal.analytics import AnalyticsDAL
+from shop.dal.order import OrderDAL
+from shop.dal.order_item import OrderItemDAL
+from shop.dal.user import UserDAL
+from shop.models import Order, StaleSalesDay
+
+SALES_DAY = date(2020, 1, 15)
+QUERY = {'start': SALES_DAY.isoformat(), 'end': SALES_DAY.isoformat()}
+
+
+@pytest.fixture(autouse=True)
+def no_overlap(settings):
+    settings.ROLLUP_OVERLAP_SECONDS = 0
+
+
+@pytest.fixture
+def create_order_on_day(order_factory):
+    def _create_order_on_day(day=SALES_DAY, **kwargs):
+        order = order_factory(**kwargs)
+        order.created_at = timezone.make_aware(datetime.combine(day, time(12)))
+        Order.objects.filter(pk=order.pk).update(created_at=order.created_at)
+        return order
+    return _create_order_on_day
+
+
+@pytest.fixture
+def sales(create_order_on_day, product_factory, order_item_factory):
+    """Two orders of the sales day, one of them is paid, with 5 units of a product for 10 in total"""
+    product = product_factory(price=2)
+    paid_order, unpaid_order = create_order_on_day(is_paid=True), create_order_on_day()
+    order_item_factory(product=product, order=paid_order, quantity=2)
+    order_item_factory(product=product, order=unpaid_order, quantity=3)
+    AnalyticsDAL.refresh_sales_rollups(full=True)
+    return product, paid_order, unpaid_order
+
+
+@pytest.mark.django_db
+class TestAnalyticsViews:
+    def test_revenue(self, authenticated_api_client, sales):
+        response = authenticated_api_client(is_admin=True).get(reverse('analytics-revenue'), QUERY)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == [{'date': SALES_DAY.isoformat(), 'units': 5, 'revenue': '10.00'}]
+
+    def test_revenue_of_paid_orders(self, authenticated_api_client, sales):
+        response = authenticated_api_client(is_admin=True).get(reverse('analytics-revenue'),
+                                                               {**QUERY, 'is_paid': 'true'})
+
+        assert response.data == [{'date': SALES_DAY.isoformat(), 'units': 2, 'revenue': '4.00'}]
+
+    def test_products(self, authenticated_api_client, sales):
+        product, *_ = sales
+        response = authenticated_api_client(is_admin=True).get(reverse('analytics-products'), QUERY)
+
+        assert response.data == [{'product': product.pk, 'name': product.name, 'units': 5, 'revenue': '10.00'}]
+
+    def test_categories(self, authenticated_api_client, sales):
+        product, *_ = sales
+        response = authenticated_api_client(is_admin=True).get(reverse('analytics-categories'), QUERY)
+
+        assert response.data == [{'category': product.category.pk, 'name': product.category.name, 'units': 5,
+                                  'revenue': '10.00'}]
+
+    def test_orders(self, authenticated_api_client, sales, create_order_on_day):
+        create_order_on_day()  # without items
+        AnalyticsDAL.refresh_sales_rollups()
+        response = authenticated_api_client(is_admin=True).get(reverse('analytics-orders'), QUERY)
+
+        assert response.data == [{'date': SALES_DAY.isoformat(), 'paid': 1, 'unpaid': 2}]
+
+    def test_forbidden_for_not_staff(self, authenticated_api_client):
+        response = authenticated_api_client(is_admin=False).get(reverse('analytics-revenue'), QUERY)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_invalid_range(self, authenticated_api_client):
+        response = authenticated_api_client(is_admin=True).get(reverse('analytics-revenue'),
+                                                               {'start': '2020-02-01', 'end': '2020-01-01'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestSalesRollupRefresh:
+    def test_unchanged_days_are_not_recomputed(self, sales):
+        with CaptureQueriesContext(connection) as queries:
+            day_count = AnalyticsDAL.refresh_sales_rollups()
+
+        assert day_count == 0
+        assert not [query for query in queries if query['sql'].startswith('INSERT INTO "shop_dailyproductsales"')]
+
+    def test_new_order_item_refreshes_its_day(self, sales):
+        product, paid_order, _ = sales
+        OrderItemDAL.insert_order_item(product, paid_order, 4)
+
+        assert AnalyticsDAL.refresh_sales_rollups() == 1
+        assert AnalyticsDAL.get_daily_revenue(SALES_DAY, SALES_DAY).get()['units'] == 9
+
+    def test_paid_order_moves_sales(self, sales):
+        _, _, unpaid_order = sales
+        OrderDAL.mark_orders_paid(Order.objects.filter(pk=unpaid_order.pk))
+        AnalyticsDAL.refresh_sales_rollups()
+
+        assert AnalyticsDAL.get_daily_revenue(SALES_DAY, SALES_DAY, is_paid=True).get()['units'] == 5
+
+    def test_deleted_order_marks_its_day_stale(self, sales):
+        _, paid_order, _ = sales
+        OrderDAL.delete_order(paid_order)
+
+        assert StaleSalesDay.objects.filter(date=SALES_DAY).exists()
+        assert AnalyticsDAL.refresh_sales_rollups() == 1
+        assert AnalyticsDAL.get_daily_revenue(SALES_DAY, SALES_DAY).get()['units'] == 3
+        assert not StaleSalesDay.objects.exists()
+
+    def test_deleted_user_marks_days_of_orders_stale(self, sales, create_order_on_day, user_factory):
+        user = user_factory()
+        create_order_on_day(date(2020, 2, 1), user=user)
+        create_order_on_day(date(2020, 2, 2), user=user)
+        UserDAL.delete_user(user)
+
+        assert set(StaleSalesDay.objects.values_list('date', flat=True)) == {date(2020, 2, 1), date(2020, 2, 2)}
@@ -0,0 +1,142 @@
+import base64
+import json
+
+import pytest
+from django import db
+from django.db.models import Count
+from django.urls import reverse
+from rest_framework import status
+
+from shop.models import Category, Feedback, Product
+from shop.serializers.category import CategoryOutputSerializer
+from shop.serializers.feedback import FeedbackOutputSerializer
+from shop.serializers.product import ProductOutputSerializer
+from shop.tests.conftest import NONEXISTENT_PK
+from shop.views import async_read
+
+
+@pytest.fixture
+def async_view_client(client, user_factory):
+    def _async_view_client(is_admin=None):
+        if is_admin is not None:
+            client.force_login(user_factory(is_staff=is_admin))
+        return client
+    return _async_view_client
+
+
+def get_basic_auth_header(username, password):
+    return 'Basic ' + base64.b64encode(f'{username}:{password}'.encode()).decode()
+
+
+def get_json(response):
+    return json.loads(response.content)
+
+
+def serialized(data):
+    # JsonResponse output compared with the serializer output encoded the same way
+    return json.loads(json.dumps(data))
+
+
+@pytest.mark.django_db
+class TestAsyncReadViews:
+    @pytest.mark.parametrize('is_admin', [None, False])
+    def test_get_product_list_by_ordinary_users(self, is_admin, async_view_client):
+        response = async_view_client(is_admin).get(reverse('async-product-list'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert get_json(response) == serialized(
+            ProductOutputSerializer(Product.available_products.all(), many=True).data)
+
+    def test_get_product_list_by_admin(self, async_view_client):
+        response = async_view_client(is_admin=True).get(reverse('async-product-list'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert get_json(response) == serialized(ProductOutputSerializer(Product.objects.all(), many=True).data)
+
+    def test_get_product_list_by_category(self, async_view_client):
+        category = Category.objects.annotate(products_count=Count('products')).filter(products_count__gt=1).first()
+        url = reverse('async-product-list-by-category', kwargs={'category_pk': category.pk})
+        response = async_view_client().get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert get_json(response) == serialized(
+            ProductOutputSerializer(Product.available_products.filter(category=category), many=True).data)
+
+    def test_get_product(self, async_view_client):
+        product = Product.available_products.first()
+        response = async_view_client().get(reverse('async-product-detail', kwargs={'pk': product.pk}))
+
+        assert response.status_code == status.HTTP_200_OK
+        data = get_json(response)
+        assert data.pop('feedback')['results'] == serialized(
+            FeedbackOutputSerializer(Feedback.moderated_feedback.filter(product=product).order_by('-created_at', '-id')
+                                     [:10], many=True, fields_to_remove=['product']).data)
+        assert data == serialized(ProductOutputSerializer(product).data)
+
+    @pytest.mark.parametrize('pk_getter', [
+        pytest.param(lambda: NONEXISTENT_PK, id='Nonexistent'),
+        pytest.param(lambda: Product.objects.filter(is_available=False).first().pk, id='Unavailable'),
+    ])
+    def test_get_not_found_product(self, pk_getter, async_view_client):
+        response = async_view_client().get(reverse('async-product-detail', kwargs={'pk': pk_getter()}))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_get_category_list_by_admin(self, async_view_client):
+        response = async_view_client(is_admin=True).get(reverse('async-category-list'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert get_json(response) == serialized(CategoryOutputSerializer(Category.objects.all(), many=True).data)
+
+    @pytest.mark.parametrize('is_admin', [None, False])
+    def test_get_category_list_by_ordinary_users(self, is_admin, async_view_client):
+        response = async_view_client(is_admin).get(reverse('async-category-list'))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_get_feedback_list(self, async_view_client):
+        response = async_view_client().get(reverse('async-feedback-list'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert get_json(response) == serialized(
+            FeedbackOutputSerializer(Feedback.moderated_feedback.all(), many=True).data)
+
+    @pytest.mark.parametrize('url', ['async-product-list', 'async-feedback-list', 'async-category-list'])
+    def test_send_unsupported_method(self, url, async_view_client):
+        response = async_view_client(is_admin=True).post(reverse(url))
+
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+        assert response['allow'] == 'GET, HEAD'
+
+    def test_basic_authentication(self, client, user_factory):
+        user = user_factory(is_staff=True)
+        user.set_password('password')
+        user.save()
+        response = client.get(reverse('async-category-list'),
+                              HTTP_AUTHORIZATION=get_basic_auth_header(user.username, 'password'))
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_invalid_basic_credentials(self, client, user_factory):
+        user = user_factory(is_staff=True)
+        auth_header = get_basic_auth_header(user.username, 'wrong password')
+        response = client.get(reverse('async-product-list'), HTTP_AUTHORIZATION=auth_header)
+        sync_response = client.get(reverse('product-list'), HTTP_AUTHORIZATION=auth_header)
+
+        assert response.status_code == sync_response.status_code == status.HTTP_403_FORBIDDEN
+        assert get_json(response) == sync_response.json()
+
+    def test_not_thread_sensitive_worker(self, settings, monkeypatch, async_view_client):
+        settings.ASYNC_READ_VIEWS_THREAD_SENSITIVE = False
+        closed = []
+
+        def close_old_connections():
+            closed.append(True)
+            db.close_old_connections()
+        monkeypatch.setattr(async_read, 'close_old_connections', close_old_connections)
+        response = async_view_client().get(reverse('async-product-list'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert get_json(response) == serialized(
+            ProductOutputSerializer(Product.available_products.all(), many=True).data)
+        assert closed
@@ -0,0 +1,166 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from shop.dal.cart import CartDAL, MAX_QUANTITY
+from shop.models import Order
+
+
+@pytest.fixture
+def cart_client(authenticated_api_client, user_factory):
+    user = user_factory()
+    client = authenticated_api_client(is_admin=False, user=user)
+    client.user = user
+    return client
+
+
+@pytest.fixture
+def address(cart_client, address_factory):
+    return address_factory(user=cart_client.user)
+
+
+@pytest.mark.django_db
+class TestCartViews:
+    def test_forbidden_for_anonymous(self, api_client):
+        response = api_client.get(reverse('cart'))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_empty_cart(self, cart_client):
+        response = cart_client.get(reverse('cart'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == []
+
+    def test_add_increments_quantity(self, cart_client, product):
+        cart_client.post(reverse('cart-item-list'), {'product': product.pk, 'quantity': 2})
+        response = cart_client.post(reverse('cart-item-list'), {'product': product.pk, 'quantity': 3})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == [{'product': product.pk, 'quantity': 5}]
+        assert cart_client.get(reverse('cart')).data == response.data
+
+    def test_quantity_is_capped(self, cart_client, product):
+        for _ in range(2):
+            response = cart_client.post(reverse('cart-item-list'), {'product': product.pk, 'quantity': MAX_QUANTITY})
+
+        assert response.data == [{'product': product.pk, 'quantity': MAX_QUANTITY}]
+
+    def test_changes_stay_out_of_database(self, cart_client, product):
+        with CaptureQueriesContext(connection) as queries:
+            cart_client.post(reverse('cart-item-list'), {'product': product.pk, 'quantity': 2})
+            cart_client.put(reverse('cart-item-detail', kwargs={'product_pk': product.pk}), {'quantity': 1})
+            cart_client.get(reverse('cart'))
+
+        assert not [query for query in queries if not query['sql'].startswith('SELECT')]
+
+    def test_unavailable_product_is_rejected(self, cart_client, product_factory):
+        product = product_factory(is_available=False)
+        response = cart_client.post(reverse('cart-item-list'), {'product': product.pk})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_cart_size_is_limited(self, settings, cart_client, product_factory):
+        settings.CART_MAX_ITEMS = 1
+        cart_client.post(reverse('cart-item-list'), {'product': product_factory().pk})
+        response = cart_client.post(reverse('cart-item-list'), {'product': product_factory().pk})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_cart_size_is_checked_under_lock(self, settings, cart_client, product_factory, monkeypatch):
+        settings.CART_MAX_ITEMS = 1
+        first_product, second_product = product_factory.create_batch(2)
+        lock_cart = CartDAL.lock_cart
+
+        def lock_cart_after_concurrent_add(user_pk, **kwargs):
+            # another request adds a product while this one waits for the lock
+            CartDAL.save_cart(user_pk, {first_product.pk: 1})
+            return lock_cart(user_pk, **kwargs)
+        monkeypatch.setattr(CartDAL, 'lock_cart', staticmethod(lock_cart_after_concurrent_add))
+        response = cart_client.post(reverse('cart-item-list'), {'product': second_product.pk})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert CartDAL.get_cart(cart_client.user.pk) == {first_product.pk: 1}
+
+    def test_set_and_remove_quantity(self, cart_client, product):
+        cart_client.post(reverse('cart-item-list'), {'product': product.pk})
+        url = reverse('cart-item-detail', kwargs={'product_pk': product.pk})
+        response = cart_client.put(url, {'quantity': 7})
+
+        assert response.data == [{'product': product.pk, 'quantity': 7}]
+        assert cart_client.delete(url).status_code == status.HTTP_204_NO_CONTENT
+        assert cart_client.get(reverse('cart')).data == []
+        assert cart_client.put(url, {'quantity': 1}).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_carts_of_users_are_separate(self, cart_client, authenticated_api_client, product):
+        cart_client.post(reverse('cart-item-list'), {'product': product.pk})
+        response = authenticated_api_client(is_admin=False).get(reverse('cart'))
+
+        assert response.data == []
+
+    def test_clear_cart(self, cart_client, product):
+        cart_client.post(reverse('cart-item-list'), {'product': product.pk})
+        response = cart_client.delete(reverse('cart'))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert cart_client.get(reverse('cart')).data == []
+
+    def test_busy_cart(self, cart_client, product, monkeypatch):
+        monkeypatch.setattr('shop.dal.cart.CART_LOCK_WAIT', 0)
+        with CartDAL.lock_cart(cart_client.user.pk):
+            response = cart_client.post(reverse('cart-item-list'), {'product': product.pk})
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+
+@pytest.mark.django_db
+class TestCheckout:
+    def test_checkout(self, cart_client, address, product_factory, django_capture_on_commit_callbacks):
+        products = product_factory.create_batch(2)
+        for quantity, product in enumerate(products, start=1):
+            cart_client.post(reverse('cart-item-list'), {'product': product.pk, 'quantity': quantity})
+        with django_capture_on_commit_callbacks(execute=True):
+            response = cart_client.post(reverse('cart-checkout'), {'address': address.pk})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        order = Order.objects.get(pk=response.data['id'])
+        assert (order.user, order.address) == (cart_client.user, address)
+        assert {(item.product, item.quantity) for item in order.order_items.all()} == {(products[0], 1),
+                                                                                       (products[1], 2)}
+        assert cart_client.get(reverse('cart')).data == []
+
+    def test_empty_cart(self, cart_client, address):
+        response = cart_client.post(reverse('cart-checkout'), {'address': address.pk})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_address_of_another_user(self, cart_client, product, address_factory):
+        cart_client.post(reverse('cart-item-list'), {'product': product.pk})
+        response = cart_client.post(reverse('cart-checkout'), {'address': address_factory().pk})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_product_became_unavailable(self, cart_client, address, product):
+        cart_client.post(reverse('cart-item-list'), {'product': product.pk})
+        order_count = Order.objects.count()
+        product.is_available = False
+        product.save()
+        response = cart_client.post(reverse('cart-checkout'), {'address': address.pk})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Order.objects.count() == order_count
+        assert cart_client.get(reverse('cart')).data == [{'product': product.pk, 'quantity': 1}]
+
+    def test_failed_checkout_keeps_cart(self, cart_client, address, product, monkeypatch):
+        def fail(*args):
+            raise RuntimeError
+        monkeypatch.setattr('shop.dal.order_item.OrderItemDAL.insert_order_items', fail)
+        cart_client.post(reverse('cart-item-list'), {'product': product.pk})
+        order_count = Order.objects.count()
+        with pytest.raises(RuntimeError):
+            cart_client.post(reverse('cart-checkout'), {'address': address.pk})
+
+        assert Order.objects.count() == order_count
+        assert cart_client.get(reverse('cart')).data == [{'product': product.pk, 'quantity': 1}]
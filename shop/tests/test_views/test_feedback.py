@@ -2,7 +2,9 @@ from enum import Enum, auto
 
 import pytest
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
 from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
@@ -225,6 +227,37 @@ class TestFeedbackViews:
 
         assert response.status_code == status.HTTP_204_NO_CONTENT
 
+    def test_product_feedback_count_after_delete(self, authenticated_api_client):
+        moderated_feedback = Feedback.moderated_feedback.first()
+        product = moderated_feedback.product
+        url = reverse('feedback-detail', kwargs={'pk': moderated_feedback.pk})
+        authenticated_api_client(is_admin=True).delete(url)
+        product.refresh_from_db()
+
+        assert product.feedback_count == Feedback.moderated_feedback.filter(product=product).count()
+
+    def test_product_feedback_count_after_put(self, authenticated_api_client, feedback_data):
+        moderated_feedback = Feedback.moderated_feedback.first()
+        old_product = moderated_feedback.product
+        old_feedback_count = old_product.feedback_count
+        url = reverse('feedback-detail', kwargs={'pk': moderated_feedback.pk})
+        authenticated_api_client(is_admin=True).put(url, data=feedback_data())
+        old_product.refresh_from_db()
+
+        # the changed feedback has to be moderated again
+        assert old_product.feedback_count == old_feedback_count - 1
+
+    def test_unchanged_feedback_stays_moderated(self, authenticated_api_client):
+        moderated_feedback = Feedback.moderated_feedback.first()
+        url = reverse('feedback-detail', kwargs={'pk': moderated_feedback.pk})
+        data = {'product': moderated_feedback.product_id, 'title': moderated_feedback.title,
+                'content': moderated_feedback.content}
+        response = authenticated_api_client(is_admin=True).put(url, data=data)
+        moderated_feedback.refresh_from_db()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert moderated_feedback.is_moderated
+
 
 @pytest.mark.django_db
 class TestFeedbackImagesRemover:
@@ -262,3 +295,81 @@ class TestFeedbackImagesRemover:
         response = authenticated_api_client(is_admin=True).get(url)
 
         assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.django_db
+class TestFeedbackModerationView:
+    @pytest.mark.parametrize('client_type', [
+        ClientType.NOT_AUTH_CLIENT,
+        ClientType.AUTH_CLIENT
+    ])
+    @pytest.mark.parametrize('method', ['get', 'post'])
+    def test_forbidden_moderation(self, client_type, method, multi_client):
+        url = reverse('feedback-moderation')
+        response = getattr(multi_client(client_type), method)(url, data={'ids': [EXISTENT_PK], 'action': 'approve'})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_queue_contains_unmoderated_feedback_oldest_first(self, authenticated_api_client, feedback_factory):
+        feedback_factory(is_rejected=True)
+        client = authenticated_api_client(is_admin=True)
+        url = f'{reverse("feedback-moderation")}?page_size=3'
+        queue = []
+        while url is not None:
+            response = client.get(url)
+            queue.extend(feedback['id'] for feedback in response.data['results'])
+            url = response.data['next']
+
+        expected_queue = Feedback.objects.filter(is_moderated=False, is_rejected=False).order_by('created_at', 'id')
+        assert queue == list(expected_queue.values_list('id', flat=True))
+
+    @pytest.mark.parametrize('action, is_moderated, is_rejected', [
+        ('approve', True, False),
+        ('reject', False, True),
+    ])
+    def test_moderate_feedback(self, action, is_moderated, is_rejected, authenticated_api_client, product,
+                               feedback_factory):
+        feedback_pks = [feedback.pk for feedback in feedback_factory.create_batch(5, product=product)]
+        url = reverse('feedback-moderation')
+        response = authenticated_api_client(is_admin=True).post(url, data={'ids': feedback_pks, 'action': action})
+        product.refresh_from_db()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {'updated': 5}
+        assert Feedback.objects.filter(pk__in=feedback_pks, is_moderated=is_moderated,
+                                       is_rejected=is_rejected).count() == 5
+        assert product.feedback_count == (5 if is_moderated else 0)
+
+    def test_number_of_updates_doesnt_depend_on_number_of_feedback(self, authenticated_api_client, product_factory,
+                                                                   feedback_factory):
+        client = authenticated_api_client(is_admin=True)
+        url = reverse('feedback-moderation')
+        update_counts = []
+        for feedback_count in (1, 10):
+            feedback_pks = [feedback.pk for feedback in feedback_factory.create_batch(feedback_count)]
+            with CaptureQueriesContext(connection) as queries:
+                client.post(url, data={'ids': feedback_pks, 'action': 'approve'})
+            update_counts.append(len([query for query in queries if query['sql'].startswith('UPDATE')]))
+        assert update_counts[0] == update_counts[1] == 2
+
+    def test_cached_product_is_invalidated_after_commit(self, api_client, authenticated_api_client, product,
+                                                         feedback_factory, django_capture_on_commit_callbacks):
+        feedback = feedback_factory(product=product)
+        product_url = reverse('product-detail', kwargs={'pk': product.pk})
+        assert api_client.get(product_url).data['feedback_count'] == 0
+        with django_capture_on_commit_callbacks() as callbacks:
+            authenticated_api_client(is_admin=True).post(reverse('feedback-moderation'),
+                                                         data={'ids': [feedback.pk], 'action': 'approve'})
+        api_client.force_authenticate(user=None)
+
+        # until the transaction is committed, the cached product stays as it is
+        assert api_client.get(product_url).data['feedback_count'] == 0
+        for callback in callbacks:
+            callback()
+        assert api_client.get(product_url).data['feedback_count'] == 1
+
+    def test_unknown_action(self, authenticated_api_client):
+        url = reverse('feedback-moderation')
+        response = authenticated_api_client(is_admin=True).post(url, data={'ids': [EXISTENT_PK], 'action': 'delete'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
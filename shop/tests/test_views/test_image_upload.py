@@ -0,0 +1,204 @@
+import io
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+
+from shop.controllers.image_upload import ImageUploadController
+from shop.exceptions import UploadOffsetConflict
+from shop.models import Feedback, ImageUpload, Product
+from shop.tests.conftest import EXISTENT_PK
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(settings, tmp_path):
+    settings.IMAGE_UPLOAD_DIR = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def image_bytes(get_in_memory_image_file):
+    return get_in_memory_image_file.getvalue()
+
+
+@pytest.fixture
+def upload_chunk():
+    def _upload_chunk(client, upload_pk, data, start, total):
+        url = reverse('image-upload-detail', kwargs={'pk': upload_pk})
+        return client.put(url, data=data, content_type='application/octet-stream',
+                          HTTP_CONTENT_RANGE=f'bytes {start}-{start + len(data) - 1}/{total}')
+    return _upload_chunk
+
+
+@pytest.fixture
+def complete_upload(upload_chunk, image_bytes):
+    def _complete_upload(client):
+        response = client.post(reverse('image-upload-list'), {'file_name': 'photo.jpg', 'size': len(image_bytes)})
+        upload_pk = response.data['id']
+        for start in range(0, len(image_bytes), 100):
+            upload_chunk(client, upload_pk, image_bytes[start:start + 100], start, len(image_bytes))
+        return upload_pk
+    return _complete_upload
+
+
+@pytest.mark.django_db
+class TestImageUploadView:
+    def test_forbidden_start_upload(self, api_client):
+        response = api_client.post(reverse('image-upload-list'), {'file_name': 'photo.jpg', 'size': 10})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_too_large_upload(self, settings, authenticated_api_client):
+        response = authenticated_api_client(is_admin=False).post(
+            reverse('image-upload-list'), {'file_name': 'photo.jpg', 'size': settings.IMAGE_UPLOAD_MAX_SIZE + 1})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_chunked_upload(self, authenticated_api_client, complete_upload, image_bytes, upload_dir):
+        upload_pk = complete_upload(authenticated_api_client(is_admin=False))
+        upload = ImageUpload.objects.get(pk=upload_pk)
+
+        assert upload.is_complete
+        assert upload.received_size == len(image_bytes)
+        assert (upload_dir / str(upload_pk)).read_bytes() == image_bytes
+
+    def test_resume_after_interrupted_chunk(self, authenticated_api_client, upload_chunk, image_bytes):
+        client = authenticated_api_client(is_admin=False)
+        upload_pk = client.post(reverse('image-upload-list'), {'file_name': 'photo.jpg', 'size': len(image_bytes)}) \
+            .data['id']
+        url = reverse('image-upload-detail', kwargs={'pk': upload_pk})
+        # the body ends before the declared range does
+        client.put(url, data=image_bytes[:50], content_type='application/octet-stream',
+                   HTTP_CONTENT_RANGE=f'bytes 0-99/{len(image_bytes)}')
+        received_size = client.get(url).data['received_size']
+        response = upload_chunk(client, upload_pk, image_bytes[received_size:], received_size, len(image_bytes))
+
+        assert received_size == 50
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['is_complete']
+
+    def test_chunk_at_wrong_offset(self, authenticated_api_client, upload_chunk, image_bytes):
+        client = authenticated_api_client(is_admin=False)
+        upload_pk = client.post(reverse('image-upload-list'), {'file_name': 'photo.jpg', 'size': len(image_bytes)}) \
+            .data['id']
+        response = upload_chunk(client, upload_pk, image_bytes[100:200], 100, len(image_bytes))
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    def test_body_larger_than_range(self, authenticated_api_client, image_bytes):
+        client = authenticated_api_client(is_admin=False)
+        upload_pk = client.post(reverse('image-upload-list'), {'file_name': 'photo.jpg', 'size': len(image_bytes)}) \
+            .data['id']
+        url = reverse('image-upload-detail', kwargs={'pk': upload_pk})
+        response = client.put(url, data=image_bytes[:200], content_type='application/octet-stream',
+                              HTTP_CONTENT_RANGE=f'bytes 0-99/{len(image_bytes)}')
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert ImageUpload.objects.get(pk=upload_pk).received_size == 0
+
+    def test_chunk_larger_than_limit(self, settings, authenticated_api_client, upload_chunk, image_bytes):
+        settings.IMAGE_UPLOAD_CHUNK_MAX_SIZE = 100
+        client = authenticated_api_client(is_admin=False)
+        upload_pk = client.post(reverse('image-upload-list'), {'file_name': 'photo.jpg', 'size': len(image_bytes)}) \
+            .data['id']
+        response = upload_chunk(client, upload_pk, image_bytes[:101], 0, len(image_bytes))
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    def test_not_an_image_is_rejected(self, authenticated_api_client, upload_chunk):
+        client = authenticated_api_client(is_admin=False)
+        upload_pk = client.post(reverse('image-upload-list'), {'file_name': 'photo.jpg', 'size': 10}).data['id']
+        response = upload_chunk(client, upload_pk, b'0123456789', 0, 10)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not ImageUpload.objects.filter(pk=upload_pk).exists()
+
+    def test_body_is_read_outside_transaction(self, authenticated_api_client, image_bytes):
+        client = authenticated_api_client(is_admin=False)
+        upload_pk = client.post(reverse('image-upload-list'), {'file_name': 'photo.jpg', 'size': len(image_bytes)}) \
+            .data['id']
+        upload = ImageUpload.objects.get(pk=upload_pk)
+        transaction_depths = []
+
+        class RecordingStream(io.BytesIO):
+            def read(self, size=-1):
+                transaction_depths.append(len(connection.savepoint_ids))
+                return super().read(size)
+
+        test_transaction_depth = len(connection.savepoint_ids)
+        ImageUploadController.write_chunk(upload, RecordingStream(image_bytes[:100]), f'bytes 0-99/{len(image_bytes)}')
+
+        assert set(transaction_depths) == {test_transaction_depth}
+        assert ImageUpload.objects.get(pk=upload_pk).received_size == 100
+
+    def test_concurrent_chunk_at_same_offset(self, authenticated_api_client, image_bytes, upload_dir):
+        client = authenticated_api_client(is_admin=False)
+        upload_pk = client.post(reverse('image-upload-list'), {'file_name': 'photo.jpg', 'size': len(image_bytes)}) \
+            .data['id']
+        upload = ImageUpload.objects.get(pk=upload_pk)
+
+        class SlowStream(io.BytesIO):
+            def read(self, size=-1):
+                # another request adds its chunk at the same offset while this one is being received
+                ImageUpload.objects.filter(pk=upload_pk).update(received_size=100)
+                return super().read(size)
+
+        with pytest.raises(UploadOffsetConflict) as exc_info:
+            ImageUploadController.write_chunk(upload, SlowStream(b'x' * 100), f'bytes 0-99/{len(image_bytes)}')
+
+        assert exc_info.value.received_size == 100
+        assert (upload_dir / str(upload_pk)).read_bytes() == b''
+        assert [path.name for path in upload_dir.iterdir()] == [str(upload_pk)]
+
+    def test_forbidden_upload_of_another_user(self, authenticated_api_client, user_factory, upload_chunk):
+        client = authenticated_api_client(is_admin=False)
+        upload_pk = client.post(reverse('image-upload-list'), {'file_name': 'photo.jpg', 'size': 10}).data['id']
+        client = authenticated_api_client(is_admin=False, user=user_factory())
+        response = upload_chunk(client, upload_pk, b'0123456789', 0, 10)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestUploadsAsImages:
+    def test_create_product_with_uploads(self, authenticated_api_client, complete_upload, product_factory):
+        client = authenticated_api_client(is_admin=True)
+        upload_pk = complete_upload(client)
+        data = {'category': EXISTENT_PK, 'name': 'Uploaded product', 'price': 10, 'description': 'description',
+                'size': 'size', 'weight': 10, 'stock': 1, 'uploads': [upload_pk]}
+        response = client.post(reverse('product-list'), data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        image = Product.objects.get(name='Uploaded product').images.get()
+        assert image.image.name.endswith('photo.jpg')
+        assert not ImageUpload.objects.filter(pk=upload_pk).exists()
+
+    def test_create_feedback_with_uploads(self, authenticated_api_client, complete_upload, product):
+        client = authenticated_api_client(is_admin=False)
+        upload_pk = complete_upload(client)
+        data = {'product': product.pk, 'title': 'Uploaded feedback', 'content': 'content', 'uploads': [upload_pk]}
+        response = client.post(reverse('feedback-list'), data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Feedback.objects.get(title='Uploaded feedback').images.count() == 1
+
+    def test_upload_files_are_not_left_open(self, authenticated_api_client, complete_upload, image_bytes):
+        client = authenticated_api_client(is_admin=False)
+        upload_pk = complete_upload(client)
+        user = ImageUpload.objects.get(pk=upload_pk).owner
+        image_file, = ImageUploadController.take_upload_images(user, [upload_pk])
+
+        assert image_file.closed
+        assert b''.join(image_file.chunks()) == image_bytes
+        assert image_file.closed
+
+    def test_uploads_of_another_user_are_rejected(self, authenticated_api_client, complete_upload, user_factory,
+                                                  product):
+        upload_pk = complete_upload(authenticated_api_client(is_admin=False))
+        client = authenticated_api_client(is_admin=False, user=user_factory())
+        data = {'product': product.pk, 'title': 'Uploaded feedback', 'content': 'content', 'uploads': [upload_pk]}
+        response = client.post(reverse('feedback-list'), data)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert ImageUpload.objects.filter(pk=upload_pk).exists()
@@ -1,6 +1,8 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
@@ -39,6 +41,35 @@ class TestOrderViews:
         assert response.status_code == status.HTTP_200_OK
         assert response.data == OrderOutputSerializer(instance=order_list, many=True).data
 
+    def test_streamed_order_list_by_admin(self, settings, authenticated_api_client):
+        settings.STREAMING_CHUNK_SIZE = 4
+        client = authenticated_api_client(is_admin=True)
+        url = reverse('order-list')
+        response = client.get(url, {'stream': '1'})
+
+        assert response.streaming
+        assert b''.join(response.streaming_content) == client.get(url, HTTP_ACCEPT='application/json').content
+
+    def test_streamed_order_list_queries_per_chunk(self, settings, authenticated_api_client, order_factory,
+                                                   order_item_factory):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                b''.join(client.get(reverse('order-list'), {'stream': 'true'}).streaming_content)
+            return len(queries)
+
+        settings.STREAMING_CHUNK_SIZE = 1000
+        client = authenticated_api_client(is_admin=True)
+        query_count = count_queries()
+        for order in order_factory.create_batch(5):
+            order_item_factory(order=order)
+
+        assert count_queries() == query_count
+
+    def test_streamed_empty_order_list(self, authenticated_api_client):
+        response = authenticated_api_client(is_admin=False).get(reverse('order-list'), {'stream': 'true'})
+
+        assert b''.join(response.streaming_content) == b'[]'
+
     @pytest.mark.parametrize('client_type, status_code', [
         (ClientType.NOT_AUTH_CLIENT, status.HTTP_403_FORBIDDEN),
         (ClientType.AUTH_CLIENT, status.HTTP_404_NOT_FOUND),
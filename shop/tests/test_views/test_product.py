@@ -1,15 +1,26 @@
 import factory
 import pytest
+from django.db import connection
 from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
 from shop.exceptions import UnhandledValueError
-from shop.models import Category, Product
+from shop.dal.order_item import OrderItemDAL
+from shop.dal.product import ProductDAL
+from shop.dal.related_product import RelatedProductDAL
+from shop.dal.unit_of_work import identity_map_scope
+from shop.models import Category, Feedback, Product, StaleMediaFile
+from shop.serializers.feedback import FeedbackOutputSerializer
 from shop.serializers.product import ProductOutputSerializer
 from shop.tests.conftest import Arg, ClientType, EXISTENT_MATERIAL_NAME, EXISTENT_PK, NONEXISTENT_PK
 
 
+def without_feedback(product_detail_data):
+    return {name: value for name, value in product_detail_data.items() if name != 'feedback'}
+
+
 @pytest.fixture
 def product_data(product_factory, get_in_memory_image_file, product_images_to_delete):
     def _product_data(materials=None, images_to_delete=None, product_obj=None):
@@ -124,7 +135,7 @@ class TestProductViews:
         response = authenticated_api_client(is_admin=True).get(url)
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data == ProductOutputSerializer(unavailable_product).data
+        assert without_feedback(response.data) == ProductOutputSerializer(unavailable_product).data
 
     @pytest.mark.parametrize('client_type', [
         ClientType.NOT_AUTH_CLIENT,
@@ -137,7 +148,7 @@ class TestProductViews:
         response = multi_client(client_type).get(url)
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data == ProductOutputSerializer(instance=available_product).data
+        assert without_feedback(response.data) == ProductOutputSerializer(instance=available_product).data
 
     @pytest.mark.parametrize('client_type, status_code', [
         (ClientType.NOT_AUTH_CLIENT, status.HTTP_403_FORBIDDEN),
@@ -218,3 +229,158 @@ class TestProductImagesRemover:
         response = multi_client(client_type).get(url)
 
         assert response.status_code == status_code
+
+    def test_deleted_image_files_are_scheduled_for_removal(self, db, product, product_image_factory,
+                                                           authenticated_api_client):
+        image_names = {product_image_factory(content_object=product).image.name for _ in range(3)}
+        url = reverse('product-detail-delete-images', kwargs={'pk': product.pk})
+        authenticated_api_client(is_admin=True).get(url)
+
+        assert image_names <= set(StaleMediaFile.objects.values_list('name', flat=True))
+
+    def test_number_of_queries_doesnt_depend_on_number_of_images(self, db, product_factory, product_image_factory,
+                                                                 authenticated_api_client):
+        client = authenticated_api_client(is_admin=True)
+        num_queries = []
+        for image_count in (1, 10):
+            product = product_factory()
+            product_image_factory.create_batch(image_count, content_object=product)
+            url = reverse('product-detail-delete-images', kwargs={'pk': product.pk})
+            with CaptureQueriesContext(connection) as queries:
+                client.get(url)
+            num_queries.append(len(queries))
+        assert num_queries[0] == num_queries[1]
+
+
+@pytest.mark.django_db
+class TestProductFeedbackAggregates:
+    def test_update_keeps_aggregates(self, product):
+        Product.objects.filter(pk=product.pk).update(feedback_count=7)  # the loaded product is stale now
+        ProductDAL.update_product(product, product.category, 'New name', product.price, product.description,
+                                  product.size, product.weight, product.stock, product.is_available)
+        product.refresh_from_db()
+
+        assert product.name == 'New name'
+        assert product.feedback_count == 7
+
+    def test_loaded_product_gets_new_aggregates(self, product, feedback_factory):
+        with identity_map_scope():
+            loaded_product = ProductDAL.get_any_product_by_pk(product.pk)
+            feedback = feedback_factory(product=product, is_moderated=True)
+            ProductDAL.refresh_feedback_aggregates([product.pk])
+
+            assert loaded_product.feedback_count == 1
+            assert loaded_product.last_feedback_at == feedback.created_at
+
+
+@pytest.mark.django_db
+class TestProductFeedbackView:
+    @pytest.fixture
+    def product_with_feedback(self, product, feedback_factory):
+        feedback_factory.create_batch(25, product=product, is_moderated=True)
+        feedback_factory.create_batch(5, product=product, is_moderated=False)
+        ProductDAL.refresh_feedback_aggregates([product.pk])
+        product.refresh_from_db()
+        return product
+
+    def test_pages_contain_all_moderated_feedback_newest_first(self, api_client, product_with_feedback):
+        url = reverse('product-feedback', kwargs={'pk': product_with_feedback.pk})
+        feedback_pages = []
+        while url is not None:
+            response = api_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.data['count'] == 25
+            feedback_pages.append(response.data['results'])
+            url = response.data['next']
+
+        expected_feedback = Feedback.moderated_feedback.filter(product=product_with_feedback) \
+            .order_by('-created_at', '-id')
+        assert [len(page) for page in feedback_pages] == [10, 10, 5]
+        assert [feedback for page in feedback_pages for feedback in page] == \
+            FeedbackOutputSerializer(expected_feedback, many=True, fields_to_remove=['product']).data
+
+    def test_page_size(self, api_client, product_with_feedback):
+        url = reverse('product-feedback', kwargs={'pk': product_with_feedback.pk})
+        response = api_client.get(url, {'page_size': 20})
+
+        assert len(response.data['results']) == 20
+
+    def test_invalid_cursor(self, api_client, product_with_feedback):
+        url = reverse('product-feedback', kwargs={'pk': product_with_feedback.pk})
+        response = api_client.get(url, {'cursor': 'invalid'})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_feedback_of_unavailable_product(self, api_client, product_factory):
+        url = reverse('product-feedback', kwargs={'pk': product_factory(is_available=False).pk})
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_product_list_has_no_feedback_pages(self, api_client, product_with_feedback):
+        response = api_client.get(reverse('product-list'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert all('feedback' not in product and 'feedback_count' in product for product in response.data)
+
+    def test_product_contains_first_feedback_page(self, api_client, product_with_feedback):
+        url = reverse('product-detail', kwargs={'pk': product_with_feedback.pk})
+        response = api_client.get(url)
+
+        assert response.data['feedback_count'] == 25
+        assert len(response.data['feedback']['results']) == 10
+        assert response.data['feedback']['next'].startswith(
+            'http://testserver' + reverse('product-feedback', kwargs={'pk': product_with_feedback.pk}))
+
+
+@pytest.mark.django_db
+class TestProductRelatedView:
+    @pytest.fixture
+    def products(self, product_factory, order_factory, order_item_factory):
+        """The first product is bought with the second one in two orders and with the third one in one order"""
+        products = product_factory.create_batch(4)
+        for basket in ((0, 1, 2), (0, 1), (3, )):
+            order = order_factory()
+            for index in basket:
+                order_item_factory(order=order, product=products[index])
+        RelatedProductDAL.build_related_products(full=True)
+        return products
+
+    def get_related_pks(self, client, product):
+        response = client.get(reverse('product-related', kwargs={'pk': product.pk}))
+        assert response.status_code == status.HTTP_200_OK
+        return [related['id'] for related in response.data]
+
+    def test_related_products_by_order_count(self, api_client, products):
+        assert self.get_related_pks(api_client, products[0]) == [products[1].pk, products[2].pk]
+        assert self.get_related_pks(api_client, products[2]) == [products[0].pk, products[1].pk]
+        assert self.get_related_pks(api_client, products[3]) == []
+
+    def test_unavailable_products_are_hidden(self, api_client, products):
+        Product.objects.filter(pk=products[1].pk).update(is_available=False)
+
+        assert self.get_related_pks(api_client, products[0]) == [products[2].pk]
+
+    def test_number_of_related_products(self, settings, api_client, products):
+        settings.RELATED_PRODUCTS_COUNT = 1
+        RelatedProductDAL.build_related_products(full=True)
+
+        assert self.get_related_pks(api_client, products[0]) == [products[1].pk]
+
+    def test_one_query(self, api_client, products):
+        with CaptureQueriesContext(connection) as queries:
+            self.get_related_pks(api_client, products[0])
+
+        assert len(queries) == 1
+
+    def test_incremental_build(self, settings, products, order_factory, order_item_factory):
+        settings.ROLLUP_OVERLAP_SECONDS = 0
+        assert RelatedProductDAL.build_related_products() == 0
+
+        order = order_factory()
+        order_item_factory(order=order, product=products[3])
+        OrderItemDAL.insert_order_item(products[2], order, 1)
+
+        assert RelatedProductDAL.build_related_products() == 2
+        assert list(RelatedProductDAL.get_related_products(products[3].pk)) == [products[2]]
+        assert list(RelatedProductDAL.get_related_products(products[2].pk)) == [products[0], products[1], products[3]]
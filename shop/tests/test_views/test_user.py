@@ -81,6 +81,18 @@ class TestUserViews:
         assert response.data == UserOutputSerializer(instance=user_list, many=True,
                                                      fields_to_remove=['addresses', 'feedback', 'orders']).data
 
+    def test_streamed_user_list_by_admin(self, settings, authenticated_api_client):
+        settings.STREAMING_CHUNK_SIZE = 3
+        client = authenticated_api_client(is_admin=True)
+        url = reverse('user-list')
+        response = client.get(url, {'stream': 'true'})
+        user_count = get_user_model().objects.count()
+        chunks = list(response.streaming_content)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(chunks) == -(-user_count // 3) + 1  # the closing bracket comes separately
+        assert b''.join(chunks) == client.get(url, HTTP_ACCEPT='application/json').content
+
     @pytest.mark.parametrize('client_type', [
         ClientType.NOT_AUTH_CLIENT,
         ClientType.AUTH_CLIENT,
@@ -0,0 +1,122 @@
+"""
+Token bucket throttling. A bucket of a scope holds as many tokens as the number of requests of its rate
+(e.g. '300/min') and is refilled at that rate, so a client can send a burst of that many requests and then one request
+per refill interval. Buckets are kept as the theoretical arrival time of the next request (GCRA), a single number per
+bucket, in the store set by THROTTLE_STORE.
+"""
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import ScopedRateThrottle
+
+# the timeout only frees the memory of the buckets of clients that are gone, a bucket left idle for its period is full
+# anyway, and a bucket that expires while in use starts full again
+CACHE_BUCKET_TIMEOUT = 24 * 60 * 60
+
+
+class LocalTokenBucketStore:
+    """
+    Buckets in the memory of the process. Exact and the cheapest, but every worker process has its own buckets, so it
+    only suits a single process or a limit per process.
+    """
+    timer = time.time
+    max_buckets = 100000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.arrival_times = {}
+
+    def consume(self, key, capacity, period):
+        """Takes a token from the bucket, returns 0 if it's taken or how many seconds to wait for the next token"""
+        interval = period / capacity
+        now = self.timer()
+        with self.lock:
+            arrival_time = max(self.arrival_times.get(key, now), now) + interval
+            wait = arrival_time - now - period
+            if wait > 0:
+                return wait
+            if len(self.arrival_times) >= self.max_buckets:
+                self.remove_full_buckets(now)
+            self.arrival_times[key] = arrival_time
+        return 0
+
+    def remove_full_buckets(self, now):
+        self.arrival_times = {key: arrival_time for key, arrival_time in self.arrival_times.items()
+                              if arrival_time > now}
+
+
+class CacheTokenBucketStore:
+    """
+    Buckets in the default cache, shared by all the processes that use it (see CACHES in the settings). A bucket is
+    an integer of milliseconds changed with the atomic incr and decr of the cache, so a request costs one cache call
+    most of the time. Concurrent requests to a bucket that has been idle may each find it full and let through a few
+    more requests than the rate, never fewer.
+    """
+    timer = time.time
+
+    def consume(self, key, capacity, period):
+        """Takes a token from the bucket, returns 0 if it's taken or how many seconds to wait for the next token"""
+        interval = max(round(period * 1000 / capacity), 1)
+        now = round(self.timer() * 1000)
+        try:
+            arrival_time = cache.incr(key, interval)
+        except ValueError:  # no bucket yet or it has expired
+            if cache.add(key, now + interval, CACHE_BUCKET_TIMEOUT):
+                return 0
+            arrival_time = cache.incr(key, interval)
+
+        if arrival_time - interval < now:
+            # the bucket has been idle long enough to be full
+            cache.set(key, now + interval, CACHE_BUCKET_TIMEOUT)
+            return 0
+        wait = arrival_time - now - period * 1000
+        if wait > 0:
+            cache.decr(key, interval)  # a refused request takes no token
+            return wait / 1000
+        return 0
+
+
+@lru_cache(maxsize=None)
+def get_token_bucket_store(store_path):
+    """Every store is created once per process, the local one keeps its buckets for the lifetime of the process"""
+    return import_string(store_path)()
+
+
+class TokenBucketThrottle(ScopedRateThrottle):
+    """
+    Throttles the views with a throttle_scope per user, or per IP address for anonymous users, with the rates of
+    DEFAULT_THROTTLE_RATES. A view may throttle only some of its methods with method_throttle_scopes, a dict of
+    lowercase method names to scopes, which takes precedence over throttle_scope.
+    """
+    cache_format = 'token_bucket_%(scope)s_%(ident)s'
+
+    def allow_request(self, request, view):
+        self.wait_time = None
+        self.scope = getattr(view, 'method_throttle_scopes', {}).get(request.method.lower(),
+                                                                    getattr(view, self.scope_attr, None))
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        store = get_token_bucket_store(settings.THROTTLE_STORE)
+        self.wait_time = store.consume(self.get_cache_key(request, view), self.num_requests, self.duration)
+        return not self.wait_time
+
+    def get_rate(self):
+        """The rate of the current settings, THROTTLE_RATES of SimpleRateThrottle keeps the rates of its import"""
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(f'No default throttle rate set for \'{self.scope}\' scope')
+
+    def wait(self):
+        return self.wait_time
@@ -1,2 +1,30 @@
+import hashlib
+import math
+
+
 def are_all_elements_in_list(list_to_check, check_list):
     return all(item in check_list for item in list_to_check)
+
+
+class BloomFilter:
+    """
+    Set of strings that takes a fixed amount of memory for the expected number of items. It can answer that it
+    contains an item that was never added (with about false_positive_rate probability), but never the other way round.
+    """
+    def __init__(self, expected_items, false_positive_rate=0.001):
+        expected_items = max(expected_items, 1)
+        self.size = max(int(-expected_items * math.log(false_positive_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.size / expected_items * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, item):
+        for index in self.get_indexes(item):
+            self.bits[index // 8] |= 1 << index % 8
+
+    def __contains__(self, item):
+        return all(self.bits[index // 8] & 1 << index % 8 for index in self.get_indexes(item))
+
+    def get_indexes(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first_hash, second_hash = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+        return ((first_hash + i * second_hash) % self.size for i in range(self.hash_count))
@@ -1,19 +1,39 @@
 from django.urls import include, path
 
+from shop.views import async_read
 from shop.views.address import AddressView
+from shop.views.analytics import CategoryAnalyticsView, OrderAnalyticsView, ProductAnalyticsView, \
+    RevenueAnalyticsView
+from shop.views.cart import CartCheckoutView, CartItemView, CartView
 from shop.views.category import CategoryView
-from shop.views.feedback import FeedbackDetail, FeedbackImagesRemover, FeedbackList
+from shop.views.feedback import FeedbackDetail, FeedbackImagesRemover, FeedbackList, FeedbackModerationView
 from shop.views.image import ImageView
+from shop.views.image_upload import ImageUploadView
 from shop.views.order import OrderView
 from shop.views.order_item import OrderItemView
-from shop.views.product import ProductImagesRemover, ProductView
+from shop.views.product import ProductFeedbackView, ProductImagesRemover, ProductRelatedView, ProductView
 from shop.views.product_material import ProductMaterialView
 from shop.views.user import UserAddressesView, UserFeedbackView, UserOrdersView, UserView
 
 urlpatterns = [
     path('addresses/', AddressView.as_view(http_method_names=['get', 'post']), name='address-list'),
     path('addresses/<int:pk>/', AddressView.as_view(http_method_names=['get', 'put', 'delete']), name='address-detail'),
+    path('analytics/categories/', CategoryAnalyticsView.as_view(http_method_names=['get']),
+         name='analytics-categories'),
+    path('analytics/orders/', OrderAnalyticsView.as_view(http_method_names=['get']), name='analytics-orders'),
+    path('analytics/products/', ProductAnalyticsView.as_view(http_method_names=['get']), name='analytics-products'),
+    path('analytics/revenue/', RevenueAnalyticsView.as_view(http_method_names=['get']), name='analytics-revenue'),
+    path('async/categories/', async_read.category_list, name='async-category-list'),
+    path('async/category/<int:category_pk>/', async_read.product_list, name='async-product-list-by-category'),
+    path('async/feedback/', async_read.feedback_list, name='async-feedback-list'),
+    path('async/products/', async_read.product_list, name='async-product-list'),
+    path('async/products/<int:pk>/', async_read.product_detail, name='async-product-detail'),
     path('auth/', include('rest_framework.urls', namespace='rest_framework')),
+    path('cart/', CartView.as_view(http_method_names=['get', 'delete']), name='cart'),
+    path('cart/checkout/', CartCheckoutView.as_view(http_method_names=['post']), name='cart-checkout'),
+    path('cart/items/', CartItemView.as_view(http_method_names=['post']), name='cart-item-list'),
+    path('cart/items/<int:product_pk>/', CartItemView.as_view(http_method_names=['put', 'delete']),
+         name='cart-item-detail'),
     path('categories/', CategoryView.as_view(http_method_names=['get', 'post']), name='category-list'),
     path('categories/<int:pk>/', CategoryView.as_view(http_method_names=['get', 'put', 'delete']),
          name='category-detail'),
@@ -22,10 +42,15 @@ urlpatterns = [
     path('feedback/', FeedbackList.as_view(http_method_names=['get', 'post']), name='feedback-list'),
     path('feedback/<int:pk>/', FeedbackDetail.as_view(http_method_names=['get', 'put', 'delete']),
          name='feedback-detail'),
+    path('feedback/moderation/', FeedbackModerationView.as_view(http_method_names=['get', 'post']),
+         name='feedback-moderation'),
     path('feedback/<int:pk>/delete-images/', FeedbackImagesRemover.as_view(http_method_names=['get']),
          name='feedback-detail-delete-images'),
     path('images/', ImageView.as_view(http_method_names=['get', 'post']), name='image-list'),
     path('images/<int:pk>/', ImageView.as_view(http_method_names=['get', 'put', 'delete']), name='image-detail'),
+    path('images/uploads/', ImageUploadView.as_view(http_method_names=['post']), name='image-upload-list'),
+    path('images/uploads/<int:pk>/', ImageUploadView.as_view(http_method_names=['get', 'put']),
+         name='image-upload-detail'),
     path('order-items/', OrderItemView.as_view(http_method_names=['get', 'post']), name='order-item-list'),
     path('order-items/<int:pk>/', OrderItemView.as_view(http_method_names=['get', 'put', 'delete']),
          name='order-item-detail'),
@@ -36,6 +61,9 @@ urlpatterns = [
          name='material-detail'),
     path('products/', ProductView.as_view(http_method_names=['get', 'post']), name='product-list'),
     path('products/<int:pk>/', ProductView.as_view(http_method_names=['get', 'put', 'delete']), name='product-detail'),
+    path('products/<int:pk>/feedback/', ProductFeedbackView.as_view(http_method_names=['get']),
+         name='product-feedback'),
+    path('products/<int:pk>/related/', ProductRelatedView.as_view(http_method_names=['get']), name='product-related'),
     path('products/<int:pk>/delete-images/', ProductImagesRemover.as_view(http_method_names=['get']),
          name='product-detail-delete-images'),
     path('users/', UserView.as_view(http_method_names=['get', 'post']), name='user-list'),
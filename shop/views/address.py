@@ -9,7 +9,7 @@ from shop.serializers.address import AddressInputSerializer, AddressOutputSerial
 
 
 class AddressView(APIView):
-    permission_classes = [is_owner_or_admin_factory('user'), IsAuthenticated]
+    permission_classes = (is_owner_or_admin_factory('user'), IsAuthenticated)
     http_method_names = ['get', 'post', 'put', 'delete']
 
     def get(self, request, pk=None):
@@ -32,15 +32,15 @@ class AddressView(APIView):
         return Response(status=status.HTTP_201_CREATED)
 
     @check_object_permissions(AddressController.get_address)
-    def put(self, request, pk):
+    def put(self, request, pk, obj):
         serializer = AddressInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        AddressController.update_address(pk, **serializer.validated_data)
+        AddressController.update_address(obj, **serializer.validated_data)
 
         return Response(status=status.HTTP_200_OK)
 
     @check_object_permissions(AddressController.get_address)
-    def delete(self, request, pk):
-        AddressController.delete_address(pk)
+    def delete(self, request, pk, obj):
+        AddressController.delete_address(obj)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
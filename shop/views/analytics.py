@@ -0,0 +1,68 @@
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from shop.controllers.analytics import AnalyticsController
+from shop.serializers.analytics import CategorySalesOutputSerializer, DailyOrdersOutputSerializer, \
+    DailyRevenueOutputSerializer, ProductSalesInputSerializer, ProductSalesOutputSerializer, SalesRangeInputSerializer
+
+
+def get_query_params(request, serializer_class):
+    # a plain dict, a missing is_paid of a QueryDict would be read as False like an unchecked HTML checkbox
+    serializer = serializer_class(data=request.query_params.dict())
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+class RevenueAnalyticsView(APIView):
+    """Revenue and units sold per day from start to end (?start=YYYY-MM-DD&end=YYYY-MM-DD[&is_paid=true|false])"""
+    permission_classes = (IsAdminUser, )
+    http_method_names = ['get']
+
+    @classmethod
+    def get(cls, request):
+        revenue = AnalyticsController.get_daily_revenue(**get_query_params(request, SalesRangeInputSerializer))
+        data = DailyRevenueOutputSerializer(instance=revenue, many=True).data
+
+        return Response(data, status.HTTP_200_OK)
+
+
+class ProductAnalyticsView(APIView):
+    """Products with the largest revenue from start to end (the same parameters and ?limit=, 100 by default)"""
+    permission_classes = (IsAdminUser, )
+    http_method_names = ['get']
+
+    @classmethod
+    def get(cls, request):
+        sales = AnalyticsController.get_sales_by_product(**get_query_params(request, ProductSalesInputSerializer))
+        data = ProductSalesOutputSerializer(instance=sales, many=True).data
+
+        return Response(data, status.HTTP_200_OK)
+
+
+class CategoryAnalyticsView(APIView):
+    """Revenue and units sold per category from start to end (the same parameters)"""
+    permission_classes = (IsAdminUser, )
+    http_method_names = ['get']
+
+    @classmethod
+    def get(cls, request):
+        sales = AnalyticsController.get_sales_by_category(**get_query_params(request, SalesRangeInputSerializer))
+        data = CategorySalesOutputSerializer(instance=sales, many=True).data
+
+        return Response(data, status.HTTP_200_OK)
+
+
+class OrderAnalyticsView(APIView):
+    """Paid and unpaid orders created per day from start to end (?start=YYYY-MM-DD&end=YYYY-MM-DD)"""
+    permission_classes = (IsAdminUser, )
+    http_method_names = ['get']
+
+    @classmethod
+    def get(cls, request):
+        params = get_query_params(request, SalesRangeInputSerializer)
+        orders = AnalyticsController.get_daily_orders(params['start'], params['end'])
+        data = DailyOrdersOutputSerializer(instance=orders, many=True).data
+
+        return Response(data, status.HTTP_200_OK)
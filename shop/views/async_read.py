@@ -0,0 +1,142 @@
+"""
+Async variants of the public read endpoints for ASGI deployments.
+
+Django 3.2 has no async ORM and runs all thread-sensitive code of an ASGI process in a single thread, so the database
+work and the serialization of every request is moved to a worker thread instead. The event loop stays free for other
+requests meanwhile, and the number of requests in flight is limited by the worker threads rather than by the server.
+"""
+from functools import partial, wraps
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, JsonResponse
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from shop.controllers.category import CategoryController
+from shop.controllers.feedback import FeedbackController
+from shop.controllers.product import ProductController
+from shop.renderers import FastJSONRenderer
+from shop.serializers.category import CategoryOutputSerializer
+from shop.serializers.feedback import FeedbackOutputSerializer
+from shop.serializers.product import ProductOutputSerializer
+from shop.views.product import get_product_detail_data
+
+SAFE_HTTP_METHODS = ('GET', 'HEAD')
+
+
+def run_in_worker_thread(func):
+    @wraps(func)
+    def func_closing_connections(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # request_finished closes only the connections of the thread-sensitive thread, so the worker thread gives
+            # its own ones back (or keeps them according to CONN_MAX_AGE) here
+            close_old_connections()
+
+    async def async_func(*args, **kwargs):
+        if settings.ASYNC_READ_VIEWS_THREAD_SENSITIVE:
+            return await sync_to_async(func, thread_sensitive=True)(*args, **kwargs)
+        return await sync_to_async(func_closing_connections, thread_sensitive=False)(*args, **kwargs)
+    return async_func
+
+
+def get_authenticators():
+    return [authentication_class() for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+
+
+def authenticate(request):
+    """
+    Wraps the request the same way as APIView does, so request.user is identified by the DRF authenticators (e.g.
+    BasicAuthentication), not only by the session. Raises AuthenticationFailed for invalid credentials.
+    """
+    request = Request(request, authenticators=get_authenticators())
+    request.user  # authenticates right away
+    return request
+
+
+def get_not_authenticated_response(request, exc):
+    """401 with the WWW-Authenticate header of the first authenticator or 403 if it has none, as APIView responds"""
+    authenticators = get_authenticators()
+    authenticate_header = authenticators[0].authenticate_header(request) if authenticators else None
+    if not authenticate_header:
+        return JsonResponse({'detail': exc.detail}, status=exceptions.PermissionDenied.status_code)
+    response = JsonResponse({'detail': exc.detail}, status=exc.status_code)
+    response['WWW-Authenticate'] = authenticate_header
+    return response
+
+
+def check_throttles(request, throttle_scope):
+    """
+    Raises Throttled as APIView does if a throttle of DEFAULT_THROTTLE_CLASSES refuses the request. The view is only
+    its throttle_scope, so the request takes a token from the same bucket as the APIView of the scope.
+    """
+    view = SimpleNamespace(throttle_scope=throttle_scope)
+    throttles = [throttle_class() for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES]
+    wait_times = [throttle.wait() for throttle in throttles if not throttle.allow_request(request, view)]
+    if wait_times:
+        raise exceptions.Throttled(max((wait for wait in wait_times if wait is not None), default=None))
+
+
+def async_read_view(serialize_func=None, throttle_scope=None):
+    """
+    Turns serialize_func(request, **url_kwargs) into an async view returning the serialized data as JSON. Used as
+    @async_read_view(throttle_scope=...) the view is throttled like the APIViews with that throttle_scope.
+    """
+    if serialize_func is None:
+        return partial(async_read_view, throttle_scope=throttle_scope)
+
+    @run_in_worker_thread
+    def async_serialize_func(request, **kwargs):
+        request = authenticate(request)
+        if throttle_scope is not None:
+            check_throttles(request, throttle_scope)
+        # rendered in the worker thread too, a large list takes a while to render
+        return FastJSONRenderer().render(serialize_func(request, **kwargs))
+
+    async def view(request, **kwargs):
+        if request.method not in SAFE_HTTP_METHODS:
+            return HttpResponseNotAllowed(SAFE_HTTP_METHODS)
+        try:
+            content = await async_serialize_func(request, **kwargs)
+        except Http404:
+            return JsonResponse({'detail': exceptions.NotFound.default_detail}, status=exceptions.NotFound.status_code)
+        except (exceptions.NotAuthenticated, exceptions.AuthenticationFailed) as e:
+            return get_not_authenticated_response(request, e)
+        except exceptions.APIException as e:
+            response = JsonResponse({'detail': e.detail}, status=e.status_code)
+            if getattr(e, 'wait', None):
+                response['Retry-After'] = '%d' % e.wait
+            return response
+        return HttpResponse(content, content_type=FastJSONRenderer.media_type)
+    return view
+
+
+@async_read_view(throttle_scope='products')
+def product_list(request, category_pk=None):
+    products = ProductController.get_product_list(request.user, category_pk)
+    return ProductOutputSerializer(instance=products, many=True).data
+
+
+@async_read_view(throttle_scope='products')
+def product_detail(request, pk):
+    product = ProductController.get_product(pk, request.user.is_staff)
+    return get_product_detail_data(request, product)
+
+
+@async_read_view
+def category_list(request):
+    if not request.user.is_staff:
+        raise exceptions.PermissionDenied
+    categories = CategoryController.get_category_list()
+    return CategoryOutputSerializer(instance=categories, many=True).data
+
+
+@async_read_view(throttle_scope='feedback')
+def feedback_list(request):
+    feedback = FeedbackController.get_feedback_list()
+    return FeedbackOutputSerializer(instance=feedback, many=True).data
@@ -0,0 +1,72 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from shop.controllers.cart import CartController
+from shop.idempotency import idempotent
+from shop.serializers.cart import CartItemInputSerializer, CartItemOutputSerializer, CartQuantityInputSerializer, \
+    CheckoutInputSerializer
+from shop.serializers.order import OrderOutputSerializer
+
+
+class CartView(APIView):
+    """The cart of the user, a list of products and their quantities kept in the cache until the checkout"""
+    permission_classes = (IsAuthenticated, )
+    http_method_names = ['get', 'delete']
+
+    @classmethod
+    def get(cls, request):
+        items = CartController.get_cart_items(request.user)
+
+        return Response(CartItemOutputSerializer(instance=items, many=True).data, status.HTTP_200_OK)
+
+    @classmethod
+    def delete(cls, request):
+        CartController.clear_cart(request.user)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CartItemView(APIView):
+    permission_classes = (IsAuthenticated, )
+    http_method_names = ['post', 'put', 'delete']
+
+    @classmethod
+    def post(cls, request):
+        """Adds the quantity of the product to the quantity it already has in the cart"""
+        serializer = CartItemInputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = CartController.add_to_cart(request.user, serializer.validated_data['product'],
+                                           serializer.validated_data['quantity'])
+
+        return Response(CartItemOutputSerializer(instance=items, many=True).data, status.HTTP_200_OK)
+
+    @classmethod
+    def put(cls, request, product_pk):
+        serializer = CartQuantityInputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = CartController.set_cart_quantity(request.user, product_pk, **serializer.validated_data)
+
+        return Response(CartItemOutputSerializer(instance=items, many=True).data, status.HTTP_200_OK)
+
+    @classmethod
+    def delete(cls, request, product_pk):
+        CartController.set_cart_quantity(request.user, product_pk, 0)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CartCheckoutView(APIView):
+    """Orders the products of the cart, the cart is emptied"""
+    permission_classes = (IsAuthenticated, )
+    http_method_names = ['post']
+
+    @classmethod
+    @idempotent
+    def post(cls, request):
+        serializer = CheckoutInputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order = CartController.checkout(request.user, **serializer.validated_data)
+
+        return Response(OrderOutputSerializer(instance=order).data, status.HTTP_201_CREATED)
@@ -8,7 +8,7 @@ from shop.serializers.category import CategoryInputSerializer, CategoryOutputSer
 
 
 class CategoryView(APIView):
-    permission_classes = [IsAdminUser]
+    permission_classes = (IsAdminUser, )
     http_method_names = ['get', 'post', 'put', 'delete']
 
     @classmethod
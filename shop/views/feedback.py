@@ -1,15 +1,19 @@
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAdminUser, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from shop.conditional import get_if_match_versions, set_etag
 from shop.controllers.feedback import FeedbackController
 from shop.permissions import check_object_permissions, is_owner_or_admin_factory
-from shop.serializers.feedback import FeedbackInputSerializer, FeedbackOutputSerializer
+from shop.routers import pin_to_primary
+from shop.serializers.feedback import FeedbackInputSerializer, FeedbackModerationInputSerializer, \
+    FeedbackModerationOutputSerializer, FeedbackOutputSerializer
 
 
 class FeedbackList(APIView):
-    permission_classes = [IsAuthenticatedOrReadOnly]
+    permission_classes = (IsAuthenticatedOrReadOnly, )
+    throttle_scope = 'feedback'
     http_method_names = ['get', 'post']
 
     @classmethod
@@ -29,7 +33,7 @@ class FeedbackList(APIView):
 
 
 class FeedbackDetail(APIView):
-    permission_classes = [is_owner_or_admin_factory('author')]
+    permission_classes = (is_owner_or_admin_factory('author'), )
     http_method_names = ['get', 'put', 'delete']
 
     @classmethod
@@ -37,29 +41,58 @@ class FeedbackDetail(APIView):
         feedback = FeedbackController.get_feedback(pk)
         data = FeedbackOutputSerializer(instance=feedback).data
 
-        return Response(data, status.HTTP_200_OK)
+        return set_etag(Response(data, status.HTTP_200_OK), feedback)
 
     @check_object_permissions(FeedbackController.get_feedback)
-    def put(self, request, pk):
+    def put(self, request, pk, obj):
         serializer = FeedbackInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        FeedbackController.update_feedback(pk, **serializer.validated_data)
+        feedback = FeedbackController.update_feedback(obj, request.user, **serializer.validated_data,
+                                                      if_match=get_if_match_versions(request))
 
-        return Response(status=status.HTTP_200_OK)
+        return set_etag(Response(status=status.HTTP_200_OK), feedback)
 
     @check_object_permissions(FeedbackController.get_feedback)
-    def delete(self, request, pk):
-        FeedbackController.delete_feedback(pk)
+    def delete(self, request, pk, obj):
+        FeedbackController.delete_feedback(obj)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class FeedbackImagesRemover(APIView):
-    permission_classes = [is_owner_or_admin_factory('author')]
+    permission_classes = (is_owner_or_admin_factory('author'), )
     http_method_names = ['get']
 
+    @pin_to_primary
     @check_object_permissions(FeedbackController.get_feedback)
-    def get(self, request, pk):
-        FeedbackController.delete_feedback_images(pk)
+    def get(self, request, pk, obj):
+        FeedbackController.delete_feedback_images(obj)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class FeedbackModerationView(APIView):
+    """
+    GET gives the feedback waiting for moderation, oldest first, by pages. POST {'ids': [...], 'action': 'approve' or
+    'reject'} moderates all the listed feedback at once.
+    """
+    permission_classes = (IsAdminUser, )
+    http_method_names = ['get', 'post']
+
+    @classmethod
+    def get(cls, request):
+        page, paginator = FeedbackController.get_moderation_queue_page(request)
+        data = {
+            'next': paginator.get_next_link(request.build_absolute_uri()),
+            'results': FeedbackModerationOutputSerializer(instance=page, many=True).data,
+        }
+
+        return Response(data, status.HTTP_200_OK)
+
+    @classmethod
+    def post(cls, request):
+        serializer = FeedbackModerationInputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated_count = FeedbackController.moderate_feedback(**serializer.validated_data)
+
+        return Response({'updated': updated_count}, status.HTTP_200_OK)
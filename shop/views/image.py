@@ -8,7 +8,7 @@ from shop.serializers.image import ImageInputSerializer, ImageOutputSerializer
 
 
 class ImageView(APIView):
-    permission_classes = [IsAdminUser]
+    permission_classes = (IsAdminUser, )
     http_method_names = ['get', 'post', 'put', 'delete']
 
     @classmethod
@@ -0,0 +1,38 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from shop.controllers.image_upload import ImageUploadController
+from shop.permissions import check_object_permissions, is_owner_or_admin_factory
+from shop.serializers.image_upload import ImageUploadInputSerializer, ImageUploadOutputSerializer
+
+
+class ImageUploadView(APIView):
+    """
+    Chunked, resumable image uploads. POST {'file_name', 'size'} starts an upload, then every PUT sends a chunk of the
+    file as the raw request body with a 'Content-Range: bytes <start>-<end>/<size>' header. GET tells how much was
+    received to resume an interrupted upload. Primary keys of complete uploads are passed as 'uploads' when a product
+    or feedback is created or updated.
+    """
+    permission_classes = (IsAuthenticated, is_owner_or_admin_factory('owner'))
+    http_method_names = ['get', 'post', 'put']
+
+    @check_object_permissions(ImageUploadController.get_upload)
+    def get(self, request, pk, obj):
+        return Response(ImageUploadOutputSerializer(instance=obj).data, status.HTTP_200_OK)
+
+    @classmethod
+    def post(cls, request):
+        serializer = ImageUploadInputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = ImageUploadController.create_upload(request.user, **serializer.validated_data)
+
+        return Response(ImageUploadOutputSerializer(instance=upload).data, status.HTTP_201_CREATED)
+
+    @check_object_permissions(ImageUploadController.get_upload)
+    def put(self, request, pk, obj):
+        # the body is read from the stream, so neither Django nor the parsers buffer it
+        upload = ImageUploadController.write_chunk(obj, request.stream, request.headers.get('Content-Range'))
+
+        return Response(ImageUploadOutputSerializer(instance=upload).data, status.HTTP_200_OK)
@@ -3,27 +3,34 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from shop.conditional import get_if_match_versions, set_etag
 from shop.controllers.order import OrderController
+from shop.idempotency import idempotent
 from shop.permissions import check_object_permissions, is_owner_or_admin_factory
 from shop.serializers.order import OrderInputSerializer, OrderOutputSerializer
+from shop.streaming import get_streaming_list_response, wants_streaming
 
 
 class OrderView(APIView):
-    permission_classes = [is_owner_or_admin_factory('user'), IsAuthenticated]
+    permission_classes = (is_owner_or_admin_factory('user'), IsAuthenticated)
     http_method_names = ['get', 'post', 'put', 'delete']
 
     def get(self, request, pk=None):
         if pk is None:
             orders = OrderController.get_order_list(request.user)
+            if wants_streaming(request):
+                return get_streaming_list_response(orders, OrderOutputSerializer)
             data = OrderOutputSerializer(instance=orders, many=True).data
         else:
             order = OrderController.get_order(pk)
             self.check_object_permissions(request, order)
             data = OrderOutputSerializer(instance=order).data
+            return set_etag(Response(data, status.HTTP_200_OK), order)
 
         return Response(data, status.HTTP_200_OK)
 
     @classmethod
+    @idempotent
     def post(cls, request):
         serializer = OrderInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -32,15 +39,15 @@ class OrderView(APIView):
         return Response(status=status.HTTP_201_CREATED)
 
     @check_object_permissions(OrderController.get_order)
-    def put(self, request, pk):
+    def put(self, request, pk, obj):
         serializer = OrderInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        OrderController.update_order(pk, **serializer.validated_data)
+        order = OrderController.update_order(obj, **serializer.validated_data, if_match=get_if_match_versions(request))
 
-        return Response(status=status.HTTP_200_OK)
+        return set_etag(Response(status=status.HTTP_200_OK), order)
 
     @check_object_permissions(OrderController.get_order)
-    def delete(self, request, pk):
-        OrderController.delete_order(pk)
+    def delete(self, request, pk, obj):
+        OrderController.delete_order(obj)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -4,11 +4,12 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from shop.controllers.order_item import OrderItemController
+from shop.idempotency import idempotent
 from shop.serializers.order_item import OrderItemInputSerializer, OrderItemOutputSerializer
 
 
 class OrderItemView(APIView):
-    permission_classes = [IsAdminUser]
+    permission_classes = (IsAdminUser, )
     http_method_names = ['get', 'post', 'put', 'delete']
 
     @classmethod
@@ -23,6 +24,7 @@ class OrderItemView(APIView):
         return Response(data, status.HTTP_200_OK)
 
     @classmethod
+    @idempotent
     def post(cls, request):
         serializer = OrderItemInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -1,15 +1,35 @@
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import status
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from shop.cache import get_product_detail
+from shop.compression import mark_compressed_cacheable
+from shop.conditional import get_if_match_versions, set_etag
+from shop.controllers.feedback import FeedbackController
 from shop.controllers.product import ProductController
 from shop.permissions import check_new_global_permission
-from shop.serializers.product import ProductInputSerializer, ProductOutputSerializer
+from shop.routers import pin_to_primary
+from shop.serializers.feedback import FeedbackOutputSerializer
+from shop.serializers.product import ProductDetailOutputSerializer, ProductInputSerializer, \
+    ProductOutputSerializer, RelatedProductOutputSerializer
+
+
+def get_product_detail_data(request, product):
+    """Serialized product with the first page of its feedback, from the cache if it's there"""
+    def serialize(obj):
+        page, paginator = FeedbackController.get_product_feedback_page(obj)
+        feedback_url = request.build_absolute_uri(reverse('product-feedback', kwargs={'pk': obj.pk}))
+        context = {'feedback_page': (page, paginator.get_next_link(feedback_url))}
+        return ProductDetailOutputSerializer(instance=obj, context=context).data
+    return get_product_detail(product, serialize)
 
 
 class ProductView(APIView):
-    permission_classes = []
+    permission_classes = ()
+    throttle_scope = 'products'
     http_method_names = ['get', 'post', 'put', 'delete']
 
     @classmethod
@@ -19,15 +39,20 @@ class ProductView(APIView):
             data = ProductOutputSerializer(instance=products, many=True).data
         else:
             product = ProductController.get_product(pk, request.user.is_staff)
-            data = ProductOutputSerializer(instance=product).data
+            data = get_product_detail_data(request, product)
 
-        return Response(data, status.HTTP_200_OK)
+        response = Response(data, status.HTTP_200_OK)
+        if pk is not None:
+            set_etag(response, product)
+            # the product is served from the cache, so is its compressed body
+            mark_compressed_cacheable(response, settings.PRODUCT_CACHE_TIMEOUT)
+        return response
 
     @check_new_global_permission(IsAdminUser)
     def post(self, request):
         serializer = ProductInputSerializer(data=request.data, fields_to_remove=['images_to_delete'])
         serializer.is_valid(raise_exception=True)
-        ProductController.create_product(**serializer.validated_data)
+        ProductController.create_product(request.user, **serializer.validated_data)
 
         return Response(status=status.HTTP_201_CREATED)
 
@@ -35,9 +60,10 @@ class ProductView(APIView):
     def put(self, request, pk):
         serializer = ProductInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        ProductController.update_product(pk, **serializer.validated_data)
+        product = ProductController.update_product(pk, request.user, **serializer.validated_data,
+                                                   if_match=get_if_match_versions(request))
 
-        return Response(status=status.HTTP_200_OK)
+        return set_etag(Response(status=status.HTTP_200_OK), product)
 
     @check_new_global_permission(IsAdminUser)
     def delete(self, request, pk):
@@ -46,11 +72,50 @@ class ProductView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class ProductFeedbackView(APIView):
+    """Moderated feedback of the product, newest first, by pages. 'next' is the link to the next page"""
+    permission_classes = ()
+    throttle_scope = 'feedback'
+    http_method_names = ['get']
+
+    @classmethod
+    def get(cls, request, pk):
+        product = ProductController.get_product(pk, request.user.is_staff)
+        page, paginator = FeedbackController.get_product_feedback_page(product, request)
+        data = {
+            'count': product.feedback_count,
+            'next': paginator.get_next_link(request.build_absolute_uri()),
+            'results': FeedbackOutputSerializer(instance=page, many=True, fields_to_remove=['product']).data,
+        }
+
+        return Response(data, status.HTTP_200_OK)
+
+
+class ProductRelatedView(APIView):
+    """
+    Available products bought most often together with the product ("customers also bought"), built by the
+    build_related_products command. A product without orders has none.
+    """
+    permission_classes = ()
+    throttle_scope = 'products'
+    http_method_names = ['get']
+
+    @classmethod
+    def get(cls, request, pk):
+        products = ProductController.get_related_products(pk)
+        # materials and images would be a query per product
+        data = RelatedProductOutputSerializer(instance=products, many=True,
+                                              fields_to_remove=['materials', 'images']).data
+
+        return Response(data, status.HTTP_200_OK)
+
+
 class ProductImagesRemover(APIView):
-    permission_classes = [IsAdminUser]
+    permission_classes = (IsAdminUser, )
     http_method_names = ['get']
 
     @classmethod
+    @pin_to_primary
     def get(cls, request, pk):
         ProductController.delete_product_images(pk)
 
@@ -8,7 +8,7 @@ from shop.serializers.product_material import MaterialInputSerializer, MaterialO
 
 
 class ProductMaterialView(APIView):
-    permission_classes = [IsAdminUser]
+    permission_classes = (IsAdminUser, )
     http_method_names = ['get', 'post', 'put', 'delete']
 
     @classmethod